@@ -0,0 +1,504 @@
+"""
+F1 Bot - Historical results archive
+
+A local SQLite copy of Jolpica's seasons, rounds, race and sprint results,
+qualifying and standings, so past results never need the network or a
+browser. Results, qualifying and standings are indexed by (season, round)
+through their primary keys and by driver through secondary indexes.
+
+The archive is filled in bulk once from the command line. After that, a
+repeating bot job fills it in incrementally: each pass fetches only the
+pieces (qualifying, sprint, race, standings) of sessions that have finished
+since the last pass. The backfill stores each season's final standings; the
+incremental job stores standings after every round.
+
+    python3 f1_archive.py backfill --from 1950 --to 2025
+    python3 f1_archive.py update
+    python3 f1_archive.py show 2021 22
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+
+import f1_json
+from f1_http import http_get, JOLPICA_BASE_URL
+from f1_budget import request_priority, BudgetExceeded, PREFETCH
+from f1_resilience import CircuitOpenError, is_failure
+from f1_schedule import get_season, SESSION_LENGTH, DEFAULT_SESSION_LENGTH
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DB = os.getenv(
+    "ARCHIVE_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "f1_archive.db"),
+)
+# Seconds between incremental passes of the bot job
+ARCHIVE_UPDATE_INTERVAL = 900
+# Jolpica publishes results a little after the flag; don't ask before this
+RESULTS_DELAY = timedelta(minutes=30)
+
+# Jolpica's maximum page size
+PAGE_SIZE = 100
+# The backfill waits out budgets, open breakers and 5xx instead of skipping data
+BACKFILL_ATTEMPTS = 30
+BACKFILL_RETRY_DELAY = 10.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seasons (
+    season INTEGER PRIMARY KEY,
+    rounds INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS races (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    circuit_id TEXT,
+    circuit_name TEXT,
+    locality TEXT,
+    country TEXT,
+    date TEXT,
+    time TEXT,
+    PRIMARY KEY (season, round)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS drivers (
+    driver_id TEXT PRIMARY KEY,
+    code TEXT,
+    number TEXT,
+    given_name TEXT,
+    family_name TEXT,
+    nationality TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS constructors (
+    constructor_id TEXT PRIMARY KEY,
+    name TEXT,
+    nationality TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS results (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    session TEXT NOT NULL,
+    driver_id TEXT NOT NULL,
+    constructor_id TEXT,
+    position INTEGER,
+    position_text TEXT,
+    grid INTEGER,
+    laps INTEGER,
+    status TEXT,
+    points REAL,
+    time TEXT,
+    fastest_lap_rank INTEGER,
+    fastest_lap_time TEXT,
+    PRIMARY KEY (season, round, session, driver_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_driver ON results (driver_id, season, round);
+CREATE TABLE IF NOT EXISTS qualifying (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    driver_id TEXT NOT NULL,
+    constructor_id TEXT,
+    position INTEGER,
+    q1 TEXT,
+    q2 TEXT,
+    q3 TEXT,
+    PRIMARY KEY (season, round, driver_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS qualifying_driver ON qualifying (driver_id, season, round);
+CREATE TABLE IF NOT EXISTS standings (
+    season INTEGER NOT NULL,
+    round INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    entity_id TEXT NOT NULL,
+    position INTEGER,
+    points REAL,
+    wins INTEGER,
+    PRIMARY KEY (season, round, kind, entity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS standings_entity ON standings (entity_id, season, round);
+"""
+
+# Result list key of each results endpoint
+RESULT_SESSIONS = {"race": ("results", "Results"), "sprint": ("sprint", "SprintResults")}
+STANDINGS_KINDS = {"driver": ("driverStandings", "DriverStandings"),
+                   "constructor": ("constructorStandings", "ConstructorStandings")}
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ArchiveUnavailable(Exception):
+    """Jolpica could not be reached within the retry budget"""
+
+
+class Archive:
+    def __init__(self, path=ARCHIVE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        with self._lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(SCHEMA)
+
+    # ==================== STORING ====================
+
+    def _store_driver(self, driver):
+        self.db.execute(
+            "INSERT OR REPLACE INTO drivers VALUES (?, ?, ?, ?, ?, ?)",
+            (driver["driverId"], driver.get("code"), driver.get("permanentNumber"),
+             driver.get("givenName", ""), driver.get("familyName", ""), driver.get("nationality", "")),
+        )
+
+    def _store_constructor(self, constructor):
+        self.db.execute(
+            "INSERT OR REPLACE INTO constructors VALUES (?, ?, ?)",
+            (constructor["constructorId"], constructor.get("name", ""), constructor.get("nationality", "")),
+        )
+
+    def store_races(self, season, races, complete=False):
+        with self._lock, self.db:
+            for race in races:
+                circuit = race.get("Circuit", {})
+                location = circuit.get("Location", {})
+                self.db.execute(
+                    "INSERT OR REPLACE INTO races VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (season, int(race["round"]), race.get("raceName", ""), circuit.get("circuitId"),
+                     circuit.get("circuitName"), location.get("locality"), location.get("country"),
+                     race.get("date"), race.get("time")),
+                )
+            self.db.execute(
+                "INSERT OR REPLACE INTO seasons VALUES (?, ?, ?, ?)",
+                (season, len(races), int(complete), time.time()),
+            )
+
+    def store_results(self, season, session, races):
+        list_key = RESULT_SESSIONS[session][1]
+        with self._lock, self.db:
+            for race in races:
+                for entry in race.get(list_key, []):
+                    driver, constructor = entry["Driver"], entry.get("Constructor", {})
+                    self._store_driver(driver)
+                    if constructor:
+                        self._store_constructor(constructor)
+                    fastest = entry.get("FastestLap", {})
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (season, int(race["round"]), session, driver["driverId"], constructor.get("constructorId"),
+                         _int(entry.get("position")), entry.get("positionText"), _int(entry.get("grid")),
+                         _int(entry.get("laps")), entry.get("status"), _float(entry.get("points")),
+                         entry.get("Time", {}).get("time"), _int(fastest.get("rank")),
+                         fastest.get("Time", {}).get("time")),
+                    )
+
+    def store_qualifying(self, season, races):
+        with self._lock, self.db:
+            for race in races:
+                for entry in race.get("QualifyingResults", []):
+                    driver, constructor = entry["Driver"], entry.get("Constructor", {})
+                    self._store_driver(driver)
+                    if constructor:
+                        self._store_constructor(constructor)
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO qualifying VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (season, int(race["round"]), driver["driverId"], constructor.get("constructorId"),
+                         _int(entry.get("position")), entry.get("Q1"), entry.get("Q2"), entry.get("Q3")),
+                    )
+
+    def store_standings(self, season, kind, lists):
+        list_key = STANDINGS_KINDS[kind][1]
+        with self._lock, self.db:
+            for standings in lists:
+                rnd = int(standings["round"])
+                for entry in standings.get(list_key, []):
+                    if kind == "driver":
+                        self._store_driver(entry["Driver"])
+                        entity_id = entry["Driver"]["driverId"]
+                    else:
+                        self._store_constructor(entry["Constructor"])
+                        entity_id = entry["Constructor"]["constructorId"]
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO standings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (season, rnd, kind, entity_id, _int(entry.get("position")),
+                         _float(entry.get("points")), _int(entry.get("wins"))),
+                    )
+
+    # ==================== FETCHING ====================
+
+    def _get(self, path, params=None, patient=False):
+        """Decoded Jolpica response for `path`, or None.
+
+        Patient callers (the backfill) wait out spent budgets, open breakers
+        and 5xx; others give up at once and raise ArchiveUnavailable.
+        """
+        url = f"{JOLPICA_BASE_URL}/ergast/f1/{path}"
+        for attempt in range(BACKFILL_ATTEMPTS if patient else 1):
+            if attempt:
+                time.sleep(BACKFILL_RETRY_DELAY)
+            try:
+                response = http_get(url, params=params, timeout=30)
+            except (BudgetExceeded, CircuitOpenError) as e:
+                logger.debug(f"Archive fetch {path} deferred: {e}")
+                continue
+            except Exception as e:
+                logger.warning(f"Archive fetch {path} failed: {e}")
+                continue
+            if response.status_code == 200:
+                return f1_json.loads(response.content)
+            if not is_failure(response.status_code):
+                return None
+        raise ArchiveUnavailable(path)
+
+    def _races(self, path, list_key, patient=False):
+        """Every race of a paginated results endpoint, with its entries merged across pages"""
+        races = {}
+        offset = 0
+        while True:
+            data = self._get(path, {"limit": PAGE_SIZE, "offset": offset}, patient)
+            if data is None:
+                break
+            table = data.get("MRData", {})
+            for race in table.get("RaceTable", {}).get("Races", []):
+                merged = races.setdefault(int(race["round"]), {**race, list_key: []})
+                merged[list_key].extend(race.get(list_key, []))
+            offset += PAGE_SIZE
+            if offset >= int(table.get("total") or 0):
+                break
+        return [races[rnd] for rnd in sorted(races)]
+
+    def _standings(self, path, patient=False):
+        data = self._get(path, patient=patient) or {}
+        return data.get("MRData", {}).get("StandingsTable", {}).get("StandingsLists", [])
+
+    def backfill_season(self, season):
+        """Download one whole season; returns the number of races stored"""
+        data = self._get(f"{season}.json", patient=True) or {}
+        races = data.get("MRData", {}).get("RaceTable", {}).get("Races", [])
+        if not races:
+            return 0
+
+        for session, (endpoint, list_key) in RESULT_SESSIONS.items():
+            self.store_results(season, session, self._races(f"{season}/{endpoint}.json", list_key, True))
+        self.store_qualifying(season, self._races(f"{season}/qualifying.json", "QualifyingResults", True))
+        for kind, (endpoint, _) in STANDINGS_KINDS.items():
+            self.store_standings(season, kind, self._standings(f"{season}/{endpoint}.json", True))
+
+        # Stored last, so an interrupted backfill is redone rather than marked complete
+        self.store_races(season, races, complete=season < datetime.now(timezone.utc).year)
+        return len(races)
+
+    def backfill(self, first, last, force=False):
+        done = {row["season"] for row in self._query("SELECT season FROM seasons WHERE complete = 1")}
+        for season in range(first, last + 1):
+            if season in done and not force:
+                continue
+            started = time.perf_counter()
+            races = self.backfill_season(season)
+            logger.info(f"Archived {season}: {races} races in {time.perf_counter() - started:.1f}s")
+
+    def _has(self, season, rnd, piece):
+        if piece in RESULT_SESSIONS:
+            sql = "SELECT 1 FROM results WHERE season = ? AND round = ? AND session = ? LIMIT 1"
+            args = (season, rnd, piece)
+        elif piece == "qualifying":
+            sql, args = "SELECT 1 FROM qualifying WHERE season = ? AND round = ? LIMIT 1", (season, rnd)
+        else:
+            sql = "SELECT 1 FROM standings WHERE season = ? AND round = ? AND kind = 'driver' LIMIT 1"
+            args = (season, rnd)
+        return bool(self._query(sql, args))
+
+    def _fetch_piece(self, season, rnd, piece):
+        """Fetch one finished session's data; False if Jolpica has nothing yet"""
+        if piece in RESULT_SESSIONS:
+            endpoint, list_key = RESULT_SESSIONS[piece]
+            races = self._races(f"{season}/{rnd}/{endpoint}.json", list_key)
+            self.store_results(season, piece, races)
+        elif piece == "qualifying":
+            races = self._races(f"{season}/{rnd}/qualifying.json", "QualifyingResults")
+            self.store_qualifying(season, races)
+        else:
+            races = []
+            for kind, (endpoint, _) in STANDINGS_KINDS.items():
+                lists = self._standings(f"{season}/{rnd}/{endpoint}.json")
+                self.store_standings(season, kind, lists)
+                races.extend(lists)
+        return bool(races)
+
+    @staticmethod
+    def _pieces(weekend):
+        """(piece, finished_at) for each archivable part of a weekend"""
+        race_end = weekend.race_start + SESSION_LENGTH["race"]
+        pieces = [
+            (s.kind, s.starts_at + SESSION_LENGTH.get(s.kind, DEFAULT_SESSION_LENGTH))
+            for s in weekend.sessions if s.kind in ("qualifying", "sprint")
+        ]
+        return pieces + [("race", race_end), ("standings", race_end)]
+
+    def update(self, now=None):
+        """Archive every session of the current season that has finished; returns pieces stored"""
+        now = now or datetime.now(timezone.utc)
+        season = get_season()
+        if season is None:
+            return 0
+        known = self._query("SELECT rounds FROM seasons WHERE season = ?", (season.year,))
+        if not known or known[0]["rounds"] != len(season.races):
+            self.store_races(season.year, season.races)
+
+        stored = 0
+        try:
+            for weekend in season.weekends:
+                for piece, finished_at in self._pieces(weekend):
+                    if finished_at + RESULTS_DELAY > now or self._has(season.year, weekend.round, piece):
+                        continue
+                    if self._fetch_piece(season.year, weekend.round, piece):
+                        stored += 1
+        except ArchiveUnavailable as e:
+            # Out of budget or Jolpica is down; the next pass picks up from here
+            logger.info(f"Archive update paused at {e}")
+        if stored:
+            logger.info(f"Archived {stored} new session results for {season.year}")
+        return stored
+
+    # ==================== QUERIES ====================
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def race(self, season, rnd):
+        rows = self._query("SELECT * FROM races WHERE season = ? AND round = ?", (season, rnd))
+        return dict(rows[0]) if rows else None
+
+    def results(self, season, rnd, session="race"):
+        return self._query(
+            """SELECT r.*, d.given_name, d.family_name, d.code, d.nationality, c.name AS constructor
+               FROM results r
+               JOIN drivers d USING (driver_id)
+               LEFT JOIN constructors c USING (constructor_id)
+               WHERE r.season = ? AND r.round = ? AND r.session = ?
+               ORDER BY r.position""",
+            (season, rnd, session),
+        )
+
+    def qualifying(self, season, rnd):
+        return self._query(
+            """SELECT q.*, d.given_name, d.family_name, d.code, d.nationality, c.name AS constructor
+               FROM qualifying q
+               JOIN drivers d USING (driver_id)
+               LEFT JOIN constructors c USING (constructor_id)
+               WHERE q.season = ? AND q.round = ?
+               ORDER BY q.position""",
+            (season, rnd),
+        )
+
+    def races_in(self, season):
+        return self._query(
+            "SELECT round, name, circuit_id, circuit_name, locality, country FROM races WHERE season = ? ORDER BY round",
+            (season,),
+        )
+
+    def season_results(self, season):
+        """Every race and sprint result of a season, with driver codes"""
+        return self._query(
+            """SELECT r.round, r.session, r.driver_id, d.code, d.family_name, r.constructor_id,
+                      r.position, r.status, r.points
+               FROM results r JOIN drivers d USING (driver_id)
+               WHERE r.season = ?""",
+            (season,),
+        )
+
+    def season_qualifying(self, season):
+        return self._query(
+            """SELECT q.round, q.driver_id, d.code, d.family_name, q.constructor_id, q.position
+               FROM qualifying q JOIN drivers d USING (driver_id)
+               WHERE q.season = ?""",
+            (season,),
+        )
+
+    def revisions(self):
+        """{season: revision}; a season's revision changes when its results or points do"""
+        qualifying = {
+            row["season"]: row["n"]
+            for row in self._query("SELECT season, COUNT(*) AS n FROM qualifying GROUP BY season")
+        }
+        return {
+            row["season"]: (row["n"], row["points"], qualifying.get(row["season"], 0))
+            for row in self._query(
+                "SELECT season, COUNT(*) AS n, TOTAL(points) AS points FROM results GROUP BY season"
+            )
+        }
+
+    def latest_round(self):
+        """(season, round) of the newest archived race, or None"""
+        rows = self._query(
+            "SELECT season, round FROM results WHERE session = 'race' ORDER BY season DESC, round DESC LIMIT 1"
+        )
+        return (rows[0]["season"], rows[0]["round"]) if rows else None
+
+    def counts(self):
+        return {
+            table: self._query(f"SELECT COUNT(*) AS n FROM {table}")[0]["n"]
+            for table in ("seasons", "races", "drivers", "constructors", "results", "qualifying", "standings")
+        }
+
+
+_archive = None
+
+
+def get_archive():
+    global _archive
+    if _archive is None:
+        _archive = Archive()
+    return _archive
+
+
+def main():
+    from f1_logging import configure_logging
+
+    parser = argparse.ArgumentParser(description="Local archive of historical F1 results")
+    sub = parser.add_subparsers(dest="command", required=True)
+    backfill = sub.add_parser("backfill", help="download whole seasons")
+    backfill.add_argument("--from", dest="first", type=int, default=1950)
+    backfill.add_argument("--to", dest="last", type=int, default=datetime.now(timezone.utc).year)
+    backfill.add_argument("--force", action="store_true", help="re-download seasons already complete")
+    sub.add_parser("update", help="archive the current season's finished sessions")
+    show = sub.add_parser("show", help="print one archived race")
+    show.add_argument("season", type=int)
+    show.add_argument("round", type=int)
+    args = parser.parse_args()
+
+    configure_logging(level=logging.INFO)
+    archive = get_archive()
+    with request_priority(PREFETCH):
+        if args.command == "backfill":
+            archive.backfill(args.first, args.last, args.force)
+        elif args.command == "update":
+            archive.update()
+        else:
+            race = archive.race(args.season, args.round)
+            print(race["name"] if race else "not archived")
+            for row in archive.results(args.season, args.round):
+                print(f"{row['position_text']:>3} {row['given_name']} {row['family_name']} "
+                      f"({row['constructor']}) {row['time'] or row['status']} {row['points']:g}")
+    print(archive.counts())
+
+
+if __name__ == "__main__":
+    main()
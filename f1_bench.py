@@ -0,0 +1,1083 @@
+"""
+F1 Bot - Load-generation benchmark suite
+
+Drives the real Telegram handlers (start, show_menu, button_handler for every
+callback_data value, live_cmd and live_update_task) with thousands of
+synthetic users through a fake Bot/Update layer. All upstreams are served by
+the local replay server (f1_replay.py), either from a recording or from a
+synthetic race-weekend fixture, so runs are offline and repeatable.
+
+    python3 f1_bench.py handlers --users 2000 --json bench.json
+    python3 f1_bench.py handlers --baseline base.json --max-regression 0.25
+    python3 f1_bench.py importtime --module main --max-ms 600
+    python3 f1_bench.py livesource --polls 50
+    python3 f1_bench.py decode --entries 200000
+    python3 f1_bench.py check
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import logging
+import tempfile
+import resource
+import statistics
+import subprocess
+import urllib.request
+from datetime import datetime, timedelta, timezone
+
+from f1_replay import Recorder, Recording, ReplayServer
+
+# Every callback_data value the inline keyboards can produce
+CALLBACK_DATA = [
+    "standings",
+    "constructors",
+    "lastrace",
+    "nextrace",
+    "calendar",
+    "live",
+    "stop_live",
+    "help",
+    "back_to_menu",
+    "stats",
+    "stats:average",
+    "stats:dnf",
+]
+
+# An inline search typed one keystroke at a time
+INLINE_KEYSTROKES = ["", "v", "ve", "ver", "b", "ba", "bak", "baku"]
+
+# Differences below this are treated as noise by the regression check
+NOISE_FLOOR_MS = 1.0
+
+
+# ==================== SYNTHETIC UPSTREAM FIXTURE ====================
+
+def _timing_row_html(position, code, gap, interval, best, last, age, compound):
+    return (
+        "<tr>"
+        f"<td><p class=\"font-bold\">{position}</p><p>{code}</p></td>"
+        f"<td>{gap}</td>"
+        f"<td><img src=\"/tyres/{compound}.svg\"><p>{age}</p></td>"
+        f"<td>{best}</td>"
+        f"<td>{interval}</td>"
+        f"<td>{last}</td>"
+        "</tr>"
+    )
+
+
+DRIVER_CODES = [
+    "VER", "NOR", "LEC", "PIA", "SAI", "HAM", "RUS", "PER", "ALO", "STR",
+    "GAS", "OCO", "ALB", "TSU", "HUL", "MAG", "BOT", "ZHO", "LAW", "BEA",
+]
+
+
+def synthetic_dom(tick):
+    """A formula-timer.com style DOM snapshot for a given tick"""
+    rng = random.Random(tick)
+    order = list(DRIVER_CODES)
+    # A couple of position swaps per tick keeps the board moving
+    for _ in range(2):
+        i = rng.randrange(len(order) - 1)
+        order[i], order[i + 1] = order[i + 1], order[i]
+    rows = []
+    for pos, code in enumerate(order, 1):
+        gap = "LEADER" if pos == 1 else f"+{(pos - 1) * 1.7 + rng.random():.3f}"
+        interval = "" if pos == 1 else f"+{1 + rng.random():.3f}"
+        best = f"1:{31 + pos % 3}.{rng.randrange(1000):03d}"
+        last = f"1:{32 + pos % 4}.{rng.randrange(1000):03d}"
+        # Tyres follow the driver, with staggered stints, so event detection sees realistic pit stops
+        stint = DRIVER_CODES.index(code) + tick
+        compound = ["soft", "medium", "hard"][(stint // 20) % 3]
+        rows.append(_timing_row_html(pos, code, gap, interval, best, last, 3 + stint % 20, compound))
+    return (
+        "<html><body><h1>Bench Grand Prix - Race</h1>"
+        "<table class=\"table-auto\"><tbody>" + "".join(rows) + "</tbody></table>"
+        "<table><tr><td><time>14:02:11</time></td><td><p>TRACK LIMITS - CAR 1 TURN 4 LAP 12</p></td></tr></table>"
+        "</body></html>"
+    )
+
+
+def build_synthetic_recording(directory, now=None):
+    """Write a self-consistent race-weekend recording for the bench"""
+    now = now or datetime.now(timezone.utc)
+    standings_season = now.year if now.month > 3 else now.year - 1
+    rec = Recorder(directory)
+    jolpica = "https://api.jolpi.ca/ergast/f1"
+    openf1 = "https://api.openf1.org/v1"
+
+    def put(url, payload):
+        rec.record_http(url, 200, {"Content-Type": "application/json"}, json.dumps(payload).encode("utf-8"))
+
+    drivers = [
+        {
+            "driverId": code.lower(),
+            "permanentNumber": str(i + 1),
+            "code": code,
+            "givenName": f"Driver{i + 1}",
+            "familyName": code.title(),
+            "nationality": ["Dutch", "British", "Monegasque", "Australian", "Spanish"][i % 5],
+        }
+        for i, code in enumerate(DRIVER_CODES)
+    ]
+    teams = [
+        {"constructorId": name.lower().replace(" ", "_"), "name": name, "nationality": nat}
+        for name, nat in [
+            ("Red Bull", "Austrian"), ("McLaren", "British"), ("Ferrari", "Italian"),
+            ("Mercedes", "German"), ("Aston Martin", "British"), ("Alpine", "French"),
+            ("Williams", "British"), ("RB", "Italian"), ("Haas", "American"), ("Sauber", "Swiss"),
+        ]
+    ]
+
+    races = []
+    for rnd in range(1, 25):
+        # Round 12 is the race running now (the live board's session)
+        race_day = now - timedelta(minutes=30) + timedelta(days=(rnd - 12) * 14)
+        day = lambda offset: (race_day + timedelta(days=offset)).strftime("%Y-%m-%d")
+        races.append({
+            "season": str(now.year),
+            "round": str(rnd),
+            "raceName": f"Bench {rnd} Grand Prix",
+            "Circuit": {
+                "circuitId": f"bench_{rnd}",
+                "circuitName": f"Bench Circuit {rnd}",
+                "Location": {"lat": "40.3725", "long": "49.8533", "locality": "Baku", "country": "Azerbaijan"},
+            },
+            "date": day(0),
+            "time": race_day.strftime("%H:%M:%SZ"),
+            "FirstPractice": {"date": day(-2), "time": "08:30:00Z"},
+            "SecondPractice": {"date": day(-2), "time": "12:00:00Z"},
+            "ThirdPractice": {"date": day(-1), "time": "08:30:00Z"},
+            "Qualifying": {"date": day(-1), "time": "12:00:00Z"},
+        })
+    put(f"{jolpica}/{now.year}.json", {"MRData": {"RaceTable": {"season": str(now.year), "Races": races}}})
+    put(f"{jolpica}/{standings_season}/drivers.json", {"MRData": {"DriverTable": {"Drivers": drivers}}})
+    put(f"{jolpica}/{standings_season}/constructors.json", {"MRData": {"ConstructorTable": {"Constructors": teams}}})
+    put(f"{jolpica}/{standings_season}/driverStandings.json", {"MRData": {"StandingsTable": {"StandingsLists": [{
+        "season": str(standings_season),
+        "round": "11",
+        "DriverStandings": [
+            {"position": str(i + 1), "points": str(400 - i * 17), "Driver": d}
+            for i, d in enumerate(drivers)
+        ],
+    }]}}})
+    put(f"{jolpica}/{standings_season}/constructorStandings.json", {"MRData": {"StandingsTable": {"StandingsLists": [{
+        "season": str(standings_season),
+        "round": "11",
+        "ConstructorStandings": [
+            {"position": str(i + 1), "points": str(600 - i * 50), "Constructor": t}
+            for i, t in enumerate(teams)
+        ],
+    }]}}})
+
+    # Finished rounds, paginated the way Jolpica does, for the archive backfill
+    finished = [race for race in races if int(race["round"]) < 12]
+
+    def put_pages(endpoint, list_key, entry):
+        rows = [(race, i, d) for race in finished for i, d in enumerate(drivers)]
+        for offset in range(0, len(rows), 100):
+            page = {}
+            for race, i, d in rows[offset:offset + 100]:
+                page.setdefault(race["round"], {**race, list_key: []})[list_key].append(entry(i, d))
+            put(f"{jolpica}/{now.year}/{endpoint}.json?limit=100&offset={offset}", {"MRData": {
+                "total": str(len(rows)), "RaceTable": {"season": str(now.year), "Races": list(page.values())},
+            }})
+
+    points = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+    put_pages("results", "Results", lambda i, d: {
+        "position": str(i + 1), "positionText": str(i + 1), "points": str(points[i] if i < 10 else 0),
+        "grid": str(i + 1), "laps": "57", "status": "Finished", "Driver": d, "Constructor": teams[i // 2],
+        "Time": {"time": "1:32:07.986" if i == 0 else f"+{i * 2.5:.3f}"},
+    })
+    put_pages("qualifying", "QualifyingResults", lambda i, d: {
+        "position": str(i + 1), "Driver": d, "Constructor": teams[i // 2], "Q1": f"1:30.{i:03d}",
+    })
+
+    iso = lambda dt: dt.strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    sessions = [
+        {
+            "session_key": 9000 + i,
+            "session_name": name,
+            "session_type": stype,
+            "meeting_name": "Bench Grand Prix",
+            "country_name": "Azerbaijan",
+            "location": "Baku",
+            "date_start": iso(now + timedelta(hours=start)),
+            "date_end": iso(now + timedelta(hours=start + 1.5)),
+            "gmt_offset": "04:00:00",
+        }
+        for i, (name, stype, start) in enumerate([
+            ("Qualifying", "Qualifying", -26), ("Race", "Race", -0.5),
+        ])
+    ]
+    for year in {now.year, now.year - 1, now.year + 1}:
+        put(f"{openf1}/sessions?year={year}", sessions if year == now.year else [])
+    for session in sessions:
+        key = session["session_key"]
+        put(f"{openf1}/position?session_key={key}", [
+            {"driver_number": n, "position": p, "date": iso(now - timedelta(seconds=s))}
+            for s in range(0, 600, 60)
+            for p, n in enumerate(random.Random(s).sample(range(1, 21), 20), 1)
+        ])
+        put(f"{openf1}/drivers?session_key={key}", [
+            {"driver_number": i + 1, "name_acronym": d["code"], "first_name": d["givenName"],
+             "last_name": d["familyName"], "country_code": "NED", "team_name": teams[i // 2]["name"]}
+            for i, d in enumerate(drivers)
+        ])
+
+    # Live endpoints for the running race (LIVE_SOURCE=openf1)
+    race_key = sessions[-1]["session_key"]
+    race_start = now - timedelta(minutes=30)
+    put(f"{openf1}/sessions?session_key=latest", [sessions[-1]])
+    # Gaps follow the newest position sample's running order
+    running_order = random.Random(0).sample(range(1, 21), 20)
+    put(f"{openf1}/intervals?session_key={race_key}", [
+        {"driver_number": n, "date": iso(now - timedelta(seconds=s)),
+         "gap_to_leader": None if p == 1 else round((p - 1) * 1.7 + s / 100, 3),
+         "interval": None if p == 1 else round(1.7 + s / 1000, 3)}
+        for s in range(0, 60, 4)
+        for p, n in enumerate(running_order, 1)
+    ])
+    put(f"{openf1}/laps?session_key={race_key}", [
+        {"driver_number": n, "lap_number": lap, "date_start": iso(race_start + timedelta(seconds=lap * 93)),
+         "lap_duration": None if lap == 20 else round(92 + random.Random(n * 100 + lap).random() * 3, 3)}
+        for lap in range(1, 21)
+        for n in range(1, 21)
+    ])
+    put(f"{openf1}/stints?session_key={race_key}", [
+        stint
+        for n in range(1, 21)
+        for stint in (
+            {"driver_number": n, "stint_number": 1, "compound": "MEDIUM", "lap_start": 1, "lap_end": 8 + n % 5, "tyre_age_at_start": 0},
+            {"driver_number": n, "stint_number": 2, "compound": "HARD", "lap_start": 9 + n % 5, "lap_end": None, "tyre_age_at_start": 0},
+        )
+    ])
+    put(f"{openf1}/race_control?session_key={race_key}", [
+        {"date": iso(race_start + timedelta(minutes=m)), "category": "Flag", "message": message}
+        for m, message in [(1, "GREEN LIGHT - PIT EXIT OPEN"), (12, "TRACK LIMITS - CAR 1 TURN 4 LAP 7"),
+                           (25, "DRS ENABLED")]
+    ])
+
+    forecast = {"daily": {
+        "temperature_2m_max": [24.1, 25.3, 26.0],
+        "precipitation_probability_max": [10, 35, 70],
+        "wind_speed_10m_max": [12.0, 15.5, 9.8],
+    }}
+    rec.record_http(
+        "https://api.open-meteo.com/v1/forecast", 200, {"Content-Type": "application/json"},
+        json.dumps(forecast).encode("utf-8"),
+    )
+    put("https://geocoding-api.open-meteo.com/v1/search", {"results": [{"latitude": 40.37, "longitude": 49.85}]})
+
+    for tick in range(40):
+        rec.record_dom(synthetic_dom(tick))
+    rec.close()
+    return directory
+
+
+# ==================== FAKE TELEGRAM LAYER ====================
+
+class FakeBot:
+    """Records Bot API calls and optionally simulates their latency"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = {}
+        self._next_message_id = 1000
+
+    async def _call(self, method):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def new_message_id(self):
+        self._next_message_id += 1
+        return self._next_message_id
+
+    async def send_chat_action(self, chat_id, action, **kwargs):
+        await self._call("sendChatAction")
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await self._call("sendMessage")
+        return make_message(self, chat_id)
+
+    async def edit_message_text(self, text, chat_id=None, message_id=None, **kwargs):
+        await self._call("editMessageText")
+
+    async def delete_message(self, chat_id, message_id, **kwargs):
+        await self._call("deleteMessage")
+
+
+_MESSAGE_CLASS = None
+
+
+def make_message(bot, chat_id):
+    """Build a telegram.Message subclass instance whose replies hit FakeBot"""
+    global _MESSAGE_CLASS
+    from telegram import Message, Chat
+
+    if _MESSAGE_CLASS is None:
+        class FakeMessage(Message):
+            async def reply_text(self, text, *args, **kwargs):
+                await self._fake_bot._call("sendMessage")
+                return make_message(self._fake_bot, self.chat.id)
+
+            async def edit_text(self, text, *args, **kwargs):
+                await self._fake_bot._call("editMessageText")
+                return self
+
+        _MESSAGE_CLASS = FakeMessage
+
+    msg = _MESSAGE_CLASS(
+        message_id=bot.new_message_id(),
+        date=datetime.now(timezone.utc),
+        chat=Chat(id=chat_id, type="private"),
+    )
+    object.__setattr__(msg, "_fake_bot", bot)
+    return msg
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class FakeCallbackQuery:
+    def __init__(self, bot, user_id, data):
+        self.data = data
+        self.from_user = FakeUser(user_id)
+        self.message = make_message(bot, user_id)
+        self._bot = bot
+
+    async def answer(self, *args, **kwargs):
+        await self._bot._call("answerCallbackQuery")
+
+
+class FakeInlineQuery:
+    def __init__(self, bot, user_id, query):
+        self.query = query
+        self.from_user = FakeUser(user_id)
+        self._bot = bot
+
+    async def answer(self, results, *args, **kwargs):
+        await self._bot._call("answerInlineQuery")
+
+
+class FakeUpdate:
+    def __init__(self, message=None, callback_query=None, user_id=None, inline_query=None):
+        self.message = message
+        self.callback_query = callback_query
+        self.inline_query = inline_query
+        self.effective_user = FakeUser(user_id) if user_id is not None else None
+
+
+class FakeJob:
+    def __init__(self, callback, name, data, interval):
+        self.callback = callback
+        self.name = name
+        self.data = data
+        self.interval = interval
+        self.removed = False
+
+    def schedule_removal(self):
+        self.removed = True
+
+
+class FakeJobQueue:
+    """Collects jobs instead of scheduling them; the bench ticks them itself"""
+
+    def __init__(self):
+        self._jobs = {}
+
+    def run_repeating(self, callback, interval, first=None, data=None, name=None, **kwargs):
+        job = FakeJob(callback, name, data, interval)
+        self._jobs.setdefault(name, []).append(job)
+        return job
+
+    def get_jobs_by_name(self, name):
+        jobs = [j for j in self._jobs.get(name, []) if not j.removed]
+        self._jobs[name] = jobs
+        return tuple(jobs)
+
+    def jobs(self):
+        return tuple(j for jobs in self._jobs.values() for j in jobs if not j.removed)
+
+
+class FakeContext:
+    def __init__(self, bot, job_queue, job=None, args=None):
+        self.bot = bot
+        self.job_queue = job_queue
+        self.job = job
+        self.args = args or []
+
+
+# ==================== MEASUREMENT ====================
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def rss_mb():
+    """Current resident set size in MiB (Linux), else peak RSS"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a 10ms ticker"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected) * 1000)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class Timings:
+    def __init__(self):
+        self.by_handler = {}
+
+    async def measure(self, name, coro):
+        start = time.perf_counter()
+        try:
+            await coro
+        finally:
+            self.by_handler.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        return {
+            name: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 3),
+                "p95_ms": round(percentile(values, 95), 3),
+                "p99_ms": round(percentile(values, 99), 3),
+                "mean_ms": round(statistics.fmean(values), 3),
+            }
+            for name, values in sorted(self.by_handler.items())
+        }
+
+
+# ==================== SCENARIOS ====================
+
+def _install_replay_scraper(base_url):
+    """Point the live pipeline at replayed DOM snapshots instead of Chromium"""
+    import f1_playwright_scraper
+
+    class ReplayDomScraper(f1_playwright_scraper.OptimizedLiveTimingScraper):
+        async def get_live_data(self):
+            def fetch():
+                with urllib.request.urlopen(f"{base_url}/formula-timer.com/__dom", timeout=5) as r:
+                    return r.read().decode("utf-8")
+            content = await asyncio.to_thread(fetch)
+            return self.parse_live_html(content)
+
+    f1_playwright_scraper._scraper_instance = ReplayDomScraper()
+
+
+BENCH_TIMEZONES = (None, "Europe/Istanbul", "America/New_York")
+BENCH_LOCALES = (None, "en", "tr")
+
+
+async def run_handlers(bot_module, users, concurrency, live_ticks, telegram_latency):
+    bot = FakeBot(telegram_latency)
+    job_queue = FakeJobQueue()
+    timings = Timings()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def user_session(user_id):
+        async with sem:
+            ctx = FakeContext(bot, job_queue)
+            # A few timezones shared by many chats: renders scale with zones, not users
+            zone = BENCH_TIMEZONES[user_id % len(BENCH_TIMEZONES)]
+            if zone:
+                await timings.measure("timezone_cmd", bot_module.timezone_cmd(
+                    FakeUpdate(message=make_message(bot, user_id), user_id=user_id),
+                    FakeContext(bot, job_queue, args=[zone])))
+            # Locales cross timezones: documents are built once, rendered per locale
+            locale = BENCH_LOCALES[user_id // len(BENCH_TIMEZONES) % len(BENCH_LOCALES)]
+            if locale:
+                await timings.measure("language_cmd", bot_module.language_cmd(
+                    FakeUpdate(message=make_message(bot, user_id), user_id=user_id),
+                    FakeContext(bot, job_queue, args=[locale])))
+            await timings.measure("start", bot_module.start(
+                FakeUpdate(message=make_message(bot, user_id), user_id=user_id), ctx))
+            await timings.measure("show_menu", bot_module.show_menu(
+                FakeUpdate(message=make_message(bot, user_id), user_id=user_id), ctx))
+            for data in CALLBACK_DATA:
+                query = FakeCallbackQuery(bot, user_id, data)
+                await timings.measure(f"button_handler:{data}", bot_module.button_handler(
+                    FakeUpdate(callback_query=query, user_id=user_id), ctx))
+            # Every fourth user follows race events instead of the full board
+            live_ctx = FakeContext(bot, job_queue, args=["events"] if user_id % 4 == 0 else None)
+            await timings.measure("live_cmd", bot_module.live_cmd(
+                FakeUpdate(message=make_message(bot, user_id), user_id=user_id), live_ctx))
+            # Served from the local archive the bench backfilled
+            archived = [str(datetime.now(timezone.utc).year), str(1 + user_id % 11)]
+            await timings.measure("results_cmd", bot_module.results_cmd(
+                FakeUpdate(message=make_message(bot, user_id), user_id=user_id),
+                FakeContext(bot, job_queue, args=archived)))
+            await timings.measure("stats_cmd", bot_module.stats_cmd(
+                FakeUpdate(message=make_message(bot, user_id), user_id=user_id), ctx))
+            await timings.measure("h2h_cmd", bot_module.h2h_cmd(
+                FakeUpdate(message=make_message(bot, user_id), user_id=user_id),
+                FakeContext(bot, job_queue, args=["VER", "NOR"])))
+            for text in INLINE_KEYSTROKES:
+                await timings.measure("inline_query", bot_module.inline_query(
+                    FakeUpdate(inline_query=FakeInlineQuery(bot, user_id, text), user_id=user_id), ctx))
+
+    lag = LoopLagMonitor()
+    lag.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(user_session(10_000 + i) for i in range(users)))
+
+    # Tick every live subscription as the JobQueue would
+    for _ in range(live_ticks):
+        jobs = job_queue.jobs()
+
+        async def tick(job):
+            async with sem:
+                await timings.measure("live_update_task", job.callback(FakeContext(bot, job_queue, job=job)))
+        await asyncio.gather(*(tick(job) for job in jobs))
+
+    elapsed = time.perf_counter() - started
+    await lag.stop()
+
+    total = sum(len(v) for v in timings.by_handler.values())
+    return {
+        "users": users,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(total / elapsed, 1) if elapsed else 0.0,
+        "handlers": timings.summary(),
+        "loop_lag_ms": {
+            "p50": round(percentile(lag.samples, 50), 3),
+            "p99": round(percentile(lag.samples, 99), 3),
+            "max": round(max(lag.samples, default=0.0), 3),
+        },
+        "telegram_calls": dict(sorted(bot.calls.items())),
+    }
+
+
+def check_regressions(result, baseline, max_regression):
+    """Return human-readable regressions of result against baseline"""
+    failures = []
+    for name, stats in baseline.get("handlers", {}).items():
+        current = result["handlers"].get(name)
+        if not current:
+            continue
+        old, new = stats["p95_ms"], current["p95_ms"]
+        if new - old > NOISE_FLOOR_MS and new > old * (1 + max_regression):
+            failures.append(f"{name}: p95 {old:.2f}ms -> {new:.2f}ms")
+    old_tp = baseline.get("throughput_per_s", 0)
+    if old_tp and result["throughput_per_s"] < old_tp * (1 - max_regression):
+        failures.append(f"throughput {old_tp}/s -> {result['throughput_per_s']}/s")
+    return failures
+
+
+def _start_upstream(recording_dir):
+    """Start the replay server and point the bot modules at it"""
+    if recording_dir is None:
+        recording_dir = build_synthetic_recording(tempfile.mkdtemp(prefix="f1bench-"))
+    server = ReplayServer(Recording(recording_dir)).start_background()
+    os.environ.update(server.upstream_env())
+    os.environ.pop("F1BOT_RECORD_DIR", None)
+    scratch = tempfile.mkdtemp(prefix="f1bench-")
+    os.environ.setdefault("GEOCODE_CACHE_FILE", os.path.join(scratch, "geocode.json"))
+    os.environ.setdefault("LIVE_SUBSCRIPTIONS_FILE", os.path.join(scratch, "live_subscriptions.json"))
+    os.environ.setdefault("CHAT_PREFERENCES_FILE", os.path.join(scratch, "chat_preferences.json"))
+    os.environ.setdefault("ARCHIVE_DB", os.path.join(scratch, "f1_archive.db"))
+    return server
+
+
+def print_report(result):
+    print(f"users={result['users']} elapsed={result['elapsed_s']}s throughput={result['throughput_per_s']}/s")
+    print(f"{'handler':<30}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, s in result["handlers"].items():
+        print(f"{name:<30}{s['count']:>8}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}")
+    lag = result["loop_lag_ms"]
+    print(f"event loop lag ms: p50={lag['p50']} p99={lag['p99']} max={lag['max']}")
+    print(f"upstream calls: {json.dumps(result['upstream_calls'], sort_keys=True)}")
+    print(f"telegram calls: {json.dumps(result['telegram_calls'], sort_keys=True)}")
+    print(f"rss: {result['rss_mb']:.1f} MiB (peak {result['peak_rss_mb']:.1f} MiB)")
+
+
+def cmd_handlers(args):
+    # Must happen before f1_bot_live configures logging at import time
+    logging.basicConfig(level=args.log_level, stream=sys.stderr)
+    server = _start_upstream(args.recording)
+    try:
+        import f1_bot_live
+        import f1_archive
+        _install_replay_scraper(server.base_url)
+        f1_archive.get_archive().backfill_season(datetime.now(timezone.utc).year)
+        result = asyncio.run(run_handlers(
+            f1_bot_live, args.users, args.concurrency, args.live_ticks, args.telegram_latency_ms / 1000
+        ))
+        result["upstream_calls"] = dict(server.upstream_calls)
+        result["rss_mb"] = round(rss_mb(), 1)
+        result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    finally:
+        server.stop()
+
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            failures = check_regressions(result, json.load(f), args.max_regression)
+        if failures:
+            print("PERFORMANCE REGRESSIONS:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+    return 0
+
+
+# ==================== LIVE SOURCES ====================
+
+LIVE_SOURCES = ("formula-timer", "openf1")
+
+
+def _live_source_poller(source, base_url):
+    if source == "openf1":
+        import f1_openf1_live
+        return f1_openf1_live.OpenF1LiveBoard().poll
+
+    import f1_playwright_scraper
+    scraper = f1_playwright_scraper.OptimizedLiveTimingScraper()
+
+    def poll():
+        with urllib.request.urlopen(f"{base_url}/formula-timer.com/__dom", timeout=5) as r:
+            return scraper.parse_live_html(r.read().decode("utf-8"))
+    return poll
+
+
+def measure_live_source(source, polls, base_url):
+    """Per-poll wall/CPU time and memory of one live source, in this process"""
+    import tracemalloc
+
+    rss_before = rss_mb()
+    poll = _live_source_poller(source, base_url)
+    snapshot = poll()  # warm-up: imports, session discovery
+
+    wall = []
+    cpu_started = time.process_time()
+    for _ in range(polls):
+        started = time.perf_counter()
+        snapshot = poll()
+        wall.append((time.perf_counter() - started) * 1000)
+    cpu_ms = (time.process_time() - cpu_started) * 1000 / polls
+
+    # Heap is sampled separately: tracemalloc would distort the timings
+    tracemalloc.start()
+    for _ in range(min(polls, 5)):
+        poll()
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "source": source,
+        "polls": polls,
+        "rows": len(snapshot.rows) if snapshot else 0,
+        "p50_ms": round(percentile(wall, 50), 2),
+        "p95_ms": round(percentile(wall, 95), 2),
+        "cpu_ms_per_poll": round(cpu_ms, 2),
+        "heap_peak_kib": round(heap_peak / 1024, 1),
+        "rss_delta_mb": round(rss_mb() - rss_before, 1),
+    }
+
+
+def cmd_livesource(args):
+    if args.child:
+        print(json.dumps(measure_live_source(args.child, args.polls, args.base_url)))
+        return 0
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    server = _start_upstream(args.recording)
+    results = []
+    try:
+        for source in args.sources:
+            calls_before = sum(server.upstream_calls.values())
+            # A fresh interpreter per source keeps the memory numbers separate
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "livesource", "--child", source,
+                 "--polls", str(args.polls), "--base-url", server.base_url],
+                capture_output=True, text=True, env=dict(os.environ),
+            )
+            if proc.returncode != 0:
+                print(f"{source}: failed\n{proc.stderr}")
+                return 1
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            result["upstream_requests_per_poll"] = round(
+                (sum(server.upstream_calls.values()) - calls_before) / (args.polls + 1 + min(args.polls, 5)), 1
+            )
+            results.append(result)
+    finally:
+        server.stop()
+
+    print(f"{'source':<16}{'rows':>6}{'p50 ms':>9}{'p95 ms':>9}{'cpu ms':>9}{'heap KiB':>10}{'rss MiB':>9}{'req/poll':>10}")
+    for r in results:
+        print(f"{r['source']:<16}{r['rows']:>6}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['cpu_ms_per_poll']:>9}"
+              f"{r['heap_peak_kib']:>10}{r['rss_delta_mb']:>9}{r['upstream_requests_per_poll']:>10}")
+    print("formula-timer figures exclude the Chromium process the real scraper drives.")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+DECODE_STRATEGIES = ("json", "orjson", "stream")
+# OpenF1 endpoints whose recorded bodies are used as decode payloads
+DECODE_ENDPOINTS = ("/v1/position", "/v1/intervals")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_position_payload(path, entries):
+    """A race-length /v1/position body, written without building it in memory"""
+    rng = random.Random(0)
+    start = datetime(2025, 6, 1, 13, 0, tzinfo=timezone.utc)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(entries):
+            date = (start + timedelta(milliseconds=i * 270)).isoformat()
+            entry = {"date": date, "session_key": 9158, "meeting_key": 1262,
+                     "driver_number": rng.randint(1, 20), "position": rng.randint(1, 20)}
+            f.write(("," if i else "") + json.dumps(entry))
+        f.write("]")
+
+
+def decode_payloads(recording_dir, entries, scratch):
+    """(name, path) of the payloads to decode: recorded OpenF1 arrays, else synthetic"""
+    payloads = []
+    if recording_dir:
+        largest = {}
+        for url, timeline in Recording(recording_dir).by_url.items():
+            endpoint = next((e for e in DECODE_ENDPOINTS if e in url), None)
+            if endpoint is None:
+                continue
+            for entry in timeline.entries:
+                body = entry.get("body") or ""
+                if len(body) > len(largest.get(endpoint, "")):
+                    largest[endpoint] = body
+        for endpoint, body in sorted(largest.items()):
+            path = os.path.join(scratch, endpoint.strip("/").replace("/", "_") + ".json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(body)
+            payloads.append((endpoint, path))
+    if not payloads:
+        path = os.path.join(scratch, "position.json")
+        write_position_payload(path, entries)
+        payloads.append((f"synthetic /v1/position x{entries}", path))
+    return payloads
+
+
+def measure_decode(strategy, path, runs):
+    """Decode time and peak memory of reducing one payload to the latest entry per driver"""
+    import f1_json
+
+    def decode():
+        with open(path, "rb") as f:
+            if strategy == "stream":
+                chunks = iter(lambda: f.read(f1_json.STREAM_CHUNK), b"")
+                return f1_json.latest_positions(f1_json.iter_json_array(chunks))
+            # What response.json() / orjson on response.content would do
+            body = f.read()
+        data = json.loads(body) if strategy == "json" else f1_json.loads(body)
+        return f1_json.latest_positions(data)
+
+    rss_before = rss_mb()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        latest = decode()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "strategy": strategy,
+        "drivers": len(latest),
+        "decode_ms": round(statistics.median(timings), 1),
+        "peak_rss_delta_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+
+
+def cmd_decode(args):
+    if args.child:
+        print(json.dumps(measure_decode(args.child, args.payload, args.runs)))
+        return 0
+
+    scratch = tempfile.mkdtemp(prefix="f1bench-")
+    results = []
+    for name, path in decode_payloads(args.recording, args.entries, scratch):
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        for strategy in args.strategies:
+            # A fresh interpreter per strategy so peak RSS is its own
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "decode", "--child", strategy,
+                 "--payload", path, "--runs", str(args.runs)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{name} {strategy}: failed\n{proc.stderr}")
+                return 1
+            result = json.loads(proc.stdout.strip().splitlines()[-1])
+            result.update(payload=name, size_mb=round(size_mb, 1))
+            results.append(result)
+
+    print(f"{'payload':<34}{'MiB':>7}{'strategy':>10}{'decode ms':>11}{'peak rss MiB':>14}{'drivers':>9}")
+    for r in results:
+        print(f"{r['payload']:<34}{r['size_mb']:>7}{r['strategy']:>10}{r['decode_ms']:>11}"
+              f"{r['peak_rss_delta_mb']:>14}{r['drivers']:>9}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+# Modules that must only load when live timing is first used
+LAZY_MODULES = ("requests", "bs4", "playwright", "playwright.async_api")
+
+
+def measure_import_time(module):
+    """Run `python -X importtime -c 'import <module>'` in a fresh interpreter"""
+    env = dict(os.environ, TELEGRAM_BOT_TOKEN=os.environ.get("TELEGRAM_BOT_TOKEN", "0:bench"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def cmd_importtime(args):
+    runs = [measure_import_time(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda m: m[args.module][1])
+    total_ms = best[args.module][1] / 1000
+
+    print(f"import {args.module}: {total_ms:.1f}ms (best of {args.runs})")
+    print(f"{'module':<45}{'self ms':>10}{'cumulative ms':>16}")
+    top = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in top:
+        print(f"{name:<45}{self_us / 1000:>10.1f}{cumulative_us / 1000:>16.1f}")
+
+    eager = [name for name in LAZY_MODULES if name in best]
+    result = {"module": args.module, "total_ms": round(total_ms, 1), "eager_heavy_modules": eager}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    status = 0
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        status = 1
+    if args.max_ms and total_ms > args.max_ms:
+        print(f"FAIL: import took {total_ms:.1f}ms > {args.max_ms}ms")
+        status = 1
+    return status
+
+
+# ==================== CORRECTNESS CHECKS ====================
+
+# Behaviours a load run can't see; `check` runs each against the fixture
+CHECKS = []
+
+
+def correctness_check(func):
+    CHECKS.append(func)
+    return func
+
+
+@correctness_check
+def check_inline_cards():
+    """Every search entry renders its own card, not the last one built"""
+    import f1_bot_live
+    from f1_search import get_search
+
+    f1_bot_live.refresh_search_index()
+    index = get_search().index
+    if index is None:
+        return ["search index was not built"]
+    failures = []
+    for kind in ("driver", "team", "race"):
+        entries = [entry for entry in index.entries if entry.kind == kind]
+        texts = {entry.payload.article("en").input_message_content.message_text for entry in entries}
+        if len(entries) > 1 and len(texts) != len(entries):
+            failures.append(f"{len(entries)} {kind} entries render only {len(texts)} distinct cards")
+    return failures
+
+
+@correctness_check
+def check_staggered_laps():
+    """A lap counts once when its time and tyre age update on different ticks"""
+    from f1_live_history import SessionHistory, LAP_SETTLE_TICKS
+    from f1_live_model import make_row, make_snapshot
+
+    def run(cells):
+        history = SessionHistory("Race")
+        for tick, (lap, age) in enumerate(cells):
+            row = make_row("1", "VER", "", "", "1:28.000", lap, age, "MEDIUM")
+            history.record(make_snapshot("Race", [row], taken_at=1000.0 + tick))
+        return history.last_laps("VER", n=10)
+
+    settle = [("1:28.000", "3")] * LAP_SETTLE_TICKS
+    cases = {
+        "time first": ([("1:30.000", "2"), ("1:29.000", "2"), ("1:29.000", "3"),
+                        ("1:28.000", "3"), ("1:28.000", "4")],
+                       [90000, 89000, 88000]),
+        "age first": ([("1:30.000", "2"), ("1:30.000", "3"), ("1:29.000", "3"),
+                       ("1:29.000", "4"), ("1:28.000", "4")],
+                      [90000, 89000, 88000]),
+        "identical laps": ([("1:28.000", "2"), ("1:28.000", "3")] + settle,
+                           [88000, 88000]),
+    }
+    failures = []
+    for name, (cells, expected) in cases.items():
+        laps = run(cells)
+        if laps != expected:
+            failures.append(f"{name}: recorded {laps}, expected {expected}")
+    return failures
+
+
+@correctness_check
+def check_lease_contention():
+    """Replicas racing for one lease on MiniRedis: exactly one gets it"""
+    from concurrent.futures import ThreadPoolExecutor
+    from f1_state import MiniRedis, RedisBackend
+
+    server = MiniRedis().start_background()
+    replicas = [RedisBackend(server.url) for _ in range(8)]
+    failures = []
+    try:
+        with ThreadPoolExecutor(len(replicas)) as pool:
+            for attempt in range(50):
+                name = f"bench-lease-{attempt}"
+                won = list(pool.map(
+                    lambda item: item[1].acquire_lease(name, f"replica-{item[0]}", 10000),
+                    enumerate(replicas),
+                ))
+                if sum(bool(w) for w in won) != 1:
+                    failures.append(f"{name}: {sum(bool(w) for w in won)} replicas hold the lease")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return failures
+
+
+def cmd_check(args):
+    logging.basicConfig(level=args.log_level, stream=sys.stderr)
+    server = _start_upstream(args.recording)
+    status = 0
+    try:
+        for check in CHECKS:
+            failures = check()
+            print(f"{'FAIL' if failures else 'ok  '} {check.__name__}")
+            for failure in failures:
+                print(f"       {failure}")
+            status = status or (1 if failures else 0)
+    finally:
+        server.stop()
+    return status
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="F1 bot benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    h = sub.add_parser("handlers", help="load-test the Telegram handlers and live pipeline")
+    h.add_argument("--users", type=int, default=2000)
+    h.add_argument("--concurrency", type=int, default=200)
+    h.add_argument("--live-ticks", type=int, default=5, help="live_update_task rounds over all subscriptions")
+    h.add_argument("--telegram-latency-ms", type=float, default=0.0, help="simulated Bot API latency")
+    h.add_argument("--recording", help="replay this recording instead of the synthetic fixture")
+    h.add_argument("--json", help="write results as JSON")
+    h.add_argument("--baseline", help="fail if results regress against this JSON")
+    h.add_argument("--max-regression", type=float, default=0.25)
+    h.add_argument("--log-level", default="WARNING", help="bot log level during the run")
+    h.set_defaults(func=cmd_handlers)
+
+    i = sub.add_parser("importtime", help="measure cold-start import cost with -X importtime")
+    i.add_argument("--module", default="f1_bot_live")
+    i.add_argument("--runs", type=int, default=5)
+    i.add_argument("--top", type=int, default=15)
+    i.add_argument("--max-ms", type=float, default=0.0, help="fail if the import is slower")
+    i.add_argument("--json", help="write results as JSON")
+    i.set_defaults(func=cmd_importtime)
+
+    ls = sub.add_parser("livesource", help="compare CPU and memory per poll of the live timing sources")
+    ls.add_argument("--sources", nargs="+", choices=LIVE_SOURCES, default=list(LIVE_SOURCES))
+    ls.add_argument("--polls", type=int, default=50)
+    ls.add_argument("--recording", help="replay this recording instead of the synthetic fixture")
+    ls.add_argument("--json", help="write results as JSON")
+    ls.add_argument("--child", choices=LIVE_SOURCES, help=argparse.SUPPRESS)
+    ls.add_argument("--base-url", help=argparse.SUPPRESS)
+    ls.set_defaults(func=cmd_livesource)
+
+    d = sub.add_parser("decode", help="compare decode time and peak RSS of large OpenF1 arrays")
+    d.add_argument("--strategies", nargs="+", choices=DECODE_STRATEGIES, default=list(DECODE_STRATEGIES))
+    d.add_argument("--entries", type=int, default=200_000, help="size of the synthetic position payload")
+    d.add_argument("--runs", type=int, default=3)
+    d.add_argument("--recording", help="decode the largest recorded position/intervals bodies")
+    d.add_argument("--json", help="write results as JSON")
+    d.add_argument("--child", choices=DECODE_STRATEGIES, help=argparse.SUPPRESS)
+    d.add_argument("--payload", help=argparse.SUPPRESS)
+    d.set_defaults(func=cmd_decode)
+
+    c = sub.add_parser("check", help="run correctness checks against the synthetic fixture")
+    c.add_argument("--recording", help="replay this recording instead of the synthetic fixture")
+    c.add_argument("--log-level", default="WARNING", help="bot log level during the run")
+    c.set_defaults(func=cmd_check)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
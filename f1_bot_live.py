@@ -6,15 +6,20 @@ Enhanced version with live timing functionality
 import os
 import sys
 import asyncio
-import requests
+import functools
+import importlib.util
 import json
 import logging
 import random
+import time
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from telegram import Update, Message, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import (
+    Update, Message, InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultArticle, InputTextMessageContent,
+)
 from telegram.ext import ContextTypes
+from telegram.request import HTTPXRequest
 
 # Configure the event loop policy to avoid issues with nested event loops
 # Note: nest_asyncio is removed as it can cause issues in serverless environments
@@ -34,12 +39,10 @@ def get_event_loop():
         asyncio.set_event_loop(_MAIN_EVENT_LOOP)
     return _MAIN_EVENT_LOOP
 
-# Playwright imports for F1 timing scraping
-try:
-    from playwright.async_api import async_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+# Playwright is only needed for live timing scraping, so it is imported on
+# first use (or preloaded in the background after startup), not here.
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
+if not PLAYWRIGHT_AVAILABLE:
     logging.warning("Playwright not available. Live timing will use API fallback only.")
 
 # Configure logging
@@ -52,87 +55,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Configure HTTP client with increased connection pool size
-import httpx
-
-# Azerbaijani translations (simplified)
-TRANSLATIONS = {
-    "welcome_title": "🏎️ F1 Canlı Botuna Xoş Gəlmisiniz!",
-    "welcome_text": """🏁 Sizin Formula 1 üçün ən yaxşı yoldaşınız - real vaxt yarış məlumatları, sıralamalar və canlı vaxt məlumatları.
-
-*Edə biləcəyiniz:*
-🏆 Cari çempionat sıralamalarını yoxlayın
-🏎️ Son nəticələri alın
-📅 Gələn yarış cədvəllərini və hava proqnozunu (Bakı vaxtı ilə) görün
-🔴 Canlı vaxtı izləyin""",
-    "menu_title": "🏎️ F1 Bot Menyusu",
-    "menu_text": "Aşağıdakı variantlardan birini seçin:",
-    "driver_standings": "🏆 Sürücü Sıralamaları",
-    "constructor_standings": "🏁 Konstruktor Sıralamaları",
-    "last_session": "🏎️ Son Sessiya Nəticələri",
-    "schedule_weather": "📅 Cədvəl & Hava",
-    "live_timing": "🔴 Canlı Vaxt",
-    "help_commands_btn": "ℹ️ Kömək & Əmrlər",
-    "season_driver_standings": " Pilotların Çempionat Sıralaması",
-    "season_constructor_standings": "*Konstruktorların Çempionat Sıralaması- {}*",
-    "points": "xal",
-    "qualifying": "Təsnifat",
-    "sprint": "Sprint",
-    "race": "Yarış",
-    "winner": " - Qalib",
-    "fastest_lap": "Ən Sürətli Dövrə: {} ({})",
-    "next_race": "🏎️ *Gələn Yarış*",
-    "fp1": "FP1",
-    "fp2": "FP2",
-    "fp3": "FP3",
-    "sprint_qualifying": "Sprint Təsnifatı",
-    "qualifying": "Təsnifat",
-    "race": "Yarış",
-    "all_times_baku": "_Bütün vaxtlar Bakı vaxtı ilə_",
-    "season_completed": "🏁 Mövsüm tamamlandı! Bu il üçün daha yarış yoxdur.",
-    "weather_forecast": "🌤️ Hava Proqnozu üçün {}",
-    "friday": "Cümə",
-    "saturday": "Şənbə",
-    "sunday": "Bazar",
-    "race_day": "Bazar (Yarış)",
-    "weather_unavailable": "🌦️ Bu yer üçün hava məlumatları mövcud deyil.",
-    "no_live_data": "❌ Canlı vaxt məlumatları mövcud deyil\n\nSon nəticələr üçün /lastrace istifadə edin",
-    "live_not_available": "❌ Canlı vaxt mövcud deyil\n\nSon nəticələr üçün /lastrace istifadə edin",
-    "loading": "⏳ Yüklənir...",
-    "api_unavailable": "❌ Xidmət mənbəyi baxımdadır. Bir neçə dəqiqə sonra yenidən cəhd edin.",
-    "no_standings": "❌ Bu mövsüm üçün sıralama məlumatları tapılmadı.",
-    "no_driver_standings": "❌ Sürücü sıralamaları tapılmadı.",
-    "invalid_data": "❌ Mənbədən yanlış məlumat format.",
-    "no_constructor_standings": "❌ Konstruktor sıralamaları tapılmadı.",
-    "no_sessions": "❌ Sessiya tapılmadı. API offline ola bilər.",
-    "no_recent_sessions": "❌ Son tamamlanmış sessiyalar tapılmadı.",
-    "no_results": "❌ Bu sessiya üçün nəticələr mövcud deyil.",
-    "no_position_data": "❌ Bu sessiya üçün mövqe məlumatları mövcud deyil.",
-    "no_final_positions": "❌ Bu sessiya üçün final mövqelər mövcud deyil.",
-    "error_fetching_session": "❌ Sessiya nəticələrini almaqda xəta: {}",
-    "error_fetching_race": "❌ Gələn yarış alınarkən xəta: {}",
-    "weather_unavailable": "❌ Hava məlumatları mövcud deyil.",
-    "error_fetching_weather": "❌ Hava məlumatları alınarkən xəta: {}",
-    "service_unavailable": "❌ Xidmət müvəqqəti mövcud deyil. Daha sonra yenidən cəhd edin.",
-    "error_occurred": "❌ Xəta baş verdi: {}",
-    "unknown_command": "❌ Naməlum əmr",
-    "live_session_check": "🔴 Canlı sessiya yoxlanılır...",
-    "live_session_active": "🔴 Canlı sessiya aktivdir! Mövqelər yenilənir...",
-    "live_session_inactive": "🔴 Hal-hazırda aktiv F1 sessiyası yoxdur",
-    "live_session_error": "❌ Canlı sessiya yoxlanarkən xəta: {}",
-    "live_timing_available": "🔴 Canlı vaxt mövcuddur!",
-    "live_timing_unavailable": "❌ Canlı vaxt mövcud deyil",
-    "live_positions_loading": "⏳ Mövqe məlumatları yüklənir...",
-    "live_data_source": "ℹ️ *Mənbə:* OpenF1 API",
-    "live_refresh_button": "🔄 Yenilə",
-    "live_positions_header": "📊 *Cari Mövqelər:*",
-    "live_session_location": "📍 *Məkan:*",
-    "live_session_time": "🕐 *Başlama vaxtı:*",
-    "live_update_frequency": "🔄 *Məlumatlar hər 15 saniyədə yenilənir*",
-    "live_position_winner": "🏆",
-    "live_session_info_error": "Sessiya məlumatları natamam",
-    "live_positions_error": "Mövqe məlumatları mövcud deyil",
-}
+# Structured logger for hot paths (sampled, JSON fields); see f1_logging.py
+from f1_logging import get_logger
+log = get_logger(__name__)
+
+from f1_profiling import profiled, span, capture_profile_async, LoopWatchdog
+
+from f1_live_model import format_lap_ms
+from f1_live_events import get_event_detector, Overtake, PitStop, FastestLap, RaceControl
+from f1_state import get_state, get_election, StateError, REPLICA_ID
+from f1_subscriptions import get_subscription_store, FLUSH_INTERVAL
+from f1_schedule import get_season, get_zone, DEFAULT_TIMEZONE
+from f1_preferences import get_preferences
+from f1_archive import get_archive, ARCHIVE_UPDATE_INTERVAL
+from f1_stats import get_stats
+from f1_search import get_search, SearchEntry
+from f1_locale import (
+    strings, render_document, make_document, is_document, normalize_locale, LOCALES, LOCALE_NAMES, DEFAULT_LOCALE,
+)
+from f1_budget import request_priority, PREFETCH
+import f1_metrics
+import f1_json
+from f1_json import latest_positions
+
+from f1_http import (
+    http_get,
+    fetch_json,
+    JOLPICA_BASE_URL,
+    OPENF1_BASE_URL,
+    OPEN_METEO_BASE_URL,
+    GEOCODING_BASE_URL,
+)
+
+# Strings of the default locale, for paths that don't serve a particular chat.
+# Chats get theirs from strings(chat_locale(chat_id)); see f1_locale.
+TRANSLATIONS = strings(DEFAULT_LOCALE)
 
 # Country to flag emoji mapping
 COUNTRY_FLAGS = {
@@ -234,40 +191,53 @@ COUNTRY_FLAGS = {
     "ARG": "🇦🇷",
 }
 
-# Global driver and constructor data cache
-DRIVER_DATA_CACHE = {}
-CONSTRUCTOR_DATA_CACHE = {}
+# Driver and constructor data are cached in the shared state backend for a day
+TEAM_DATA_TTL = 86400
+
+
+def _state_get(key):
+    try:
+        return get_state().get(key)
+    except StateError as e:
+        logger.warning(f"State backend read failed for {key}: {e}")
+        return None
+
+
+def _state_set(key, value, ttl=None):
+    try:
+        get_state().set(key, value, ttl)
+    except (StateError, TypeError) as e:
+        logger.warning(f"State backend write failed for {key}: {e}")
+
 
 def get_driver_data(season=None):
     """Fetch driver data from Ergast API with caching"""
-    global DRIVER_DATA_CACHE
-
     if season is None:
         now = datetime.now()
         season = now.year if now.month > 3 else now.year - 1
         logger.info(f"get_driver_data: Calculated season = {season} (month={now.month}, year={now.year})")
         # Log for 2026 season preparation
         if season == 2026 or now.year == 2026:
-            logger.info(f"DEBUG: Fetching data for 2026 season - ensure API has new drivers/teams")
-            logger.info(f"DEBUG: Current date: {now}, calculated season: {season}")
-            logger.info(f"DEBUG: Month check: {now.month} > 3 = {now.month > 3}")
+            logger.debug(f"Fetching data for 2026 season - ensure API has new drivers/teams")
+            logger.debug(f"Current date: {now}, calculated season: {season}")
+            logger.debug(f"Month check: {now.month} > 3 = {now.month > 3}")
             if now.month <= 3:
                 logger.warning(f"WARNING: Early {now.year} - using {season} data. Verify if {now.year} season data is available in API")
 
     cache_key = f"drivers_{season}"
-    if cache_key in DRIVER_DATA_CACHE:
-        cached = DRIVER_DATA_CACHE[cache_key]
-        if cached.get('timestamp') and (datetime.now(ZoneInfo("UTC")).timestamp() - cached['timestamp']) < 86400:  # 24 hours
-            if cached.get('data'): # Only return if we actually have data
-                return cached['data']
+    cached = _state_get(f"cache:{cache_key}")
+    if cached:  # Only return if we actually have data
+        f1_metrics.record_cache(cache_key, True)
+        return cached
+    f1_metrics.record_cache(cache_key, False)
 
     try:
         logger.info(f"Fetching driver data for season {season}")
-        url = f"https://api.jolpi.ca/ergast/f1/{season}/drivers.json"
-        response = requests.get(url, timeout=30)
+        url = f"{JOLPICA_BASE_URL}/ergast/f1/{season}/drivers.json"
+        response = fetch_json(url, timeout=30)
 
-        if response.status_code == 200:
-            data = response.json()
+        if response.status == 200:
+            data = response.data
             drivers = {}
 
             driver_list = data.get("MRData", {}).get("DriverTable", {}).get("Drivers", [])
@@ -287,14 +257,11 @@ def get_driver_data(season=None):
                     }
 
             # Cache the data
-            DRIVER_DATA_CACHE[cache_key] = {
-                'data': drivers,
-                'timestamp': datetime.now(ZoneInfo("UTC")).timestamp()
-            }
+            _state_set(f"cache:{cache_key}", drivers, TEAM_DATA_TTL)
 
             return drivers
         else:
-            logger.error(f"Failed to fetch driver data: {response.status_code}")
+            logger.error(f"Failed to fetch driver data: {response.status}")
             return {}
 
     except Exception as e:
@@ -303,26 +270,25 @@ def get_driver_data(season=None):
 
 def get_constructor_data(season=None):
     """Fetch constructor data from Ergast API with caching"""
-    global CONSTRUCTOR_DATA_CACHE
-
     if season is None:
         now = datetime.now()
         season = now.year if now.month > 3 else now.year - 1
         logger.info(f"get_constructor_data: Calculated season = {season} (month={now.month}, year={now.year})")
 
     cache_key = f"constructors_{season}"
-    if cache_key in CONSTRUCTOR_DATA_CACHE:
-        cached = CONSTRUCTOR_DATA_CACHE[cache_key]
-        if cached.get('timestamp') and (datetime.now(ZoneInfo("UTC")).timestamp() - cached['timestamp']) < 86400:  # 24 hours
-            return cached['data']
+    cached = _state_get(f"cache:{cache_key}")
+    if cached is not None:
+        f1_metrics.record_cache(cache_key, True)
+        return cached
+    f1_metrics.record_cache(cache_key, False)
 
     try:
         logger.info(f"Fetching constructor data for season {season}")
-        url = f"https://api.jolpi.ca/ergast/f1/{season}/constructors.json"
-        response = requests.get(url, timeout=30)
+        url = f"{JOLPICA_BASE_URL}/ergast/f1/{season}/constructors.json"
+        response = fetch_json(url, timeout=30)
 
-        if response.status_code == 200:
-            data = response.json()
+        if response.status == 200:
+            data = response.data
             constructors = {}
 
             constructor_list = data.get("MRData", {}).get("ConstructorTable", {}).get("Constructors", [])
@@ -337,14 +303,11 @@ def get_constructor_data(season=None):
                     }
 
             # Cache the data
-            CONSTRUCTOR_DATA_CACHE[cache_key] = {
-                'data': constructors,
-                'timestamp': datetime.now(ZoneInfo("UTC")).timestamp()
-            }
+            _state_set(f"cache:{cache_key}", constructors, TEAM_DATA_TTL)
 
             return constructors
         else:
-            logger.error(f"Failed to fetch constructor data: {response.status_code}")
+            logger.error(f"Failed to fetch constructor data: {response.status}")
             return {}
 
     except Exception as e:
@@ -483,68 +446,183 @@ def get_country_flag(nationality):
 
     # Partial match
     nationality_lower = nationality.lower()
-    for key, flag in COUNTRY_FLAGS.items():
-        if key.lower() in nationality_lower or nationality_lower in key.lower():
-            return flag
+    with span("flag_lookup"):
+        for key, flag in COUNTRY_FLAGS.items():
+            if key.lower() in nationality_lower or nationality_lower in key.lower():
+                return flag
 
     return "🏳️"
 
 
-def to_baku(d, t):
-    """Convert UTC time to Baku time"""
-    if not t or t == "TBA":
-        return f"{d} (TBA)"
+def chat_timezone(chat_id):
+    """The timezone a chat picked with /timezone, or the default"""
+    if chat_id is None:
+        return DEFAULT_TIMEZONE
+    return get_preferences().get(chat_id, "timezone", DEFAULT_TIMEZONE)
+
+
+def chat_locale(chat_id):
+    """The locale a chat picked with /language, or the default"""
+    if chat_id is None:
+        return DEFAULT_LOCALE
+    return get_preferences().get(chat_id, "locale", DEFAULT_LOCALE)
+
+
+def update_locale(update):
+    """The locale of the chat an update came from"""
+    message = update.message if isinstance(update.message, Message) else None
+    if message is None and update.callback_query is not None:
+        message = update.callback_query.message
+    return chat_locale(message.chat_id if message else None)
+
+
+def set_chat_locale(chat_id, code):
+    """Store a chat's /language choice ("reset" for the default); the reply, in the new language"""
+    if code.lower() == "reset":
+        get_preferences().unset(chat_id, "locale")
+        locale = DEFAULT_LOCALE
+    else:
+        locale = normalize_locale(code)
+        if locale is None:
+            return strings(chat_locale(chat_id))["language_invalid"].format(code, ", ".join(LOCALES))
+        get_preferences().set(chat_id, "locale", locale)
+    return strings(locale)["language_set"].format(LOCALE_NAMES[locale])
+
+
+def menu_keyboard(text):
+    """Main menu buttons, labelled from a locale's strings"""
+    return [
+        [
+            InlineKeyboardButton(text["driver_standings"], callback_data="standings"),
+            InlineKeyboardButton(text["constructor_standings"], callback_data="constructors"),
+        ],
+        [
+            InlineKeyboardButton(text["last_session"], callback_data="lastrace"),
+            InlineKeyboardButton(text["schedule_weather"], callback_data="nextrace"),
+        ],
+        [
+            InlineKeyboardButton(text["live_timing"], callback_data="live"),
+            InlineKeyboardButton(text["statistics"], callback_data="stats"),
+        ],
+    ]
+
+
+def times_note(tz, locale=DEFAULT_LOCALE):
+    if tz == "Asia/Baku":
+        return strings(locale)["all_times_baku"]
+    return strings(locale)["all_times_in"].format(tz=tz)
+
+
+# Circuit coordinates keyed by lowercased circuit name / locality.
+# Seeded from CIRCUIT_COORDS and refreshed from the Jolpica schedule
+# (Circuit.Location lat/long) every time it is downloaded.
+CIRCUIT_INDEX = {name.lower(): coords for name, coords in CIRCUIT_COORDS.items()}
+
+# Persistent geocoding cache so a location is only ever geocoded once
+GEOCODE_CACHE_FILE = os.getenv(
+    "GEOCODE_CACHE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "geocode_cache.json"),
+)
+_GEOCODE_CACHE = None
+
+
+def update_circuit_index(races):
+    """Merge circuit coordinates from a Jolpica race list into CIRCUIT_INDEX"""
+    for race in races:
+        try:
+            circuit = race.get("Circuit", {})
+            location = circuit.get("Location", {})
+            lat = location.get("lat")
+            lon = location.get("long")
+            if lat is None or lon is None:
+                continue
+            coords = (float(lat), float(lon))
+            for name in (
+                circuit.get("circuitName"),
+                circuit.get("circuitId"),
+                location.get("locality"),
+            ):
+                if name:
+                    CIRCUIT_INDEX[name.strip().lower()] = coords
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Skipping circuit with invalid coordinates: {e}")
+            continue
+
+
+def _load_geocode_cache():
+    """Load the persisted geocode cache from disk (once per process)"""
+    global _GEOCODE_CACHE
+    if _GEOCODE_CACHE is None:
+        _GEOCODE_CACHE = {}
+        try:
+            with open(GEOCODE_CACHE_FILE, "r", encoding="utf-8") as f:
+                _GEOCODE_CACHE = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read geocode cache {GEOCODE_CACHE_FILE}: {e}")
+    return _GEOCODE_CACHE
+
+
+def _save_geocode_cache():
+    """Atomically write the geocode cache to disk"""
+    tmp_path = f"{GEOCODE_CACHE_FILE}.tmp"
     try:
-        # strip trailing Z if present
-        tzinfo = ZoneInfo("UTC")
-        if t.endswith("Z"):
-            t2 = t[:-1]
-        else:
-            t2 = t
-        dt = datetime.fromisoformat(d + "T" + t2)
-        # assume dt is UTC if naive
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=tzinfo)
-        baku = dt.astimezone(ZoneInfo("Asia/Baku"))
-        date_str = baku.strftime("%d %b")
-        time_str = baku.strftime("%H:%M")
-        return f"{date_str} {time_str}"
-    except Exception:
-        return f"{d} {t}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_GEOCODE_CACHE, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, GEOCODE_CACHE_FILE)
+    except Exception as e:
+        logger.warning(f"Could not write geocode cache {GEOCODE_CACHE_FILE}: {e}")
 
 
 def get_circuit_coordinates(location_name):
     """Get coordinates for a circuit with fuzzy matching"""
-    # Direct match first
-    if location_name in CIRCUIT_COORDS:
-        return CIRCUIT_COORDS[location_name]
-
-    # Fuzzy matching for partial names
-    location_lower = location_name.lower()
-    for circuit_name, coords in CIRCUIT_COORDS.items():
-        if (
-            location_lower in circuit_name.lower()
-            or circuit_name.lower() in location_lower
-        ):
+    if not location_name:
+        return None
+
+    key = location_name.strip().lower()
+
+    # Direct match first (schedule-derived and built-in coordinates)
+    if key in CIRCUIT_INDEX:
+        return CIRCUIT_INDEX[key]
+
+    # Fuzzy matching for partial names, memoized so the scan runs once
+    for circuit_name, coords in CIRCUIT_INDEX.items():
+        if key in circuit_name or circuit_name in key:
+            CIRCUIT_INDEX[key] = coords
             return coords
 
+    # Previously geocoded (including known misses)
+    geocode_cache = _load_geocode_cache()
+    if key in geocode_cache:
+        cached = geocode_cache[key]
+        return tuple(cached) if cached else None
+
     # Geocoding fallback
     try:
-        geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={location_name}&count=1"
-        response = requests.get(geo_url, timeout=10)
+        response = http_get(
+            f"{GEOCODING_BASE_URL}/v1/search",
+            params={"name": location_name, "count": 1},
+            timeout=10,
+        )
         if response.status_code == 200:
-            data = response.json()
+            data = f1_json.loads(response.content)
+            coords = None
             if data.get("results"):
                 result = data["results"][0]
-                return (result["latitude"], result["longitude"])
-    except Exception:
-        pass
+                coords = (result["latitude"], result["longitude"])
+            # Only definitive answers are persisted; transient errors are retried
+            geocode_cache[key] = list(coords) if coords else None
+            _save_geocode_cache()
+            return coords
+    except Exception as e:
+        logger.warning(f"Geocoding failed for {location_name}: {e}")
 
     return None
 
 
 def check_active_f1_session():
-    """Check if there's currently an active F1 session using OpenF1 API with caching"""
+    """Check if an F1 session is running (or about to) from the season schedule"""
     try:
         # Check cache first
         cached = get_cached_data("active_session")
@@ -552,78 +630,17 @@ def check_active_f1_session():
             return cached
 
         logger.info(TRANSLATIONS["live_session_check"])
-        now = datetime.now(ZoneInfo("UTC"))
-        current_year = now.year
-
-        # Check current and next year for sessions
-        years_to_check = [current_year]
-        if now.month >= 11:
-            years_to_check.append(current_year + 1)
-
-        sessions = []
-        for year in years_to_check:
-            try:
-                sessions_url = f"https://api.openf1.org/v1/sessions?year={year}"
-                sessions_response = requests.get(sessions_url, timeout=10)
-                if sessions_response.status_code == 200:
-                    sessions.extend(sessions_response.json())
-            except Exception as e:
-                logger.error(f"Error fetching sessions for year {year}: {e}")
-                continue
-
-        if not sessions:
-            logger.warning("No sessions found")
+        season = get_season()
+        if season is None:
+            logger.warning("No schedule available")
             set_cached_data("active_session", False)
             return False
 
-        # Check if any session is currently active (within the last 2 hours and next 4 hours)
-        for session in sessions:
-            session_start = session.get("date_start")
-            session_end = session.get("date_end")
-
-            if session_start:
-                try:
-                    start_dt = datetime.fromisoformat(
-                        session_start.replace("Z", "+00:00")
-                    )
-                    if start_dt.tzinfo is None:
-                        start_dt = start_dt.replace(tzinfo=ZoneInfo("UTC"))
-
-                    # Check if session is currently running or will start soon
-                    time_diff_start = (start_dt - now).total_seconds() / 3600  # hours
-                    time_diff_end = 0
-
-                    if session_end:
-                        end_dt = datetime.fromisoformat(
-                            session_end.replace("Z", "+00:00")
-                        )
-                        if end_dt.tzinfo is None:
-                            end_dt = end_dt.replace(tzinfo=ZoneInfo("UTC"))
-                        time_diff_end = (end_dt - now).total_seconds() / 3600  # hours
-
-                        # Session is active if it started within last 2 hours and hasn't ended + 1 hour grace period
-                        if (
-                            -2 <= time_diff_start <= 0 and time_diff_end > -1
-                        ):  # Allow 1 hour after session ends
-                            logger.info(
-                                f"Active session found: {session.get('session_name', 'Unknown')}"
-                            )
-                            set_cached_data("active_session", True)
-                            return True
-                    else:
-                        # If no end time, check if session started recently (within 2 hours)
-                        if (
-                            -2 <= time_diff_start <= 1
-                        ):  # Allow 1 hour future for upcoming sessions
-                            logger.info(
-                                f"Upcoming session found: {session.get('session_name', 'Unknown')}"
-                            )
-                            set_cached_data("active_session", True)
-                            return True
-
-                except (ValueError, TypeError) as e:
-                    logger.error(f"Error parsing session times: {e}")
-                    continue
+        session = season.active_session()
+        if session is not None:
+            logger.info(f"Active session found: {session.kind}")
+            set_cached_data("active_session", True)
+            return True
 
         logger.info(TRANSLATIONS["live_session_inactive"])
         set_cached_data("active_session", False)
@@ -635,13 +652,14 @@ def check_active_f1_session():
         return False
 
 
-def get_current_standings():
-    """Get current F1 driver standings with caching"""
+def get_current_standings(locale=DEFAULT_LOCALE):
+    """Get current F1 driver standings with caching, rendered in `locale`"""
+    text = strings(locale)
     try:
         # Check cache first
         cached = get_cached_data("standings")
-        if cached:
-            return cached
+        if is_document(cached):
+            return render_document("standings", locale, cached)
 
         logger.info("Fetching current standings from API")
         now = datetime.now()
@@ -649,22 +667,28 @@ def get_current_standings():
 
         # Try multiple APIs with better error handling
         apis = [
-            f"https://api.jolpi.ca/ergast/f1/{season}/driverStandings.json",
+            f"{JOLPICA_BASE_URL}/ergast/f1/{season}/driverStandings.json",
         ]
 
         data = None
+        version = None
         for api_url in apis:
             try:
-                response = requests.get(api_url, timeout=30)
-                if response.status_code == 200:
-                    data = response.json()
+                response = fetch_json(api_url, timeout=30)
+                if response.status == 200:
+                    data, version = response.data, response.version
                     break
             except Exception as e:
                 logger.error(f"Error fetching standings from {api_url}: {e}")
                 continue
 
         if not data:
-            return TRANSLATIONS["api_unavailable"]
+            return text["api_unavailable"]
+
+        document = built("standings", version)
+        if document:
+            set_cached_data("standings", document)
+            return render_document("standings", locale, document)
 
         try:
             standings_list = (
@@ -673,52 +697,52 @@ def get_current_standings():
                 .get("StandingsLists", [])
             )
             if not standings_list:
-                return TRANSLATIONS["no_standings"]
+                return text["no_standings"]
 
             standings = standings_list[0].get("DriverStandings", [])
             if not standings:
-                return TRANSLATIONS["no_driver_standings"]
+                return text["no_driver_standings"]
 
             actual_season = standings_list[0].get("season", season)
         except Exception as e:
             logger.error(f"Error parsing standings data: {e}")
-            return TRANSLATIONS["invalid_data"]
+            return text["invalid_data"]
 
-        message = f"🏆 {actual_season} {TRANSLATIONS['season_driver_standings']}\n\n"
+        parts = [["header", {"season": actual_season}]]
 
         for driver in standings:
             try:
-                pos = driver.get("position", "?")
                 driver_info = driver.get("Driver", {})
                 given_name = driver_info.get("givenName", "Unknown")
                 family_name = driver_info.get("familyName", "Driver")
-                full_name = f"{given_name} {family_name.upper()}"
-                nationality = driver_info.get("nationality", "")
-                flag = get_country_flag(nationality)
-                points = driver.get("points", "0")
-
-                message += (
-                    f"{pos}. {flag} {full_name} ({points} {TRANSLATIONS['points']})\n"
-                )
+                parts.append(["row", {
+                    "position": driver.get("position", "?"),
+                    "flag": get_country_flag(driver_info.get("nationality", "")),
+                    "name": f"{given_name} {family_name.upper()}",
+                    "points": driver.get("points", "0"),
+                }])
             except Exception as e:
                 logger.error(f"Error processing driver data: {e}")
                 continue
 
-        # Cache the result
-        set_cached_data("standings", message)
-        return message
+        # Cache the data; every locale renders from it
+        document = make_document(parts, version)
+        remember_document("standings", document)
+        set_cached_data("standings", document)
+        return render_document("standings", locale, document)
     except Exception as e:
         logger.error(f"Error in get_current_standings: {e}")
-        return TRANSLATIONS["service_unavailable"]
+        return text["service_unavailable"]
 
 
-def get_constructor_standings():
-    """Get constructor standings with caching"""
+def get_constructor_standings(locale=DEFAULT_LOCALE):
+    """Get constructor standings with caching, rendered in `locale`"""
+    text = strings(locale)
     try:
         # Check cache first
         cached = get_cached_data("constructor_standings")
-        if cached:
-            return cached
+        if is_document(cached):
+            return render_document("constructor_standings", locale, cached)
 
         logger.info("Fetching constructor standings from API")
         now = datetime.now()
@@ -726,15 +750,16 @@ def get_constructor_standings():
 
         # Try multiple APIs
         apis = [
-            f"https://api.jolpi.ca/ergast/f1/{season}/constructorStandings.json",
+            f"{JOLPICA_BASE_URL}/ergast/f1/{season}/constructorStandings.json",
         ]
 
         data = None
+        version = None
         for api_url in apis:
             try:
-                response = requests.get(api_url, timeout=30)
-                if response.status_code == 200:
-                    data = response.json()
+                response = fetch_json(api_url, timeout=30)
+                if response.status == 200:
+                    data, version = response.data, response.version
                     break
             except Exception as e:
                 logger.error(
@@ -743,7 +768,12 @@ def get_constructor_standings():
                 continue
 
         if not data:
-            return TRANSLATIONS["api_unavailable"]
+            return text["api_unavailable"]
+
+        document = built("constructor_standings", version)
+        if document:
+            set_cached_data("constructor_standings", document)
+            return render_document("constructor_standings", locale, document)
 
         try:
             standings_list = (
@@ -752,16 +782,16 @@ def get_constructor_standings():
                 .get("StandingsLists", [])
             )
             if not standings_list:
-                return TRANSLATIONS["no_constructor_standings"]
+                return text["no_constructor_standings"]
 
             standings = standings_list[0].get("ConstructorStandings", [])
             if not standings:
-                return TRANSLATIONS["no_constructor_standings"]
+                return text["no_constructor_standings"]
 
             actual_season = standings_list[0].get("season", season)
         except Exception as e:
             logger.error(f"Error parsing constructor standings data: {e}")
-            return TRANSLATIONS["invalid_data"]
+            return text["invalid_data"]
 
         # Get constructor data for dynamic flag mapping
         constructors_data = get_constructor_data(actual_season)
@@ -790,13 +820,12 @@ def get_constructor_standings():
         }
         team_flags.update(fallback_flags)
 
-        message = f"🏆 *{TRANSLATIONS['season_constructor_standings'].format(actual_season)}*\n\n"
+        parts = [["header", {"season": actual_season}]]
 
         for pos, team in enumerate(standings, 1):
             try:
                 constructor = team.get("Constructor", {})
                 team_name = constructor.get("name", "Unknown Team")
-                points = team.get("points", "0")
 
                 flag = ""
                 for key, emoji in team_flags.items():
@@ -804,28 +833,31 @@ def get_constructor_standings():
                         flag = emoji + " "
                         break
 
-                message += (
-                    f"{pos}. {flag}*{team_name}* - {points} {TRANSLATIONS['points']}\n"
-                )
+                parts.append(["row", {
+                    "position": pos, "flag": flag, "name": team_name, "points": team.get("points", "0"),
+                }])
             except Exception as e:
                 logger.error(f"Error processing team data: {e}")
                 continue
 
-        # Cache the result
-        set_cached_data("constructor_standings", message)
-        return message
+        # Cache the data; every locale renders from it
+        document = make_document(parts, version)
+        remember_document("constructor_standings", document)
+        set_cached_data("constructor_standings", document)
+        return render_document("constructor_standings", locale, document)
     except Exception as e:
         logger.error(f"Error in get_constructor_standings: {e}")
-        return TRANSLATIONS["service_unavailable"]
+        return text["service_unavailable"]
 
 
-def get_last_session_results():
+def get_last_session_results(locale=DEFAULT_LOCALE):
     """Get last session results using OpenF1 API with enhanced data and caching"""
+    text = strings(locale)
     try:
         # Check cache first
         cached = get_cached_data("last_session")
-        if cached:
-            return cached
+        if is_document(cached):
+            return render_document("last_session", locale, cached)
 
         logger.info("Fetching last session results from API")
         now = datetime.now(ZoneInfo("UTC"))
@@ -838,16 +870,16 @@ def get_last_session_results():
         sessions = []
         for year in years_to_check:
             try:
-                sessions_url = f"https://api.openf1.org/v1/sessions?year={year}"
-                sessions_response = requests.get(sessions_url, timeout=10)
-                if sessions_response.status_code == 200:
-                    sessions.extend(sessions_response.json())
+                sessions_url = f"{OPENF1_BASE_URL}/v1/sessions?year={year}"
+                sessions_response = fetch_json(sessions_url, timeout=10)
+                if sessions_response.status == 200:
+                    sessions.extend(sessions_response.data)
             except Exception as e:
                 logger.error(f"Error fetching sessions for year {year}: {e}")
                 continue
 
         if not sessions:
-            return TRANSLATIONS["no_sessions"]
+            return text["no_sessions"]
 
         latest_session = None
         for session in reversed(sessions):
@@ -870,7 +902,7 @@ def get_last_session_results():
                     continue
 
         if not latest_session:
-            return TRANSLATIONS["no_recent_sessions"]
+            return text["no_recent_sessions"]
 
         session_key = latest_session.get("session_key")
         session_type = latest_session.get("session_type")
@@ -879,36 +911,31 @@ def get_last_session_results():
         flag = get_country_flag(country_name)
 
         # Get positions
-        results_url = f"https://api.openf1.org/v1/position?session_key={session_key}"
-        results_response = requests.get(results_url, timeout=10)
-        if results_response.status_code != 200:
-            return TRANSLATIONS["no_results"].format(session_type)
-
-        positions_data = results_response.json()
-        if not positions_data:
-            return TRANSLATIONS["no_position_data"].format(session_type)
-
-        final_positions = {}
-        for pos_entry in positions_data:
-            driver_number = pos_entry.get("driver_number")
-            position = pos_entry.get("position")
-            date = pos_entry.get("date")
-
-            if driver_number and position and date:
-                if (
-                    driver_number not in final_positions
-                    or date > final_positions[driver_number]["date"]
-                ):
-                    final_positions[driver_number] = {
-                        "position": position,
-                        "date": date,
-                    }
+        # Streamed: a session's whole position history is never held at once
+        results_url = f"{OPENF1_BASE_URL}/v1/position?session_key={session_key}"
+        results_response = fetch_json(results_url, timeout=10, reduce=latest_positions)
+        if results_response.status != 200:
+            return text["no_results"].format(session_type)
+
+        final_positions = {
+            driver_number: {"position": entry["position"], "date": entry["date"]}
+            for driver_number, entry in results_response.data.items()
+            if driver_number
+        }
+        if not final_positions:
+            return text["no_position_data"].format(session_type)
+
+        drivers_url = f"{OPENF1_BASE_URL}/v1/drivers?session_key={session_key}"
+        drivers_response = fetch_json(drivers_url, timeout=10)
+        version = f"{session_key}:{results_response.version}:{drivers_response.version}"
+        document = built("last_session", version)
+        if document:
+            set_cached_data("last_session", document)
+            return render_document("last_session", locale, document)
 
-        drivers_url = f"https://api.openf1.org/v1/drivers?session_key={session_key}"
-        drivers_response = requests.get(drivers_url, timeout=10)
         drivers_info = {}
-        if drivers_response.status_code == 200:
-            d_list = drivers_response.json()
+        if drivers_response.status == 200:
+            d_list = drivers_response.data
             logger.info(f"OpenF1 drivers count for session {session_key}: {len(d_list)}")
             for driver in d_list:
                 # Use string keys for consistency
@@ -936,15 +963,16 @@ def get_last_session_results():
             final_positions.items(), key=lambda x: x[1]["position"]
         )
         if not sorted_positions:
-            return TRANSLATIONS["no_final_positions"].format(session_type)
+            return text["no_final_positions"].format(session_type)
 
         emoji = (
             "🏁"
             if session_type == "Sprint"
             else "⏱️" if session_type == "Qualifying" else "🏆"
         )
-        session_type_az = TRANSLATIONS.get(session_type.lower(), session_type)
-        message = f"{emoji} {flag} *{meeting_name} {session_type_az}*\n\n"
+        parts = [["header", {
+            "emoji": emoji, "flag": flag, "meeting": meeting_name, "session": session_type.lower(),
+        }]]
 
         for driver_number, pos_data in sorted_positions[:20]:
             position = pos_data["position"]
@@ -957,313 +985,119 @@ def get_last_session_results():
             team_name = d_info.get("team", "")
 
             if position <= 3:
-                logger.info(f"Leaderboard P{position}: {driver_name} ({driver_country})")
-
-            line = f"{position}. {driver_flag} {driver_name}"
+                log.debug(
+                    "leaderboard",
+                    position=position,
+                    driver=driver_name,
+                    country=driver_country,
+                    sample="leaderboard",
+                )
 
+            part = "winner" if position == 1 else "row"
             if session_type in ["Race", "Sprint"] and team_name:
-                line += f" ({team_name})"
-
-            if position == 1:
-                line += f" - {TRANSLATIONS['winner']}"
+                part += "_team"
+            parts.append([part, {"position": position, "flag": driver_flag, "name": driver_name, "team": team_name}])
 
-            message += line + "\n"
-
-        # Cache the result
-        set_cached_data("last_session", message)
-        return message
+        # Cache the data; every locale renders from it
+        document = make_document(parts, version)
+        remember_document("last_session", document)
+        set_cached_data("last_session", document)
+        return render_document("last_session", locale, document)
 
     except Exception as e:
         logger.error(f"Error in get_last_session_results: {e}")
-        return TRANSLATIONS["error_fetching_session"].format(str(e))
+        return text["error_fetching_session"].format(str(e))
 
 
-def get_f1_season_calendar():
-    """Fetch and display the current F1 season's race schedule"""
+def get_f1_season_calendar(tz=DEFAULT_TIMEZONE, locale=DEFAULT_LOCALE):
+    """Render the current F1 season's race schedule, with dates in `tz`"""
+    text = strings(locale)
     try:
-        logger.info("Fetching F1 season calendar")
-        now = datetime.now(ZoneInfo("UTC"))
-        season = now.year if now.month >= 1 else now.year - 1
-
-        # Try multiple APIs
-        apis = [
-            f"https://api.jolpi.ca/ergast/f1/{season}.json",
-        ]
-
-        data = None
-        for api_url in apis:
-            try:
-                response = requests.get(api_url, timeout=30)
-                if response.status_code == 200:
-                    data = response.json()
-                    break
-            except Exception as e:
-                logger.error(f"Error fetching calendar from {api_url}: {e}")
-                continue
-
-        if not data:
-            return TRANSLATIONS["api_unavailable"]
-
-        try:
-            races = data.get("MRData", {}).get("RaceTable", {}).get("Races", [])
-            if not races:
-                return TRANSLATIONS["no_race_schedule"]
-        except Exception as e:
-            logger.error(f"Error parsing calendar data: {e}")
-            return TRANSLATIONS["invalid_data"]
-
-        # Check for sprint weekends using OpenF1 API as fallback
-        sprint_weekends = {}
-        try:
-            sessions_url = f"https://api.openf1.org/v1/sessions?year={season}"
-            sessions_response = requests.get(sessions_url, timeout=10)
-            if sessions_response.status_code == 200:
-                sessions = sessions_response.json()
-                # Normalize country names to match Ergast
-                country_map = {
-                    "United Kingdom": "UK",
-                    "United States": "USA",
-                    "United Arab Emirates": "UAE"
-                }
-                for session in sessions:
-                    if session.get("session_name") == "Sprint":
-                        country_name = session.get("country_name", "")
-                        if country_name:
-                            # Add both original and mapped name
-                            sprint_weekends[country_name] = True
-                            if country_name in country_map:
-                                sprint_weekends[country_map[country_name]] = True
-                            # Case-insensitive too
-                            sprint_weekends[country_name.lower()] = True
-        except Exception as e:
-            logger.warning(f"Could not fetch sprint data from OpenF1: {e}")
-
-        message = f"{season} F1 Mövsüm Cədvəli\n\n"
-
-        for race in races:
-            try:
-                race_name = race.get("raceName", "Grand Prix")
-                circuit = race.get("Circuit", {})
-                location = circuit.get("Location", {})
-                locality = location.get("locality", "")
-                country = location.get("country", "")
-                race_date = race.get("date")
-                race_time = race.get("time", "TBA")
+        # Built once per timezone in use, rendered once per locale
+        cached = get_cached_data(f"calendar:{tz}")
+        if is_document(cached):
+            return render_document(f"calendar:{tz}", locale, cached)
 
-                flag = get_country_flag(country)
-
-                # Calculate weekend range
-                try:
-                    # Use FirstPractice for start of weekend if available, else fallback to 2 days before race
-                    fp1_date = race.get("FirstPractice", {}).get("date")
-                    
-                    if race_date:
-                        if 'T' in race_date:
-                            race_dt = datetime.fromisoformat(race_date.replace("Z", "+00:00"))
-                        else:
-                            race_dt = datetime.strptime(race_date, "%Y-%m-%d")
-                        
-                        if fp1_date:
-                            weekend_start = datetime.strptime(fp1_date, "%Y-%m-%d")
-                        else:
-                            weekend_start = race_dt - timedelta(days=2)
-                        
-                        weekend_end = race_dt
-
-                        # Format as "Mar 03-05"
-                        if weekend_start.month == weekend_end.month:
-                            weekend_range = f"{weekend_start.strftime('%b')} {weekend_start.day:02d}-{weekend_end.day:02d}"
-                        else:
-                            weekend_range = f"{weekend_start.strftime('%b %d')}-{weekend_end.strftime('%b %d')}"
-                    else:
-                        weekend_range = "TBA"
-                except Exception as e:
-                    logger.warning(f"Could not calculate weekend range for {race_date}: {e}")
-                    weekend_range = race_date or "TBA"
-
-                # Check if this is a sprint weekend
-                # Primary source: Jolpi/Ergast has a 'Sprint' key
-                is_sprint_weekend = bool(race.get("Sprint"))
-                sprint_indicator = " ⚡️Sprint" if is_sprint_weekend else ""
-
-                message += f"{flag} {locality}, {weekend_range}{sprint_indicator}\n"
-
-            except Exception as e:
-                logger.error(f"Error processing race data: {e}")
-                continue
-
-        return message
+        logger.info("Fetching F1 season calendar")
+        season = get_season()
+        if season is None:
+            return text["api_unavailable"]
+        if not season.weekends:
+            return text["no_race_schedule"]
+        update_circuit_index(season.races)
+
+        parts = [["header", {"season": season.year}]]
+        for weekend in season.weekends:
+            parts.append(["row_sprint" if weekend.is_sprint else "row", {
+                "flag": get_country_flag(weekend.country),
+                "locality": weekend.locality,
+                "weekend_range": weekend.local(tz).weekend_range,
+            }])
+
+        document = make_document(parts)
+        set_cached_data(f"calendar:{tz}", document)
+        return render_document(f"calendar:{tz}", locale, document)
     except Exception as e:
         logger.error(f"Error in get_f1_season_calendar: {e}")
-        return TRANSLATIONS["error_fetching_race"].format(str(e))
+        return text["error_fetching_race"].format(str(e))
 
 
-def get_next_race():
-    """Get next race schedule using Jolpica API with caching"""
+def get_next_race(tz=DEFAULT_TIMEZONE, locale=DEFAULT_LOCALE):
+    """Get next race schedule using Jolpica API with caching, times in `tz`"""
+    text = strings(locale)
     try:
-        # Check cache first
-        cached = get_cached_data("next_race")
-        if cached:
-            return cached
+        # Built once per timezone in use, rendered once per locale, not per chat
+        cached = get_cached_data(f"next_race:{tz}")
+        if is_document(cached):
+            return render_document(f"next_race:{tz}", locale, cached)
 
         logger.info("Fetching next race schedule from API")
-        now = datetime.now(ZoneInfo("UTC"))
-        season = now.year if now.month >= 1 else now.year - 1
-
-        # Try multiple APIs
-        apis = [
-            f"https://api.jolpi.ca/ergast/f1/{season}.json",
-        ]
-
-        data = None
-        for api_url in apis:
-            try:
-                response = requests.get(api_url, timeout=30)
-                if response.status_code == 200:
-                    data = response.json()
-                    break
-            except Exception as e:
-                logger.error(f"Error fetching race schedule from {api_url}: {e}")
-                continue
-
-        if not data:
-            return TRANSLATIONS["api_unavailable"]
-
-        try:
-            races = data.get("MRData", {}).get("RaceTable", {}).get("Races", [])
-            if not races:
-                return TRANSLATIONS["no_race_schedule"]
-        except Exception as e:
-            logger.error(f"Error parsing race data: {e}")
-            return TRANSLATIONS["invalid_data"]
-
-        # Find next race
-        next_race = None
-        for race in races:
-            try:
-                race_date = race.get("date")
-                race_time = race.get("time", "00:00")
-
-                if race_date:
-                    race_dt_str = f"{race_date}T{race_time.replace('Z', '')}"
-                    race_dt = datetime.fromisoformat(race_dt_str)
-                    if race_dt.tzinfo is None:
-                        race_dt = race_dt.replace(tzinfo=ZoneInfo("UTC"))
-
-                    if race_dt >= now:
-                        next_race = race
-                        break
-            except Exception as e:
-                logger.error(f"Error parsing race date/time: {e}")
-                continue
-
+        season = get_season()
+        if season is None:
+            return text["api_unavailable"]
+        if not season.weekends:
+            return text["no_race_schedule"]
+        update_circuit_index(season.races)
+
+        next_race = season.next_race()
         if not next_race:
-            return TRANSLATIONS["season_completed"]
-
-        # Extract race info
-        race_name = next_race.get("raceName", "Grand Prix")
-        circuit = next_race.get("Circuit", {})
-        location = circuit.get("Location", {})
-        locality = location.get("locality", "")
-        country = location.get("country", "")
+            return text["season_completed"]
 
-        flag = get_country_flag(country)
+        circuit = next_race.circuit
+        locality = next_race.locality
+        flag = get_country_flag(next_race.country)
 
-        message = f"{TRANSLATIONS['next_race']}\n"
-        message += f"{flag} *{race_name}*\n\n"
+        parts = [["header", {"flag": flag, "name": next_race.name}]]
 
-        # Collect all sessions with times
-        sessions = []
+        # Sessions are already in chronological order
+        for kind, local_time in next_race.local(tz).sessions:
+            parts.append(["session", {"kind": kind, "time": local_time}])
 
-        # FP1
-        fp1 = next_race.get("FirstPractice", {})
-        fp1_date = fp1.get("date")
-        fp1_time = fp1.get("time", "TBA")
-        if fp1_date and fp1_time != "TBA":
-            sessions.append((fp1_date, fp1_time, TRANSLATIONS["fp1"]))
-
-        # FP2
-        fp2 = next_race.get("SecondPractice", {})
-        fp2_date = fp2.get("date")
-        fp2_time = fp2.get("time", "TBA")
-        if fp2_date and fp2_time != "TBA":
-            sessions.append((fp2_date, fp2_time, TRANSLATIONS["fp2"]))
-
-        # FP3
-        fp3 = next_race.get("ThirdPractice", {})
-        fp3_date = fp3.get("date")
-        fp3_time = fp3.get("time", "TBA")
-        if fp3_date and fp3_time != "TBA":
-            sessions.append((fp3_date, fp3_time, TRANSLATIONS["fp3"]))
-
-        # Sprint Qualifying
-        sprint_quali = next_race.get("SprintQualifying", {})
-        sq_date = sprint_quali.get("date")
-        sq_time = sprint_quali.get("time", "TBA")
-        if sq_date and sq_time != "TBA":
-            sessions.append((sq_date, sq_time, TRANSLATIONS["sprint_qualifying"]))
-
-        # Sprint
-        sprint = next_race.get("Sprint", {})
-        sprint_date = sprint.get("date")
-        sprint_time = sprint.get("time", "TBA")
-        if sprint_date and sprint_time != "TBA":
-            sessions.append((sprint_date, sprint_time, TRANSLATIONS["sprint"]))
-
-        # Qualifying
-        quali = next_race.get("Qualifying", {})
-        quali_date = quali.get("date")
-        quali_time = quali.get("time", "TBA")
-        if quali_date and quali_time != "TBA":
-            sessions.append((quali_date, quali_time, TRANSLATIONS["qualifying"]))
-
-        # Race
-        race_date = next_race.get("date")
-        race_time = next_race.get("time", "TBA")
-        if race_date and race_time != "TBA":
-            sessions.append((race_date, race_time, TRANSLATIONS["race"]))
-
-        # Sort sessions by date and time
-        sessions.sort(key=lambda x: (x[0], x[1]))
-
-        # Display sessions in chronological order
-        for session_date, session_time, session_name in sessions:
-            baku_time = to_baku(session_date, session_time)
-            message += f"*{session_name}:* {baku_time}\n"
-
-        message += f"\n_{TRANSLATIONS['all_times_baku']}_\n"
+        parts.append(["note_baku", {}] if tz == "Asia/Baku" else ["note_tz", {"tz": tz}])
 
         # Add weather forecast with separate caching
-        weather_cached = get_cached_data("weather")
-        if weather_cached:
-            message += weather_cached
-        else:
+        weather = get_cached_data("weather")
+        if not isinstance(weather, list):
+            weather = []
             try:
-                coords = get_circuit_coordinates(locality)
-                if coords and race_date:
-                    race_date_obj = datetime.fromisoformat(race_date)
-                    friday = race_date_obj - timedelta(days=2)
-                    saturday = race_date_obj - timedelta(days=1)
-                    sunday = race_date_obj
+                coords = get_circuit_coordinates(circuit.get("circuitName") or locality)
+                if coords:
+                    sunday = next_race.weekend_end
+                    friday = sunday - timedelta(days=2)
 
-                    meteo_url = f"https://api.open-meteo.com/v1/forecast?latitude={coords[0]}&longitude={coords[1]}&daily=temperature_2m_max,precipitation_probability_max,wind_speed_10m_max&start_date={friday.date()}&end_date={sunday.date()}"
-                    weather_response = requests.get(meteo_url, timeout=15)
+                    meteo_url = f"{OPEN_METEO_BASE_URL}/v1/forecast?latitude={coords[0]}&longitude={coords[1]}&daily=temperature_2m_max,precipitation_probability_max,wind_speed_10m_max&start_date={friday}&end_date={sunday}"
+                    weather_response = http_get(meteo_url, timeout=15)
 
                     if weather_response.status_code == 200:
-                        weather_data = weather_response.json()
+                        weather_data = f1_json.loads(weather_response.content)
                         daily = weather_data.get("daily", {})
                         temps = daily.get("temperature_2m_max", [])
                         rain_probs = daily.get("precipitation_probability_max", [])
                         wind_speeds = daily.get("wind_speed_10m_max", [])
 
                         if temps and len(temps) >= 3:
-                            weather_message = "\n🌤️ *Hava proqnozu:*\n"
-                            days = [
-                                TRANSLATIONS["friday"],
-                                TRANSLATIONS["saturday"],
-                                TRANSLATIONS["sunday"],
-                            ]
-                            for i, day in enumerate(days):
+                            weather = [["weather_header", {}]]
+                            for i, day in enumerate(("friday", "saturday", "sunday")):
                                 if i < len(temps):
                                     temp = temps[i]
                                     rain = rain_probs[i] if i < len(rain_probs) else 0
@@ -1271,61 +1105,460 @@ def get_next_race():
                                     rain_icon = (
                                         "🌧️" if rain >= 60 else "⛅" if rain >= 30 else "☀️"
                                     )
-                                    weather_message += f"{day}: {temp:.1f}°C {rain_icon} {int(rain)}% 💨{wind:.1f}km/h\n"
-                            message += weather_message
-                            set_cached_data("weather", weather_message)
+                                    weather.append(["weather_day", {
+                                        "day": day, "temp": temp, "icon": rain_icon, "rain": int(rain), "wind": wind,
+                                    }])
+                            set_cached_data("weather", weather)
             except Exception as e:
                 logger.error(f"Error fetching weather data: {e}")
                 pass
+        parts += weather
 
-        # Cache the complete result
-        set_cached_data("next_race", message)
-        return message
+        # Cache the data; every locale renders from it
+        document = make_document(parts)
+        set_cached_data(f"next_race:{tz}", document)
+        return render_document(f"next_race:{tz}", locale, document)
     except Exception as e:
         logger.error(f"Error in get_next_race: {e}")
-        return TRANSLATIONS["error_fetching_race"].format(str(e))
+        return text["error_fetching_race"].format(str(e))
 
 
 
 
-# Global cache for API data to optimize Leapcell limits
+# Cache expiry per key to optimize Leapcell limits; entries live in the
+# state backend so every replica shares them.
 # APIs update weekend-by-weekend, so long cache times are appropriate
 CACHE = {
-    "standings": {"data": None, "timestamp": None, "expiry": 86400},  # 24 hours (updates weekly)
-    "constructor_standings": {"data": None, "timestamp": None, "expiry": 86400},  # 24 hours
-    "last_session": {"data": None, "timestamp": None, "expiry": 604800},  # 1 week (results don't change)
-    "next_race": {"data": None, "timestamp": None, "expiry": 86400},  # 24 hours
-    "calendar": {"data": None, "timestamp": None, "expiry": 604800},  # 1 week (season schedule)
-    "weather": {"data": None, "timestamp": None, "expiry": 21600},  # 6 hours
-    "active_session": {"data": None, "timestamp": None, "expiry": 300},  # 5 minutes (for live checks)
-    "live_session": {"data": None, "timestamp": None, "expiry": 30},  # 30 seconds (live session info)
+    "standings": {"expiry": 86400},  # 24 hours (updates weekly)
+    "constructor_standings": {"expiry": 86400},  # 24 hours
+    "last_session": {"expiry": 604800},  # 1 week (results don't change)
+    "next_race": {"expiry": 86400},  # 24 hours
+    "calendar": {"expiry": 604800},  # 1 week (season schedule)
+    "weather": {"expiry": 21600},  # 6 hours
+    "active_session": {"expiry": 300},  # 5 minutes (for live checks)
+    "live_session": {"expiry": 30},  # 30 seconds (live session info)
+    "live_positions": {"expiry": 15},  # 15 seconds, per session key
 }
 
 
+def _cache_expiry(cache_key):
+    """Expiry for a key; variants like "next_race:Europe/Rome" share their base entry"""
+    entry = CACHE.get(cache_key.split(":", 1)[0])
+    return entry["expiry"] if entry else None
+
+
 def get_cached_data(cache_key):
     """Retrieve cached data if available and not expired"""
-    cache_entry = CACHE.get(cache_key)
-    if cache_entry and cache_entry["data"] and cache_entry["timestamp"]:
-        now = datetime.now(ZoneInfo("UTC")).timestamp()
-        if now - cache_entry["timestamp"] < cache_entry["expiry"]:
-            return cache_entry["data"]
+    data = _state_get(f"cache:{cache_key}") if _cache_expiry(cache_key) else None
+    if data:
+        f1_metrics.record_cache(cache_key, True)
+        return data
+    f1_metrics.record_cache(cache_key, False)
     return None
 
 
 def set_cached_data(cache_key, data):
-    """Cache data with current timestamp"""
-    if cache_key in CACHE:
-        CACHE[cache_key]["data"] = data
-        CACHE[cache_key]["timestamp"] = datetime.now(ZoneInfo("UTC")).timestamp()
+    """Cache data with the key's expiry"""
+    expiry = _cache_expiry(cache_key)
+    if expiry:
+        _state_set(f"cache:{cache_key}", data, expiry)
+
+
+# Last document built per view, with the upstream data version it came from.
+# A refetch that returns the same version reuses it instead of parsing the
+# data again; f1_locale then reuses the messages rendered from it.
+_documents = {}
+
+
+def built(view, version):
+    """The document already built for `view` from this data version, or None"""
+    document = _documents.get(view)
+    if document is None or version is None or document["version"] != version:
+        return None
+    return document
+
+
+def remember_document(view, document):
+    _documents[view] = document
+
+
+# ==================== RESULTS ARCHIVE ====================
+
+def _archived_name(row):
+    return f"{row['given_name']} {row['family_name']}".strip()
+
+
+def archive_version(*seasons):
+    """Version of documents built from these archived seasons; None if none is archived"""
+    revisions = get_stats().revisions()
+    if not any(season in revisions for season in seasons):
+        return None
+    return "|".join(f"{season}:{revisions.get(season)}" for season in seasons)
+
+
+def get_archived_results(season=None, rnd=None, locale=DEFAULT_LOCALE):
+    """Render one race from the local archive (default: the newest archived race)"""
+    text = strings(locale)
+    archive = get_archive()
+    if season is None:
+        latest = archive.latest_round()
+        if latest is None:
+            return text["archive_empty"]
+        season, rnd = latest
+
+    # Built once per archive revision of the season, rendered once per locale
+    view = f"results:{season}:{rnd}"
+    version = archive_version(season)
+    document = built(view, version)
+    if document:
+        return render_document(view, locale, document)
+
+    race = archive.race(season, rnd)
+    results = archive.results(season, rnd)
+    if race is None or not results:
+        return text["results_not_archived"].format(season, rnd)
+
+    parts = [["header", {
+        "season": season,
+        "name": race["name"],
+        "round": rnd,
+        "place": ", ".join(part for part in (race["circuit_name"], race["locality"]) if part),
+        "date": race["date"],
+    }]]
+    for row in results:
+        parts.append(["row_team" if row["constructor"] else "row", {
+            "position": row["position_text"],
+            "flag": get_country_flag(row["nationality"]),
+            "name": _archived_name(row),
+            "team": row["constructor"],
+            "result": row["time"] or row["status"],
+        }])
+        if row["points"]:
+            parts.append(["row_points", {"points": row["points"]}])
+        parts.append(["row_end", {}])
+
+    qualifying = archive.qualifying(season, rnd)
+    sprint = archive.results(season, rnd, "sprint")
+    if qualifying or sprint:
+        parts.append(["extras", {}])
+    if qualifying:
+        parts.append(["pole", {"name": _archived_name(qualifying[0])}])
+    if sprint:
+        parts.append(["sprint_winner", {"name": _archived_name(sprint[0])}])
+
+    document = make_document(parts, version)
+    remember_document(view, document)
+    return render_document(view, locale, document)
+
+
+# ==================== STATISTICS ====================
+
+SPARK_LEVELS = "▁▂▃▄▅▆▇█"
+
+
+def _sparkline(values, top):
+    if not top:
+        return SPARK_LEVELS[0] * len(values)
+    return "".join(SPARK_LEVELS[min(7, round(v / top * 7))] for v in values)
+
+
+def stats_keyboard(season, locale=DEFAULT_LOCALE):
+    text = strings(locale)
+    return InlineKeyboardMarkup([
+        [
+            InlineKeyboardButton(text["points_progression"], callback_data=f"stats:progression:{season}"),
+            InlineKeyboardButton(text["average_finish"], callback_data=f"stats:average:{season}"),
+        ],
+        [InlineKeyboardButton(text["dnf_rate"], callback_data=f"stats:dnf:{season}")],
+        [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")],
+    ])
+
+
+def get_season_stats(view="progression", season=None, locale=DEFAULT_LOCALE):
+    """(season, message) for one statistics view of a season from the archive"""
+    text = strings(locale)
+    stats = get_stats()
+    season = season or stats.latest_season()
+    if season is None:
+        return None, text["archive_empty"]
+
+    if view == "average":
+        rows = stats.average_finish(season)
+        parts = [["average_row", {"rank": i, "code": row.code, "value": row.value, "starts": row.starts}]
+                 for i, row in enumerate(rows, 1)]
+    elif view == "dnf":
+        rows = stats.dnf_rate(season)
+        parts = [["dnf_row", {"rank": i, "code": row.code, "value": row.value,
+                              "dnfs": round(row.value * row.starts), "starts": row.starts}]
+                 for i, row in enumerate(rows, 1)]
+    else:
+        view = "progression"
+        progression = stats.points_progression(season)
+        rows = progression.drivers if progression else ()
+        top = max((points[-1] for _, points in rows), default=0)
+        parts = [["progression_start", {}]] + [
+            ["progression_row", {"code": code, "spark": _sparkline(points, top), "points": points[-1]}]
+            for code, points in rows
+        ] + [["progression_end", {}]]
+
+    if not rows:
+        return season, text["stats_unavailable"].format(season)
+    title = {"progression": "points_progression", "average": "average_finish", "dnf": "dnf_rate"}[view]
+    parts.insert(0, ["header", {"title": title, "season": season}])
+    document = make_document(parts, archive_version(season))
+    return season, render_document(f"stats:{view}:{season}", locale, document)
+
+
+def get_head_to_head(first, second, season=None, locale=DEFAULT_LOCALE):
+    text = strings(locale)
+    stats = get_stats()
+    season = season or stats.latest_season()
+    if season is None:
+        return text["archive_empty"]
+    if season not in stats.revisions():
+        return text["stats_unavailable"].format(season)
+    h2h = stats.head_to_head(first, second, season)
+    if h2h is None:
+        return text["h2h_unknown"].format(season, first, second)
+    a, b = h2h.drivers
+    finish = [f"{f:.2f}" if f is not None else "-" for f in h2h.avg_finish]
+    fields = {"first": a, "second": b, "season": h2h.season}
+    for name, pair in (("race", h2h.race), ("qualifying", h2h.qualifying), ("points", h2h.points),
+                       ("finish", finish), ("dnfs", h2h.dnfs)):
+        fields[f"{name}_a"], fields[f"{name}_b"] = pair
+    document = make_document([["h2h", fields]], archive_version(season))
+    return render_document(f"stats:h2h:{a}:{b}:{season}", locale, document)
+
+
+def get_average_finish_at(circuit, locale=DEFAULT_LOCALE):
+    text = strings(locale)
+    stats = get_stats()
+    rows = stats.average_finish(circuit=circuit)
+    if not rows:
+        return text["avgfinish_none"].format(circuit)
+    parts = [["circuit_header", {"circuit": circuit.title()}]] + [
+        ["average_row", {"rank": i, "code": row.code, "value": row.value, "starts": row.starts}]
+        for i, row in enumerate(rows, 1)
+    ]
+    document = make_document(parts, archive_version(*sorted(stats.revisions())))
+    return render_document(f"stats:circuit:{circuit.lower()}", locale, document)
+
+
+@profiled
+async def archive_update_job(context: ContextTypes.DEFAULT_TYPE):
+    """Archive the sessions that finished since the last pass"""
+    # Nobody is waiting on this; it must not take budget from users or live polls
+    with request_priority(PREFETCH):
+        await asyncio.to_thread(get_archive().update)
+
+
+# ==================== INLINE SEARCH ====================
+
+# Standings change once a weekend and the schedule rarely; hourly is plenty
+SEARCH_INDEX_INTERVAL = 3600
+INLINE_RESULTS = 20
+# Telegram caches an answer this long for everyone sending the same query
+INLINE_CACHE_TIME = 300
+
+_search_build_lock = asyncio.Lock()
+
+
+def _standings_rows(kind, key):
+    """Rows of the current driverStandings/constructorStandings, or [] if unavailable"""
+    now = datetime.now()
+    season = now.year if now.month > 3 else now.year - 1
+    try:
+        response = fetch_json(f"{JOLPICA_BASE_URL}/ergast/f1/{season}/{kind}.json", timeout=30)
+        if response.status != 200:
+            return []
+        lists = response.data.get("MRData", {}).get("StandingsTable", {}).get("StandingsLists", [])
+        return lists[0].get(key, []) if lists else []
+    except Exception as e:
+        logger.warning(f"Search index: {kind} unavailable: {e}")
+        return []
 
 
-# Backward compatibility
-def get_cached_calendar():
-    return get_cached_data("calendar")
+def _inline_article(key, title, description, text):
+    return InlineQueryResultArticle(
+        id=key, title=title, description=description,
+        input_message_content=InputTextMessageContent(text, parse_mode="Markdown"),
+    )
+
+
+class InlineCard:
+    """A search entry's inline article in each locale (and timezone, if `zoned`), built once per variant.
+
+    `render(locale, tz)` gives (title, description, text).
+    """
+
+    def __init__(self, key, render, zoned=False):
+        self.key = key
+        self.render = render
+        self.zoned = zoned
+        self._articles = {}
+
+    def article(self, locale, tz=DEFAULT_TIMEZONE):
+        variant = (locale, tz if self.zoned else None)
+        article = self._articles.get(variant)
+        if article is None:
+            article = self._articles[variant] = _inline_article(self.key, *self.render(locale, tz))
+        return article
+
+
+# Cards render lazily, after the entry loops are done, so the renderers take
+# every value as an argument (bound with functools.partial), never a loop variable
+
+def _driver_article(name, code, number, flag, team, position, points, wins, locale, tz):
+    text = strings(locale)
+    return (
+        f"{position}. {name} ({code})",
+        f"{team} - {points} {text['points']}",
+        f"{flag} *{name}* {code} {number}\n🏎️ {team}\n{text['championship_line'].format(position, points, wins)}",
+    )
+
+
+def _entrant_article(name, code, number, nationality, locale, tz):
+    return (
+        f"{name} ({code})",
+        nationality,
+        f"{get_country_flag(nationality)} *{name}* {code} {number}",
+    )
+
+
+def _team_article(name, flag, members, position, points, wins, locale, tz):
+    text = strings(locale)
+    return (
+        f"{position}. {name}",
+        f"{points} {text['points']}",
+        f"{flag} *{name}*\n👥 {members}\n{text['championship_line'].format(position, points, wins)}",
+    )
+
+
+def _driver_entries(driver_standings):
+    entries = []
+    for row in driver_standings:
+        driver = row.get("Driver", {})
+        driver_id = driver.get("driverId")
+        if not driver_id:
+            continue
+        name = f"{driver.get('givenName', '')} {driver.get('familyName', '')}".strip()
+        code = driver.get("code") or ""
+        number = f"#{driver['permanentNumber']}" if driver.get("permanentNumber") else ""
+        flag = get_country_flag(driver.get("nationality", ""))
+        team = ", ".join(c.get("name", "") for c in row.get("Constructors", []))
+        position, points, wins = row.get("position", "?"), row.get("points", "0"), row.get("wins", "0")
+        key = f"driver:{driver_id}"
+        card = InlineCard(key, functools.partial(
+            _driver_article, name, code, number, flag, team, position, points, wins
+        ))
+        names = (name, code, driver_id, number)
+        entries.append(SearchEntry(key, "driver", int(row.get("position") or 99), names, card))
+
+    # Drivers entered this season who haven't scored a place in the standings yet
+    listed = {entry.key for entry in entries}
+    for driver_id, info in get_driver_data().items():
+        key = f"driver:{driver_id}"
+        if key in listed:
+            continue
+        code = info.get("code") or ""
+        number = f"#{info['permanentNumber']}" if info.get("permanentNumber") else ""
+        card = InlineCard(key, functools.partial(
+            _entrant_article, info["full_name"], code, number, info.get("nationality", "")
+        ))
+        entries.append(SearchEntry(key, "driver", 100, (info["full_name"], code, driver_id, number), card))
+    return entries
+
+
+def _team_entries(constructor_standings, driver_standings):
+    drivers = {}
+    for row in driver_standings:
+        driver = row.get("Driver", {})
+        for constructor in row.get("Constructors", []):
+            drivers.setdefault(constructor.get("constructorId"), []).append(
+                f"{driver.get('givenName', '')} {driver.get('familyName', '')}".strip()
+            )
+
+    entries = []
+    for row in constructor_standings:
+        constructor = row.get("Constructor", {})
+        constructor_id = constructor.get("constructorId")
+        if not constructor_id:
+            continue
+        name = constructor.get("name", constructor_id)
+        flag = get_country_flag(constructor.get("nationality", ""))
+        members = ", ".join(drivers.get(constructor_id, []))
+        position, points, wins = row.get("position", "?"), row.get("points", "0"), row.get("wins", "0")
+        key = f"team:{constructor_id}"
+        card = InlineCard(key, functools.partial(_team_article, name, flag, members, position, points, wins))
+        rank = 200 + int(row.get("position") or 99)
+        entries.append(SearchEntry(key, "team", rank, (name, constructor_id), card))
+    return entries
+
+
+def _race_article(weekend, locale, tz):
+    text = strings(locale)
+    circuit_name = weekend.circuit.get("circuitName", "")
+    local = weekend.local(tz)
+    sprint = " ⚡️Sprint" if weekend.is_sprint else ""
+    return (
+        f"{text['round']} {weekend.round}: {weekend.name}",
+        f"{weekend.locality}, {weekend.country} - {local.weekend_range}{sprint}",
+        f"{get_country_flag(weekend.country)} *{weekend.name}*\n"
+        f"📍 {circuit_name}, {weekend.locality}\n"
+        f"{text['round']} {weekend.round} - {local.weekend_range}{sprint}\n\n"
+        + "".join(f"*{text[kind]}:* {local_time}\n" for kind, local_time in local.sessions)
+        + f"\n{times_note(tz, locale)}",
+    )
+
+
+def _race_entries(season):
+    next_race = season.next_race()
+    entries = []
+    for weekend in season.weekends:
+        circuit_name = weekend.circuit.get("circuitName", "")
+        key = f"race:{season.year}:{weekend.round}"
+        card = InlineCard(key, functools.partial(_race_article, weekend), zoned=True)
+        # The next race heads the list shown before anything is typed
+        rank = 0 if weekend is next_race else 300 + weekend.round
+        names = (weekend.name, circuit_name, weekend.circuit.get("circuitId", ""), weekend.locality, weekend.country)
+        entries.append(SearchEntry(key, "race", rank, names, card))
+    return entries
+
+
+def build_search_entries():
+    """Search entries for this season's drivers, teams and race weekends"""
+    driver_standings = _standings_rows("driverStandings", "DriverStandings")
+    constructor_standings = _standings_rows("constructorStandings", "ConstructorStandings")
+    entries = _driver_entries(driver_standings) + _team_entries(constructor_standings, driver_standings)
+    season = get_season()
+    if season is not None:
+        entries += _race_entries(season)
+    return entries
+
+
+def refresh_search_index():
+    """Rebuild the inline search index; the old one stays if nothing could be fetched"""
+    try:
+        entries = build_search_entries()
+    except Exception as e:
+        logger.error(f"Error building search index: {e}")
+        return
+    if not entries:
+        return
+    # Prebuild every variant chats use now, so queries never render
+    zones = get_preferences().values("timezone") | {DEFAULT_TIMEZONE}
+    for entry in entries:
+        for locale in LOCALES:
+            for tz in zones if entry.payload.zoned else (DEFAULT_TIMEZONE,):
+                entry.payload.article(locale, tz)
+    get_search().replace(entries)
 
 
-def set_cached_calendar(data):
-    set_cached_data("calendar", data)
+@profiled
+async def search_index_job(context: ContextTypes.DEFAULT_TYPE):
+    """Rebuild the inline search index from the latest standings and schedule"""
+    with request_priority(PREFETCH):
+        await asyncio.to_thread(refresh_search_index)
 
 
 # ==================== LIVE TIMING ENHANCEMENTS ====================
@@ -1354,10 +1587,10 @@ def get_live_session_info():
         sessions = []
         for year in years_to_check:
             try:
-                sessions_url = f"https://api.openf1.org/v1/sessions?year={year}"
-                sessions_response = requests.get(sessions_url, timeout=10)
-                if sessions_response.status_code == 200:
-                    sessions.extend(sessions_response.json())
+                sessions_url = f"{OPENF1_BASE_URL}/v1/sessions?year={year}"
+                sessions_response = fetch_json(sessions_url, timeout=10)
+                if sessions_response.status == 200:
+                    sessions.extend(sessions_response.data)
             except Exception as e:
                 logger.error(f"Error fetching sessions for year {year}: {e}")
                 continue
@@ -1439,7 +1672,7 @@ def get_live_positions(session_key):
             return []
 
         # Check cache first (15 seconds for live positions)
-        cache_key = f"live_positions_{session_key}"
+        cache_key = f"live_positions:{session_key}"
         cached = get_cached_data(cache_key)
         if cached and cached.get('timestamp'):
             now = datetime.now(ZoneInfo("UTC")).timestamp()
@@ -1449,23 +1682,24 @@ def get_live_positions(session_key):
         logger.info(f"Fetching live positions for session {session_key}")
         
         # Get current positions
-        positions_url = f"https://api.openf1.org/v1/position?session_key={session_key}"
-        positions_response = requests.get(positions_url, timeout=10)
-        
-        if positions_response.status_code != 200:
+        # Streamed: only the newest entry per driver is ever held
+        positions_url = f"{OPENF1_BASE_URL}/v1/position?session_key={session_key}"
+        positions_response = fetch_json(positions_url, timeout=10, reduce=latest_positions)
+
+        if positions_response.status != 200:
             return []
 
-        positions_data = positions_response.json()
-        if not positions_data:
+        latest = positions_response.data
+        if not latest:
             return []
 
         # Get driver info
-        drivers_url = f"https://api.openf1.org/v1/drivers?session_key={session_key}"
-        drivers_response = requests.get(drivers_url, timeout=10)
+        drivers_url = f"{OPENF1_BASE_URL}/v1/drivers?session_key={session_key}"
+        drivers_response = fetch_json(drivers_url, timeout=10)
         drivers_info = {}
         
-        if drivers_response.status_code == 200:
-            for driver in drivers_response.json():
+        if drivers_response.status == 200:
+            for driver in drivers_response.data:
                 driver_number = driver.get("driver_number")
                 if driver_number:
                     drivers_info[driver_number] = {
@@ -1477,27 +1711,20 @@ def get_live_positions(session_key):
 
         # Process positions
         current_positions = {}
-        for pos_entry in positions_data:
-            driver_number = pos_entry.get("driver_number")
-            position = pos_entry.get("position")
-            date = pos_entry.get("date")
-
-            if driver_number and position and date:
-                if (
-                    driver_number not in current_positions
-                    or date > current_positions[driver_number]["date"]
-                ):
-                    driver_info = drivers_info.get(driver_number, {})
-                    full_name = f"{driver_info.get('first_name', '')} {driver_info.get('last_name', '')}".strip()
-                    
-                    current_positions[driver_number] = {
-                        "position": position,
-                        "date": date,
-                        "driver_number": driver_number,
-                        "driver_name": full_name or f"Driver {driver_number}",
-                        "country_code": driver_info.get('country_code', ''),
-                        "team_name": driver_info.get('team_name', '')
-                    }
+        for driver_number, pos_entry in latest.items():
+            if not driver_number:
+                continue
+            driver_info = drivers_info.get(driver_number, {})
+            full_name = f"{driver_info.get('first_name', '')} {driver_info.get('last_name', '')}".strip()
+
+            current_positions[driver_number] = {
+                "position": pos_entry["position"],
+                "date": pos_entry["date"],
+                "driver_number": driver_number,
+                "driver_name": full_name or f"Driver {driver_number}",
+                "country_code": driver_info.get('country_code', ''),
+                "team_name": driver_info.get('team_name', '')
+            }
 
         # Sort by position
         sorted_positions = sorted(
@@ -1519,10 +1746,11 @@ def get_live_positions(session_key):
         return []
 
 
-def format_live_timing_message(session_info, positions):
+def format_live_timing_message(session_info, positions, tz=DEFAULT_TIMEZONE, locale=DEFAULT_LOCALE):
     """Format live timing data into a nice message"""
+    text = strings(locale)
     if not session_info:
-        return TRANSLATIONS["live_not_available"]
+        return text["live_not_available"]
 
     try:
         # Get session details
@@ -1535,31 +1763,30 @@ def format_live_timing_message(session_info, positions):
         # Get flag emoji
         flag = get_country_flag(country_name)
         
-        # Convert session start time to Baku time
+        # Convert session start time to the chat's timezone
         session_time_str = ""
         if date_start:
             try:
                 start_dt = datetime.fromisoformat(date_start.replace("Z", "+00:00"))
                 if start_dt.tzinfo is None:
-                    start_dt = start_dt.replace(tzinfo=ZoneInfo("UTC"))
-                baku_time = start_dt.astimezone(ZoneInfo("Asia/Baku"))
-                session_time_str = baku_time.strftime("%H:%M")
+                    start_dt = start_dt.replace(tzinfo=get_zone("UTC"))
+                session_time_str = start_dt.astimezone(get_zone(tz)).strftime("%H:%M")
             except Exception:
-                session_time_str = "Unknown"
+                session_time_str = text["live_time_unknown"]
 
         # Start building message
         message = f"🔴 *{flag} {meeting_name} {session_name}*\n\n"
         
         if location:
-            message += f"{TRANSLATIONS['live_session_location']} {location}\n"
+            message += f"{text['live_session_location']} {location}\n"
         
         if session_time_str:
-            message += f"{TRANSLATIONS['live_session_time']} {session_time_str} (Bakı)\n"
+            message += f"{text['live_session_time']} {session_time_str} ({text['baku'] if tz == 'Asia/Baku' else tz})\n"
         
-        message += f"\n{TRANSLATIONS['live_positions_header']}\n"
+        message += f"\n{text['live_positions_header']}\n"
         
         if not positions:
-            message += f"{TRANSLATIONS['live_positions_loading']}\n"
+            message += f"{text['live_positions_loading']}\n"
         else:
             # Display top 15 positions
             for i, pos in enumerate(positions[:15]):
@@ -1577,7 +1804,7 @@ def format_live_timing_message(session_info, positions):
                     
                     # Add winner indicator for position 1
                     if position == 1:
-                        line += f" {TRANSLATIONS['live_position_winner']}"
+                        line += f" {text['live_position_winner']}"
                     
                     message += line + "\n"
                     
@@ -1586,36 +1813,37 @@ def format_live_timing_message(session_info, positions):
                     continue
 
         # Add footer
-        message += f"\n{TRANSLATIONS['live_update_frequency']}\n"
-        message += f"{TRANSLATIONS['live_data_source']}"
+        message += f"\n{text['live_update_frequency']}\n"
+        message += f"{text['live_data_source']}"
         
         return message
         
     except Exception as e:
         logger.error(f"Error formatting live timing message: {e}")
-        return TRANSLATIONS["error_occurred"].format(str(e))
+        return text["error_occurred"].format(str(e))
 
 
-def check_live_timing_available():
+def check_live_timing_available(locale=DEFAULT_LOCALE):
     """Check if live timing data is currently available"""
+    text = strings(locale)
     try:
         session_info = get_live_session_info()
         if not session_info:
-            return False, "Aktiv F1 sessiyası tapılmadı"
+            return False, text["live_no_session_found"]
         
         session_key = session_info.get('session_key')
         if not session_key:
-            return False, TRANSLATIONS["live_session_info_error"]
+            return False, text["live_session_info_error"]
         
         positions = get_live_positions(session_key)
         if not positions:
-            return False, TRANSLATIONS["live_positions_error"]
+            return False, text["live_positions_error"]
         
-        return True, TRANSLATIONS["live_timing_available"]
+        return True, text["live_timing_available"]
         
     except Exception as e:
         logger.error(f"Error checking live timing availability: {e}")
-        return False, "Live timing yoxlanılarkən xəta"
+        return False, text["live_check_error"]
 
 
 # ==================== PLAYWRIGHT F1 SCRAPER CLASS ====================
@@ -1644,6 +1872,8 @@ class F1TimingScraper:
             raise ImportError("Playwright not available")
             
         try:
+            from playwright.async_api import async_playwright
+
             self.playwright = await async_playwright().start()
             self.browser = await self.playwright.chromium.launch(
                 headless=True,
@@ -1823,39 +2053,95 @@ class F1TimingScraper:
 # ==================== TELEGRAM BOT HANDLERS ====================
 
 
+class MeteredRequest(HTTPXRequest):
+    """HTTPXRequest that records Bot API latency and response codes"""
+
+    async def do_request(self, url, method, *args, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        started = time.perf_counter()
+        try:
+            with span("telegram"):
+                code, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception as e:
+            f1_metrics.TELEGRAM_RESPONSES.inc(api_method, type(e).__name__)
+            raise
+        finally:
+            f1_metrics.TELEGRAM_LATENCY.observe(api_method, value=time.perf_counter() - started)
+        f1_metrics.TELEGRAM_RESPONSES.inc(api_method, str(code))
+        return code, payload
+
+
+def update_live_subscription_gauge(job_queue):
+    """Publish the number of chats with an active live timing job"""
+    count = sum(
+        1 for job in job_queue.jobs()
+        if job.name and job.name.startswith("live_timing_") and not job.removed
+    )
+    f1_metrics.LIVE_SUBSCRIPTIONS.set(value=count)
+
+
+# Hash of chat_id -> live subscription, shared by every replica
+LIVE_REGISTRY_KEY = "live_subscriptions"
+
+
+def register_live_subscription(chat_id, message_id, mode, persist=True):
+    """Record that this replica now drives the chat's live feed"""
+    if persist:
+        get_subscription_store().put(chat_id, message_id, mode)
+    try:
+        get_state().hset(LIVE_REGISTRY_KEY, chat_id, {
+            "chat_id": chat_id,
+            "message_id": message_id,
+            "mode": mode,
+            "replica": REPLICA_ID,
+            "created": time.time(),
+        })
+    except StateError as e:
+        logger.warning(f"Could not register live subscription for {chat_id}: {e}")
+
+
+def unregister_live_subscription(chat_id):
+    get_subscription_store().remove(chat_id)
+    try:
+        get_state().hdel(LIVE_REGISTRY_KEY, chat_id)
+    except StateError as e:
+        logger.warning(f"Could not unregister live subscription for {chat_id}: {e}")
+
+
+def owns_live_subscription(chat_id):
+    """False once the chat stopped its feed or another replica took it over"""
+    try:
+        entry = get_state().hget(LIVE_REGISTRY_KEY, chat_id)
+    except StateError:
+        return True  # keep serving while the backend is unreachable
+    return entry is not None and entry.get("replica") == REPLICA_ID
+
+
+def move_live_subscription(job, message_id):
+    """The feed continues on a new message (regenerated or user-deleted)"""
+    job.data["message_id"] = message_id
+    job.data["counter"] = 0
+    chat_id = job.data.get("chat_id")
+    register_live_subscription(chat_id, message_id, job.data.get("mode", "board"), persist=False)
+    get_subscription_store().update(chat_id, message_id=message_id)
+
+
+
+@profiled
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send welcome message with comprehensive inline keyboard"""
+    text = strings(update_locale(update))
     try:
         if update.effective_user:
             logger.info(f"User {update.effective_user.id} started the bot")
         else:
             logger.info("User started the bot (unknown user)")
-        keyboard = [
-            [
-                InlineKeyboardButton(
-                    TRANSLATIONS["driver_standings"], callback_data="standings"
-                ),
-                InlineKeyboardButton(
-                    TRANSLATIONS["constructor_standings"], callback_data="constructors"
-                ),
-            ],
-            [
-                InlineKeyboardButton(
-                    TRANSLATIONS["last_session"], callback_data="lastrace"
-                ),
-                InlineKeyboardButton(
-                    TRANSLATIONS["schedule_weather"], callback_data="nextrace"
-                ),
-            ],
-            [
-                InlineKeyboardButton(TRANSLATIONS["live_timing"], callback_data="live"),
-            ],
-        ]
+        keyboard = menu_keyboard(text)
         reply_markup = InlineKeyboardMarkup(keyboard)
 
-        welcome_text = f"""{TRANSLATIONS["welcome_title"]}
+        welcome_text = f"""{text["welcome_title"]}
          
-{TRANSLATIONS["welcome_text"]}"""
+{text["welcome_text"]}"""
 
         if isinstance(update.message, Message):
             await update.message.reply_text(
@@ -1865,58 +2151,38 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in start handler: {e}")
         if isinstance(update.message, Message):
             await update.message.reply_text(
-                f"❌ Xəta baş verdi: {str(e)}", parse_mode="Markdown"
+                text["error_occurred"].format(str(e)), parse_mode="Markdown"
             )
 
 
+@profiled
 async def show_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show menu buttons"""
     if update.effective_user:
         logger.info(f"User {update.effective_user.id} requested menu")
     else:
         logger.info("User requested menu (unknown user)")
-    keyboard = [
-        [
-            InlineKeyboardButton(
-                TRANSLATIONS["driver_standings"], callback_data="standings"
-            ),
-            InlineKeyboardButton(
-                TRANSLATIONS["constructor_standings"], callback_data="constructors"
-            ),
-        ],
-        [
-            InlineKeyboardButton(
-                TRANSLATIONS["last_session"], callback_data="lastrace"
-            ),
-            InlineKeyboardButton(
-                TRANSLATIONS["schedule_weather"], callback_data="nextrace"
-            ),
-        ],
-        [
-            InlineKeyboardButton(TRANSLATIONS["live_timing"], callback_data="live"),
-        ],
-        [
-            InlineKeyboardButton(
-                TRANSLATIONS["help_commands_btn"], callback_data="help"
-            ),
-        ],
+    text = strings(update_locale(update))
+    keyboard = menu_keyboard(text) + [
+        [InlineKeyboardButton(text["help_commands_btn"], callback_data="help")],
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
     if isinstance(update.message, Message):
         await update.message.reply_text(
-            f"{TRANSLATIONS['menu_title']}\n\n{TRANSLATIONS['menu_text']}",
+            f"{text['menu_title']}\n\n{text['menu_text']}",
             reply_markup=reply_markup,
             parse_mode="Markdown",
         )
 
 
+@profiled
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle button clicks"""
     query = update.callback_query
     if query is None:
         return
 
-    logger.info(f"User {query.from_user.id} clicked button: {query.data}")
+    started = time.perf_counter()
 
     # Always acknowledge the callback query to prevent double-tapping
     try:
@@ -1925,51 +2191,49 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Failed to answer callback query: {e}")
         # Continue processing even if answer fails
 
+    locale = chat_locale(query.message.chat_id if query.message else None)
+    text = strings(locale)
+
     # Process the button click
     try:
         if query.data == "standings":
             await context.bot.send_chat_action(chat_id=query.message.chat_id, action="typing")
-            message = get_current_standings()
+            message = get_current_standings(locale)
             reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
             ])
             await query.message.edit_text(message, parse_mode="Markdown", reply_markup=reply_markup)
             return
         elif query.data == "constructors":
             await context.bot.send_chat_action(chat_id=query.message.chat_id, action="typing")
-            message = get_constructor_standings()
+            message = get_constructor_standings(locale)
             reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
             ])
             await query.message.edit_text(message, parse_mode="Markdown", reply_markup=reply_markup)
             return
         elif query.data == "lastrace":
             await context.bot.send_chat_action(chat_id=query.message.chat_id, action="typing")
-            message = get_last_session_results()
+            message = get_last_session_results(locale)
             reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
             ])
             await query.message.edit_text(message, parse_mode="Markdown", reply_markup=reply_markup)
             return
         elif query.data == "nextrace":
             await context.bot.send_chat_action(chat_id=query.message.chat_id, action="typing")
-            message = get_next_race()
+            message = get_next_race(chat_timezone(query.message.chat_id), locale)
             reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton("📅 Tam Mövsüm Cədvəlini Gör", callback_data="calendar")],
-                [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                [InlineKeyboardButton(text["full_calendar_btn"], callback_data="calendar")],
+                [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
             ])
             await query.message.edit_text(message, parse_mode="Markdown", reply_markup=reply_markup)
             return
         elif query.data == "calendar":
             await context.bot.send_chat_action(chat_id=query.message.chat_id, action="typing")
-            cached_data = get_cached_calendar()
-            if cached_data:
-                message = cached_data
-            else:
-                message = get_f1_season_calendar()
-                set_cached_calendar(message)
+            message = get_f1_season_calendar(chat_timezone(query.message.chat_id), locale)
             reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
             ])
             await query.message.edit_text(message, parse_mode="Markdown", reply_markup=reply_markup)
             return
@@ -1978,20 +2242,23 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
             current_jobs = context.job_queue.get_jobs_by_name(f"live_timing_{query.message.chat_id}")
             for job in current_jobs:
                 job.schedule_removal()
+            # Jobs on other replicas notice the missing entry on their next tick
+            unregister_live_subscription(query.message.chat_id)
+            update_live_subscription_gauge(context.job_queue)
             
             await query.message.edit_text(
-                "🛑 Canlı yayım dayandırıldı.",
+                text["live_stopped"],
                 parse_mode="Markdown",
                 reply_markup=InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                    [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
                 ])
             )
             return
         elif query.data == "live":
             if not check_active_f1_session():
-                message = "❌ *Hal-hazırda aktiv F1 sessiyası yoxdur*\n\n🔴 Canlı vaxt yalnız F1 yarış həftəsonlarında mövcuddur.\n\n📊 Canlı vaxt göstərir:\n• Sürücülərin mövqeləri\n• Interval vaxtları\n• Ən yaxşı dövrə vaxtları\n• Təkər məlumatları\n• Hər çağırışda yenilənən məlumatlar\n\nAlternativlər:\n• /nextrace - Gələn yarış və hava proqnozu\n• /lastrace - Son sessiya nəticələri"
+                message = f"{text['no_active_session']}\n\n{text['live_features']}"
                 reply_markup = InlineKeyboardMarkup([
-                    [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                    [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
                 ])
                 await query.message.reply_text(message, parse_mode="Markdown", reply_markup=reply_markup)
                 return
@@ -2003,114 +2270,342 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 # For simplicity, just send the loading message and let user know
                 return
         elif query.data == "help":
-            message = """ℹ️ *F1 Bot Köməyi*
-
-Bu bot Formula 1 yarışları haqqında məlumat verir.
-
-*Əmrlər:*
-/start - Botu başlat
-/menu - Əsas menyunu göstər
-/standings - Sürücü sıralamaları
-/constructors - Konstruktor sıralamaları
-/lastrace - Son sessiya nəticələri
-/nextrace - Gələn yarış cədvəli
-/live - Canlı vaxt (aktiv sessiya zamanı)
-
-*Qeyd:* Bütün vaxtlar Bakı vaxtı ilə göstərilir."""
+            message = text["help_text"]
             reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
             ])
             await query.message.reply_text(message, parse_mode="Markdown", reply_markup=reply_markup)
             return
+        elif query.data == "stats" or query.data.startswith("stats:"):
+            _, view, season = (query.data.split(":") + ["", ""])[:3]
+            season, message = get_season_stats(
+                view or "progression", int(season) if season.isdigit() else None, locale
+            )
+            reply_markup = stats_keyboard(season, locale) if season else None
+            await query.message.edit_text(message, parse_mode="Markdown", reply_markup=reply_markup)
+            return
+        elif query.data.startswith("lang:"):
+            message = set_chat_locale(query.message.chat_id, query.data.split(":", 1)[1])
+            await query.message.edit_text(message, parse_mode="Markdown", reply_markup=InlineKeyboardMarkup([
+                [InlineKeyboardButton(strings(chat_locale(query.message.chat_id))["back_to_menu_btn"],
+                                      callback_data="back_to_menu")]
+            ]))
+            return
         elif query.data == "back_to_menu":
-            keyboard = [
-                [
-                    InlineKeyboardButton(TRANSLATIONS["driver_standings"], callback_data="standings"),
-                    InlineKeyboardButton(TRANSLATIONS["constructor_standings"], callback_data="constructors"),
-                ],
-                [
-                    InlineKeyboardButton(TRANSLATIONS["last_session"], callback_data="lastrace"),
-                    InlineKeyboardButton(TRANSLATIONS["schedule_weather"], callback_data="nextrace"),
-                ],
-                [
-                    InlineKeyboardButton(TRANSLATIONS["live_timing"], callback_data="live"),
-                ],
-            ]
+            keyboard = menu_keyboard(text)
             reply_markup = InlineKeyboardMarkup(keyboard)
-            message = f"{TRANSLATIONS['menu_title']}\n\n{TRANSLATIONS['menu_text']}"
+            message = f"{text['menu_title']}\n\n{text['menu_text']}"
             await query.message.reply_text(message, reply_markup=reply_markup, parse_mode="Markdown")
             return
         else:
-            message = TRANSLATIONS["unknown_command"]
+            message = text["unknown_command"]
             reply_markup = InlineKeyboardMarkup([
-                [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+                [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
             ])
             await query.message.reply_text(message, parse_mode="Markdown", reply_markup=reply_markup)
             return
     except Exception as e:
         logger.error(f"Error in button_handler: {e}")
-        message = TRANSLATIONS["error_occurred"].format(str(e))
+        message = text["error_occurred"].format(str(e))
         reply_markup = InlineKeyboardMarkup([
-            [InlineKeyboardButton("🏠 Ana Menyuya Qayıt", callback_data="back_to_menu")]
+            [InlineKeyboardButton(text["back_to_menu_btn"], callback_data="back_to_menu")]
         ])
         await query.message.reply_text(message, parse_mode="Markdown", reply_markup=reply_markup)
+    finally:
+        log.info(
+            "button_click",
+            handler="button_handler",
+            user_id=query.from_user.id,
+            chat_id=query.message.chat_id if query.message else None,
+            data=query.data,
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            sample="button_handler",
+        )
 
 
 # Command handlers
+@profiled
 async def standings_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.effective_user:
         logger.info(f"User {update.effective_user.id} requested standings")
     else:
         logger.info("User requested standings (unknown user)")
     if isinstance(update.message, Message):
-        await update.message.reply_text(TRANSLATIONS["loading"])
-        message = get_current_standings()
+        locale = chat_locale(update.message.chat_id)
+        text = strings(locale)
+        await update.message.reply_text(text["loading"])
+        message = get_current_standings(locale)
         await update.message.reply_text(message, parse_mode="Markdown")
 
 
+@profiled
 async def constructors_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.effective_user:
         logger.info(f"User {update.effective_user.id} requested constructor standings")
     else:
         logger.info("User requested constructor standings (unknown user)")
     if isinstance(update.message, Message):
-        await update.message.reply_text(TRANSLATIONS["loading"])
-        message = get_constructor_standings()
+        locale = chat_locale(update.message.chat_id)
+        text = strings(locale)
+        await update.message.reply_text(text["loading"])
+        message = get_constructor_standings(locale)
         await update.message.reply_text(message, parse_mode="Markdown")
 
 
+@profiled
 async def lastrace_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.effective_user:
         logger.info(f"User {update.effective_user.id} requested last race results")
     else:
         logger.info("User requested last race results (unknown user)")
     if isinstance(update.message, Message):
-        await update.message.reply_text(TRANSLATIONS["loading"])
-        message = get_last_session_results()
+        locale = chat_locale(update.message.chat_id)
+        text = strings(locale)
+        await update.message.reply_text(text["loading"])
+        message = get_last_session_results(locale)
         await update.message.reply_text(message, parse_mode="Markdown")
 
 
+@profiled
 async def nextrace_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.effective_user:
         logger.info(f"User {update.effective_user.id} requested next race")
     else:
         logger.info("User requested next race (unknown user)")
     if isinstance(update.message, Message):
-        await update.message.reply_text(TRANSLATIONS["loading"])
-        message = get_next_race()
+        locale = chat_locale(update.message.chat_id)
+        text = strings(locale)
+        await update.message.reply_text(text["loading"])
+        message = get_next_race(chat_timezone(update.message.chat_id), locale)
         await update.message.reply_text(message, parse_mode="Markdown")
 
 
+@profiled
+async def timezone_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show or change the timezone this chat's schedules and live board use"""
+    if not isinstance(update.message, Message):
+        return
+    chat_id = update.message.chat_id
+    text = strings(chat_locale(chat_id))
+    if not context.args:
+        await update.message.reply_text(
+            text["timezone_current"].format(chat_timezone(chat_id)), parse_mode="Markdown"
+        )
+        return
+
+    name = context.args[0]
+    if name.lower() == "reset":
+        get_preferences().unset(chat_id, "timezone")
+        name = DEFAULT_TIMEZONE
+    else:
+        try:
+            get_zone(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            await update.message.reply_text(text["timezone_invalid"].format(name))
+            return
+        get_preferences().set(chat_id, "timezone", name)
+    await update.message.reply_text(text["timezone_set"].format(name), parse_mode="Markdown")
+
+
+@profiled
+async def language_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show or change the language this chat's messages use"""
+    if not isinstance(update.message, Message):
+        return
+    chat_id = update.message.chat_id
+    if not context.args:
+        locale = chat_locale(chat_id)
+        reply_markup = InlineKeyboardMarkup([[
+            InlineKeyboardButton(LOCALE_NAMES[code], callback_data=f"lang:{code}") for code in LOCALES
+        ]])
+        await update.message.reply_text(
+            strings(locale)["language_current"].format(LOCALE_NAMES[locale]),
+            parse_mode="Markdown", reply_markup=reply_markup,
+        )
+        return
+    await update.message.reply_text(set_chat_locale(chat_id, context.args[0]), parse_mode="Markdown")
+
+
+@profiled
+async def results_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Past race results from the local archive: /results <year> <round>"""
+    if not isinstance(update.message, Message):
+        return
+    locale = chat_locale(update.message.chat_id)
+    text = strings(locale)
+    args = context.args or []
+    if args and (len(args) != 2 or not all(arg.isdigit() for arg in args)):
+        await update.message.reply_text(text["results_usage"])
+        return
+    season, rnd = (int(args[0]), int(args[1])) if args else (None, None)
+    message = get_archived_results(season, rnd, locale)
+    await update.message.reply_text(message, parse_mode="Markdown")
+
+
+@profiled
+async def stats_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Season statistics from the archive: /stats [year]"""
+    if not isinstance(update.message, Message):
+        return
+    locale = chat_locale(update.message.chat_id)
+    text = strings(locale)
+    args = context.args or []
+    season = int(args[0]) if args and args[0].isdigit() else None
+    season, message = get_season_stats("progression", season, locale)
+    reply_markup = stats_keyboard(season, locale) if season else None
+    await update.message.reply_text(message, parse_mode="Markdown", reply_markup=reply_markup)
+
+
+@profiled
+async def h2h_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Head-to-head of two drivers: /h2h VER NOR [year]"""
+    if not isinstance(update.message, Message):
+        return
+    locale = chat_locale(update.message.chat_id)
+    text = strings(locale)
+    args = context.args or []
+    if len(args) not in (2, 3) or (len(args) == 3 and not args[2].isdigit()):
+        await update.message.reply_text(text["h2h_usage"])
+        return
+    season = int(args[2]) if len(args) == 3 else None
+    await update.message.reply_text(get_head_to_head(args[0], args[1], season, locale), parse_mode="Markdown")
+
+
+@profiled
+async def avgfinish_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Average race finish at a circuit across archived seasons: /avgfinish baku"""
+    if not isinstance(update.message, Message):
+        return
+    locale = chat_locale(update.message.chat_id)
+    if not context.args:
+        await update.message.reply_text(strings(locale)["avgfinish_usage"])
+        return
+    await update.message.reply_text(get_average_finish_at(" ".join(context.args), locale), parse_mode="Markdown")
+
+
+@profiled
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Inline mode: `@bot ver`, `@bot baku`. Answered from the prefix index, never upstream"""
+    query = update.inline_query
+    if query is None:
+        return
+    search = get_search()
+    if search.index is None:
+        # Only until the first background build has run. A user is waiting, so
+        # this runs at the default interactive priority, not as prefetch
+        async with _search_build_lock:
+            if search.index is None:
+                await asyncio.to_thread(refresh_search_index)
+    # A private chat's id is the user's id, so /language and /timezone there apply here
+    locale = chat_locale(query.from_user.id)
+    tz = chat_timezone(query.from_user.id)
+    results = [card.article(locale, tz) for card in search.search(query.query, INLINE_RESULTS)]
+    # Answers depend on the user's language and timezone, so Telegram must not share them
+    await query.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=True)
+
+
+# Seconds between live timing message refreshes
+LIVE_UPDATE_INTERVAL = 3
+
+# Warm the live timing stack in the background once the bot is up
+PRELOAD_LIVE_TIMING = os.getenv("PRELOAD_LIVE_TIMING", "1") == "1"
+# "worker" moves the browser and parsing into f1_scraper_worker's own process;
+# "openf1" builds the board from the OpenF1 API without a browser;
+# "auto" lets f1_live_arbiter pick, hedge and merge between the sources
+LIVE_SOURCE = os.getenv("LIVE_SOURCE", "local")
+
+_live_timing_module = None
+
+
+def load_live_timing():
+    """Import the scraper (and with it BeautifulSoup/Playwright) on first use"""
+    global _live_timing_module
+    if _live_timing_module is None:
+        import f1_playwright_scraper
+        _live_timing_module = f1_playwright_scraper
+    return _live_timing_module
+
+
+def _preload_live_timing_modules():
+    started = time.perf_counter()
+    load_live_timing()
+    if LIVE_SOURCE in ("openf1", "auto"):
+        import f1_openf1_live  # noqa: F401
+        import requests  # noqa: F401
+    if LIVE_SOURCE == "auto":
+        import f1_live_arbiter  # noqa: F401
+    if LIVE_SOURCE in ("local", "auto"):
+        import bs4  # noqa: F401
+        if PLAYWRIGHT_AVAILABLE:
+            import playwright.async_api  # noqa: F401
+    logger.info(f"Preloaded live timing modules in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+async def preload_live_timing():
+    """Import the live timing stack in a worker thread so the first tick doesn't pay for it"""
+    try:
+        await asyncio.to_thread(_preload_live_timing_modules)
+    except Exception as e:
+        logger.warning(f"Live timing preload failed: {e}")
+
+
+def format_race_event(event, locale=DEFAULT_LOCALE):
+    """One notification line for a race event"""
+    text = strings(locale)
+    if isinstance(event, Overtake):
+        return text["event_overtake"].format(driver=event.driver, passed=event.passed, position=event.position)
+    if isinstance(event, PitStop):
+        return text["event_pit_stop"].format(
+            driver=event.driver, previous=event.previous_compound, compound=event.compound
+        )
+    if isinstance(event, FastestLap):
+        return text["event_fastest_lap"].format(driver=event.driver, lap=format_lap_ms(event.lap_ms))
+    if isinstance(event, RaceControl):
+        return text["event_race_control"].format(time=event.time, message=event.message)
+    return str(event)
+
+
+async def send_race_events(context, job, chat_id):
+    """Events mode: push only what happened since the chat's last update"""
+    events = get_event_detector().since(job.data.get("last_seq", 0))
+    if not events:
+        return
+    job.data["last_seq"] = events[-1].seq
+    locale = chat_locale(chat_id)
+    await context.bot.send_message(
+        chat_id=chat_id,
+        text="\n".join(format_race_event(event, locale) for event in events),
+        parse_mode="Markdown",
+        disable_notification=all(isinstance(event, RaceControl) for event in events),
+    )
+
+
+@profiled
 async def live_update_task(context: ContextTypes.DEFAULT_TYPE):
     """Background task to update live timing message"""
     job = context.job
     chat_id = job.data.get("chat_id")
     message_id = job.data.get("message_id")
     counter = job.data.get("counter", 0)
+
+    now = time.monotonic()
+    last_run = job.data.get("last_run")
+    if last_run is not None:
+        lag = max(0.0, now - last_run - LIVE_UPDATE_INTERVAL)
+        f1_metrics.JOBQUEUE_LAG.observe("live_update_task", value=lag)
+    job.data["last_run"] = now
+
+    if not owns_live_subscription(chat_id):
+        job.schedule_removal()
+        get_subscription_store().remove(chat_id)
+        update_live_subscription_gauge(context.job_queue)
+        return
     
     # Imports
     try:
-        from f1_playwright_scraper import get_optimized_live_timing, format_timing_data_for_telegram
+        live_timing = load_live_timing()
+        get_optimized_live_timing = live_timing.get_optimized_live_timing
+        format_timing_data_for_telegram = live_timing.format_timing_data_for_telegram
     except ImportError:
         logger.error("Playwright scraper not available")
         job.schedule_removal()
@@ -2124,14 +2619,17 @@ async def live_update_task(context: ContextTypes.DEFAULT_TYPE):
 
     try:
         live_data = await get_optimized_live_timing()
-        if live_data:
-            live_message = format_timing_data_for_telegram(live_data)
+        if live_data and job.data.get("mode") == "events":
+            await send_race_events(context, job, chat_id)
+        elif live_data:
+            locale = chat_locale(chat_id)
+            live_message = format_timing_data_for_telegram(live_data, chat_timezone(chat_id), locale)
             
             # Regeneration logic: Every 10 minutes
             # Interval = 3s. 10 mins = 600s. 600 / 3 = 200 updates.
             REGEN_INTERVAL = 200 
             
-            keyboard = [[InlineKeyboardButton("🛑 Dayandır", callback_data="stop_live")]]
+            keyboard = [[InlineKeyboardButton(strings(locale)["stop_btn"], callback_data="stop_live")]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
             if counter >= REGEN_INTERVAL:
@@ -2149,8 +2647,7 @@ async def live_update_task(context: ContextTypes.DEFAULT_TYPE):
                 )
                 
                 # Update job data with new message ID and reset counter
-                job.data["message_id"] = new_msg.message_id
-                job.data["counter"] = 0
+                move_live_subscription(job, new_msg.message_id)
             else:
                 # Just edit the existing message
                 try:
@@ -2173,24 +2670,34 @@ async def live_update_task(context: ContextTypes.DEFAULT_TYPE):
                             parse_mode="Markdown",
                             reply_markup=reply_markup
                         )
-                        job.data["message_id"] = new_msg.message_id
-                        job.data["counter"] = 0
+                        move_live_subscription(job, new_msg.message_id)
                     else:
                         logger.warning(f"Error editing live message: {e}")
 
     except Exception as e:
         logger.error(f"Error in live_update_task: {e}")
+    finally:
+        log.info(
+            "live_tick",
+            handler="live_update_task",
+            chat_id=chat_id,
+            counter=job.data.get("counter", 0),
+            duration_ms=round((time.monotonic() - now) * 1000, 2),
+            sample="live_update_task",
+        )
 
 
+@profiled
 async def live_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Live timing with auto-refresh via JobQueue"""
     if isinstance(update.message, Message):
         chat_id = update.message.chat_id
+        text = strings(chat_locale(chat_id))
         
         # Check active session
         if not check_active_f1_session():
              await update.message.reply_text(
-                "❌ *Hal-hazırda aktiv F1 sessiyası yoxdur*\n\n🔴 Canlı vaxt yalnız F1 yarış həftəsonlarında mövcuddur.",
+                text["no_active_session"],
                 parse_mode="Markdown"
             )
              return
@@ -2200,29 +2707,140 @@ async def live_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
         for job in current_jobs:
             job.schedule_removal()
 
-        loading_msg = await update.message.reply_text(
-            "🔴 Canlı vaxt başladılır...\nMəlumatlar avtomatik yenilənəcək 🔄"
-        )
+        # "/live events" pushes overtakes, pit stops etc. instead of the full board
+        mode = "events" if context.args and context.args[0].lower() == "events" else "board"
+        if mode == "events":
+            loading_msg = await update.message.reply_text(
+                text["live_events_started"],
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton(text["stop_btn"], callback_data="stop_live")]
+                ])
+            )
+        else:
+            loading_msg = await update.message.reply_text(text["live_starting"])
 
         # Schedule the update job
         context.job_queue.run_repeating(
             live_update_task,
-            interval=3, # Update every 3 seconds for near real-time
+            interval=LIVE_UPDATE_INTERVAL, # Update every 3 seconds for near real-time
             first=1,
             data={
                 "chat_id": chat_id,
                 "message_id": loading_msg.message_id,
-                "counter": 0
+                "counter": 0,
+                "mode": mode,
+                "last_seq": get_event_detector().last_seq,
             },
             name=f"live_timing_{chat_id}"
         )
+        register_live_subscription(chat_id, loading_msg.message_id, mode)
+        update_live_subscription_gauge(context.job_queue)
 
 
+# Chat IDs allowed to run admin-only commands such as /profile
+ADMIN_CHAT_IDS = {
+    int(chat_id) for chat_id in os.getenv("ADMIN_CHAT_IDS", "").split(",") if chat_id.strip()
+}
 
 
+@profiled
+async def profile_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Admin-only: capture a sampling profile for N seconds (/profile 30)"""
+    if not isinstance(update.message, Message):
+        return
+    text = strings(chat_locale(update.message.chat_id))
+    if update.message.chat_id not in ADMIN_CHAT_IDS:
+        await update.message.reply_text(text["unknown_command"])
+        return
 
+    try:
+        seconds = min(max(int(context.args[0]), 1), 300) if context.args else 30
+    except ValueError:
+        seconds = 30
 
+    await update.message.reply_text(text["profile_started"].format(seconds))
+    try:
+        path = await capture_profile_async(seconds)
+        await update.message.reply_text(text["profile_saved"].format(path), parse_mode="Markdown")
+    except Exception as e:
+        logger.error(f"Error capturing profile: {e}")
+        await update.message.reply_text(text["error_occurred"].format(str(e)))
 
 
+_background_tasks = set()
 
 
+def restore_live_subscriptions(job_queue):
+    """Resume persisted live feeds on their existing messages from the first tick"""
+    store = get_subscription_store()
+    restored = 0
+    for entry in store.restorable():
+        chat_id = entry["chat_id"]
+        try:
+            current = get_state().hget(LIVE_REGISTRY_KEY, chat_id)
+        except StateError:
+            current = None
+        # A different message means the chat re-issued /live elsewhere meanwhile
+        if current is not None and current.get("message_id") != entry["message_id"]:
+            store.remove(chat_id)
+            continue
+
+        job_queue.run_repeating(
+            live_update_task,
+            interval=LIVE_UPDATE_INTERVAL,
+            first=0,
+            data={
+                "chat_id": chat_id,
+                "message_id": entry["message_id"],
+                "counter": 0,
+                "mode": entry.get("mode", "board"),
+                "last_seq": get_event_detector().last_seq,
+            },
+            name=f"live_timing_{chat_id}",
+        )
+        register_live_subscription(chat_id, entry["message_id"], entry.get("mode", "board"), persist=False)
+        restored += 1
+
+    if restored:
+        logger.info(f"Restored {restored} live subscriptions")
+    update_live_subscription_gauge(job_queue)
+
+
+@profiled
+async def flush_live_subscriptions(context: ContextTypes.DEFAULT_TYPE):
+    get_subscription_store().flush()
+    get_preferences().flush()
+
+
+async def post_init(application):
+    """Start background facilities once the Application's event loop is running"""
+    LoopWatchdog().start()
+    restore_live_subscriptions(application.job_queue)
+    application.job_queue.run_repeating(
+        flush_live_subscriptions, interval=FLUSH_INTERVAL, first=FLUSH_INTERVAL,
+        name="flush_live_subscriptions",
+    )
+    application.job_queue.run_repeating(
+        archive_update_job, interval=ARCHIVE_UPDATE_INTERVAL, first=60, name="archive_update",
+    )
+    application.job_queue.run_repeating(
+        search_index_job, interval=SEARCH_INDEX_INTERVAL, first=30, name="search_index",
+    )
+    if PRELOAD_LIVE_TIMING:
+        task = asyncio.get_running_loop().create_task(preload_live_timing())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    # Only the replica holding the scraper lease starts the worker up front; others
+    # follow its snapshots and start their own only if those go stale
+    if LIVE_SOURCE == "worker" and (not get_state().shared or get_election("live-scraper").is_leader()):
+        from f1_scraper_worker import get_worker_client
+        get_worker_client()
+
+
+async def post_shutdown(application):
+    """Persist pending state and stop child processes started in post_init"""
+    get_subscription_store().flush()
+    get_preferences().flush()
+    if LIVE_SOURCE == "worker":
+        from f1_scraper_worker import stop_worker_client
+        await stop_worker_client()
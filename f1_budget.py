@@ -0,0 +1,177 @@
+"""
+F1 Bot - Prioritized upstream request budgets
+
+OpenF1 and Jolpica rate-limit, so every request to a budgeted host takes a
+token from that host's bucket first. Buckets refill at the host's sustained
+rate up to a burst size (UPSTREAM_BUDGETS). Requests carry a priority in a
+context variable, so it follows the call into `asyncio.to_thread` and into
+tasks without being passed through every function:
+
+- live: live-timing polls. May drain the bucket to zero and wait up to
+  LIVE_MAX_WAIT for a token.
+- interactive: a user's command (the default). Leaves LIVE_RESERVE of the
+  burst for live polls and waits at most INTERACTIVE_MAX_WAIT.
+- prefetch: background work that nobody is waiting on. Only runs while more
+  than PREFETCH_RESERVE of the burst is left, and never waits.
+
+Waiting means sleeping, so it is only allowed off the event loop (live polls
+and background work run in `asyncio.to_thread`). A handler that fetches on
+the loop thread is never deferred: it gets a token now or not at all.
+
+A request that can't get a token in time raises BudgetExceeded. fetch_json
+then serves its last data for the URL, just as it does for an open breaker.
+A 429 empties the bucket, so the next requests back off instead of being
+refused again.
+
+    UPSTREAM_BUDGETS="api.openf1.org=3/6,api.jolpi.ca=0.139/10"   # host=per-second/burst
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import f1_metrics
+
+logger = logging.getLogger(__name__)
+
+# Jolpica allows 500 requests/hour sustained; its responses are cached for
+# minutes to days, so a burst of 10 covers a cold start
+UPSTREAM_BUDGETS = os.getenv("UPSTREAM_BUDGETS", "api.openf1.org=3/6,api.jolpi.ca=0.139/10")
+
+LIVE, INTERACTIVE, PREFETCH = "live", "interactive", "prefetch"
+
+# Share of the burst each class must leave in the bucket
+LIVE_RESERVE = 0.25
+PREFETCH_RESERVE = 0.5
+RESERVES = {LIVE: 0.0, INTERACTIVE: LIVE_RESERVE, PREFETCH: PREFETCH_RESERVE}
+
+# Seconds a request may be deferred waiting for its token
+LIVE_MAX_WAIT = 2.0
+INTERACTIVE_MAX_WAIT = 0.5
+MAX_WAITS = {LIVE: LIVE_MAX_WAIT, INTERACTIVE: INTERACTIVE_MAX_WAIT, PREFETCH: 0.0}
+
+BUDGET_REQUESTS = f1_metrics.REGISTRY.counter(
+    "f1bot_upstream_budget_requests_total",
+    "Budgeted upstream requests by priority and outcome (granted, deferred, dropped)",
+    ("host", "priority", "outcome"))
+BUDGET_TOKENS = f1_metrics.REGISTRY.gauge(
+    "f1bot_upstream_budget_tokens", "Tokens left in each host's request budget", ("host",))
+BUDGET_CAPACITY = f1_metrics.REGISTRY.gauge(
+    "f1bot_upstream_budget_capacity", "Burst size of each host's request budget", ("host",))
+BUDGET_WAIT = f1_metrics.REGISTRY.histogram(
+    "f1bot_upstream_budget_wait_seconds", "Time deferred requests waited for a token", ("host", "priority"))
+
+_priority = ContextVar("request_priority", default=INTERACTIVE)
+
+
+def current_priority():
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority):
+    """Run upstream requests in this block (and tasks/threads started from it) at `priority`"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _on_event_loop():
+    """True when called from the thread running an asyncio event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class BudgetExceeded(Exception):
+    """Raised instead of sending a request its priority has no budget for"""
+
+    def __init__(self, host, priority):
+        super().__init__(f"no {priority} budget left for {host}")
+        self.host = host
+        self.priority = priority
+
+
+class TokenBucket:
+    def __init__(self, host, rate, burst):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        BUDGET_CAPACITY.set(host, value=burst)
+        BUDGET_TOKENS.set(host, value=burst)
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority):
+        """Take a token, waiting if the priority allows; raises BudgetExceeded"""
+        floor = 1 + self.burst * RESERVES[priority]
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (floor - self.tokens) / self.rate)
+            # Sleeping here would stall every other chat on the loop
+            if wait > MAX_WAITS[priority] or (wait and _on_event_loop()):
+                BUDGET_REQUESTS.inc(self.host, priority, "dropped")
+                raise BudgetExceeded(self.host, priority)
+            # Reserve the token now so later callers queue behind this one
+            self.tokens -= 1
+            BUDGET_TOKENS.set(self.host, value=round(max(self.tokens, 0.0), 2))
+
+        if wait:
+            BUDGET_REQUESTS.inc(self.host, priority, "deferred")
+            BUDGET_WAIT.observe(self.host, priority, value=wait)
+            time.sleep(wait)
+        else:
+            BUDGET_REQUESTS.inc(self.host, priority, "granted")
+
+    def drain(self):
+        """The host said 429: assume the budget is spent"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0.0)
+            BUDGET_TOKENS.set(self.host, value=0)
+
+
+def _parse_budgets(spec):
+    budgets = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        try:
+            host, limits = item.split("=", 1)
+            rate, burst = limits.split("/", 1)
+            rate = float(rate)
+            if rate <= 0:
+                raise ValueError(rate)
+            budgets[host.strip()] = (rate, max(1, int(burst)))
+        except ValueError:
+            logger.warning(f"Ignoring malformed UPSTREAM_BUDGETS entry: {item!r}")
+    return budgets
+
+
+_limits = _parse_budgets(UPSTREAM_BUDGETS)
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(host):
+    """The request budget for `host`, or None if the host is not budgeted"""
+    bucket = _buckets.get(host)
+    if bucket is None and host in _limits:
+        with _buckets_lock:
+            bucket = _buckets.get(host)
+            if bucket is None:
+                bucket = _buckets[host] = TokenBucket(host, *_limits[host])
+    return bucket
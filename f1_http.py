@@ -0,0 +1,249 @@
+"""
+F1 Bot - Upstream HTTP
+
+Every upstream call (Jolpica, OpenF1, Open-Meteo) goes through `http_get`,
+which times it, records metrics and feeds the recorder when one is active.
+
+`fetch_json` adds revalidation on top. The ETag / Last-Modified validators
+of each URL are kept and sent back as If-None-Match / If-Modified-Since, so
+an unchanged resource costs a 304 rather than a download. When the upstream
+sends no validators, the raw body is hashed, and an identical body reuses the
+previously decoded JSON instead of parsing it again. Either way the result
+carries a `version` (the body hash), so callers can also skip re-rendering
+data they have already rendered. Bodies are decoded with orjson; with
+`reduce`, large arrays are streamed through f1_json and never held whole.
+
+Each host has a circuit breaker (f1_resilience). Its adaptive timeout
+replaces the caller's timeout. While the breaker is open, `http_get` raises
+CircuitOpenError without sending anything. Rate-limited hosts also have a
+prioritized request budget (f1_budget); a request with no budget left raises
+BudgetExceeded. In both cases `fetch_json` serves the last data it decoded
+for the URL, if it has any.
+"""
+
+import os
+import time
+import hashlib
+import threading
+from functools import partial
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+from urllib.parse import urlsplit, urlencode
+
+import f1_json
+import f1_metrics
+from f1_profiling import span
+from f1_replay import get_recorder
+from f1_resilience import get_breaker, is_failure, CircuitOpenError
+from f1_budget import get_bucket, current_priority, BudgetExceeded, PREFETCH
+
+# Upstream base URLs. Overridable so the bot can be pointed at the local
+# replay server (see f1_replay.py) for offline profiling and benchmarks.
+JOLPICA_BASE_URL = os.getenv("JOLPICA_BASE_URL", "https://api.jolpi.ca")
+OPENF1_BASE_URL = os.getenv("OPENF1_BASE_URL", "https://api.openf1.org")
+OPEN_METEO_BASE_URL = os.getenv("OPEN_METEO_BASE_URL", "https://api.open-meteo.com")
+GEOCODING_BASE_URL = os.getenv("GEOCODING_BASE_URL", "https://geocoding-api.open-meteo.com")
+
+# URLs whose validators and decoded body are remembered
+MAX_VALIDATED_URLS = 256
+
+REVALIDATIONS = f1_metrics.REGISTRY.counter(
+    "f1bot_upstream_revalidations_total",
+    "Conditional fetches by outcome (not_modified, identical, changed)", ("host", "outcome"))
+BYTES_AVOIDED = f1_metrics.REGISTRY.counter(
+    "f1bot_upstream_bytes_avoided_total", "Response bytes not downloaded thanks to 304s", ("host",))
+PARSES_AVOIDED = f1_metrics.REGISTRY.counter(
+    "f1bot_upstream_parses_avoided_total", "JSON decodes skipped for unchanged bodies", ("host",))
+STALE_SERVED = f1_metrics.REGISTRY.counter(
+    "f1bot_upstream_stale_served_total",
+    "Last known data served because the host's breaker was open or its budget spent", ("host",))
+
+
+def http_get(url, params=None, timeout=30, headers=None, stream=False):
+    """GET an upstream URL; every upstream call in the bot goes through here"""
+    import requests  # deferred: costs ~80ms at startup and is cached after first use
+
+    parts = urlsplit(url)
+    breaker = get_breaker(parts.netloc)
+    if not breaker.allow():
+        raise CircuitOpenError(parts.netloc)
+    bucket = get_bucket(parts.netloc)
+    if bucket is not None:
+        bucket.acquire(current_priority())
+
+    endpoint = f1_metrics.endpoint_label(parts.path)
+    started = time.perf_counter()
+    try:
+        with span("upstream"):
+            response = requests.get(
+                url, params=params, timeout=breaker.timeout(timeout), headers=headers, stream=stream
+            )
+    except Exception as e:
+        f1_metrics.UPSTREAM_ERRORS.inc(parts.netloc, endpoint, type(e).__name__)
+        if isinstance(e, requests.RequestException):
+            breaker.failure(partial(_probe, url, params, timeout))
+        raise
+    elapsed = time.perf_counter() - started
+    f1_metrics.UPSTREAM_LATENCY.observe(parts.netloc, endpoint, str(response.status_code), value=elapsed)
+    if response.status_code == 429 and bucket is not None:
+        bucket.drain()
+    if is_failure(response.status_code):
+        breaker.failure(partial(_probe, url, params, timeout))
+    else:
+        breaker.success(elapsed)
+    recorder = get_recorder()
+    # Recording needs the whole body, so streamed responses are read in full
+    if recorder is not None:
+        recorder.record_http(
+            response.url, response.status_code, response.headers, response.content
+        )
+    return response
+
+
+def _probe(url, params, timeout):
+    """Half-open probe: re-send a failed request outside the breaker.
+
+    The probe is background work, so it takes a prefetch token from the
+    host's budget; with none left, BudgetExceeded fails the probe and the
+    breaker waits longer. A breaker opened on 429s is not probed into a
+    spent budget.
+    """
+    import requests
+
+    host = urlsplit(url).netloc
+    bucket = get_bucket(host)
+    if bucket is not None:
+        bucket.acquire(PREFETCH)
+    response = requests.get(url, params=params, timeout=get_breaker(host).timeout(timeout))
+    response.close()
+    if response.status_code == 429 and bucket is not None:
+        bucket.drain()
+    return not is_failure(response.status_code)
+
+
+class JsonResponse(NamedTuple):
+    status: int
+    data: Any
+    # Hash of the body the data was decoded from; None when there is no data
+    version: Optional[str]
+    # False when the data is the same object returned last time
+    changed: bool
+
+
+class _Validated(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    version: str
+    size: int
+    data: Any
+
+
+_validated = OrderedDict()
+_validated_lock = threading.Lock()
+
+
+def _remember(key, entry):
+    with _validated_lock:
+        _validated[key] = entry
+        _validated.move_to_end(key)
+        while len(_validated) > MAX_VALIDATED_URLS:
+            _validated.popitem(last=False)
+
+
+def fetch_json(url, params=None, timeout=30, reduce=None):
+    """GET and decode a JSON resource, revalidating against the last fetch.
+
+    With `reduce` the body must be a JSON array: it is decoded incrementally
+    while it downloads and only `reduce(elements)` is kept and returned.
+    The returned data may be shared with earlier calls and must not be mutated.
+    While the host's breaker is open or its budget is spent, the last data
+    for the URL is returned as unchanged; without any, the error propagates.
+    """
+    key = f"{url}?{urlencode(params)}" if params else url
+    if reduce is not None:
+        key = f"{key}#{reduce.__name__}"
+    with _validated_lock:
+        previous = _validated.get(key)
+
+    headers = {}
+    if previous is not None:
+        if previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+
+    host = urlsplit(url).netloc
+    try:
+        response = http_get(url, params=params, timeout=timeout, headers=headers or None, stream=reduce is not None)
+    except (CircuitOpenError, BudgetExceeded):
+        if previous is None:
+            raise
+        STALE_SERVED.inc(host)
+        return JsonResponse(200, previous.data, previous.version, False)
+    if reduce is not None:
+        with response:
+            return _fetch_reduced(key, host, response, previous, reduce)
+
+    if response.status_code == 304 and previous is not None:
+        REVALIDATIONS.inc(host, "not_modified")
+        BYTES_AVOIDED.inc(host, amount=previous.size)
+        PARSES_AVOIDED.inc(host)
+        _remember(key, previous)
+        return JsonResponse(200, previous.data, previous.version, False)
+
+    if response.status_code != 200:
+        return JsonResponse(response.status_code, None, None, True)
+
+    body = response.content
+    version = hashlib.blake2b(body, digest_size=8).hexdigest()
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if previous is not None and previous.version == version:
+        REVALIDATIONS.inc(host, "identical")
+        PARSES_AVOIDED.inc(host)
+        _remember(key, previous._replace(etag=etag, last_modified=last_modified))
+        return JsonResponse(200, previous.data, version, False)
+
+    REVALIDATIONS.inc(host, "changed")
+    data = f1_json.loads(body)
+    _remember(key, _Validated(etag, last_modified, version, len(body), data))
+    return JsonResponse(200, data, version, True)
+
+
+def _fetch_reduced(key, host, response, previous, reduce):
+    if response.status_code == 304 and previous is not None:
+        REVALIDATIONS.inc(host, "not_modified")
+        BYTES_AVOIDED.inc(host, amount=previous.size)
+        PARSES_AVOIDED.inc(host)
+        _remember(key, previous)
+        return JsonResponse(200, previous.data, previous.version, False)
+
+    if response.status_code != 200:
+        return JsonResponse(response.status_code, None, None, True)
+
+    hasher = hashlib.blake2b(digest_size=8)
+    size = 0
+
+    def chunks():
+        nonlocal size
+        for chunk in response.iter_content(f1_json.STREAM_CHUNK):
+            hasher.update(chunk)
+            size += len(chunk)
+            yield chunk
+
+    # The body is only known to be identical once it has been read, so
+    # nothing is saved on the parse here; the caller still skips its render.
+    data = reduce(f1_json.iter_json_array(chunks()))
+    version = hasher.hexdigest()
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if previous is not None and previous.version == version:
+        REVALIDATIONS.inc(host, "identical")
+        _remember(key, previous._replace(etag=etag, last_modified=last_modified))
+        return JsonResponse(200, previous.data, version, False)
+
+    REVALIDATIONS.inc(host, "changed")
+    _remember(key, _Validated(etag, last_modified, version, size, data))
+    return JsonResponse(200, data, version, True)
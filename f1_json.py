@@ -0,0 +1,88 @@
+"""
+F1 Bot - JSON decoding
+
+Upstream JSON is decoded with orjson. Large OpenF1 arrays (a session's
+position or interval history) are never materialised as one list:
+`iter_json_array` decodes the body chunk by chunk as it streams in, and a
+reducer such as `latest_per_driver` keeps only what the caller needs. Peak
+memory then follows the chunk size, not the payload.
+"""
+
+import orjson
+
+JSONDecodeError = orjson.JSONDecodeError
+
+# Bytes read from the socket per step when streaming
+STREAM_CHUNK = 64 * 1024
+
+_SEPARATORS = b" \t\r\n,"
+
+
+def loads(data):
+    return orjson.loads(data)
+
+
+def iter_json_array(chunks):
+    """Yield the elements of a top-level JSON array of objects from byte chunks.
+
+    Each step decodes everything up to the last complete element in the
+    buffer with one orjson call. The cut is made at a '}' and confirmed by
+    the decode itself: a '}' inside a string or a nested object leaves an
+    invalid prefix, so the next '}' back is tried instead.
+    """
+    buffer = b""
+    started = False
+    for chunk in chunks:
+        buffer += chunk
+        if not started:
+            buffer = buffer.lstrip()
+            if not buffer:
+                continue
+            if buffer[:1] != b"[":
+                raise ValueError("expected a JSON array")
+            buffer = buffer[1:]
+            started = True
+
+        # The separator after the last decoded element may only arrive with this chunk
+        buffer = buffer.lstrip(_SEPARATORS)
+        end = buffer.rfind(b"}")
+        while end != -1:
+            try:
+                batch = orjson.loads(b"[" + buffer[:end + 1] + b"]")
+            except orjson.JSONDecodeError:
+                end = buffer.rfind(b"}", 0, end)
+                continue
+            yield from batch
+            buffer = buffer[end + 1:]
+            break
+
+    if not started:
+        raise ValueError("empty body")
+    tail = buffer.strip()
+    if tail == b"]":
+        return
+    # Arrays of scalars or a truncated body: decode what is left in one go
+    yield from orjson.loads(b"[" + tail)
+
+
+def latest_per_driver(elements, key="driver_number", order="date", require=()):
+    """Reduce a stream of entries to the newest one per driver: {driver: entry}.
+
+    Entries missing `order` or any field in `require` are skipped; on equal
+    `order` values the first entry wins.
+    """
+    latest = {}
+    for entry in elements:
+        driver = entry.get(key)
+        stamp = entry.get(order)
+        if driver is None or not stamp or not all(entry.get(field) for field in require):
+            continue
+        current = latest.get(driver)
+        if current is None or stamp > current[order]:
+            latest[driver] = entry
+    return latest
+
+
+def latest_positions(elements):
+    """Newest position entry per driver from an OpenF1 /position stream"""
+    return latest_per_driver(elements, require=("position",))
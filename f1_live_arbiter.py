@@ -0,0 +1,327 @@
+"""
+F1 Bot - Live source arbiter
+
+With LIVE_SOURCE=auto the bot reads from every live source it knows
+(formula-timer, OpenF1 and the formula1.com scraper) instead of trusting one.
+Each source has a health record: EWMA latency, EWMA error rate and how long
+its board has gone without changing. Every tick the healthiest source is
+asked first; if it has not answered within LIVE_HEDGE_MS the next one is
+started as a hedge and whichever returns a board first wins. Fields the
+winner left empty (tyres, lap times, gaps) are filled per driver from other
+sources' recent snapshots, and `snapshot.source` names everything that
+contributed, e.g. "formula-timer+openf1".
+"""
+
+import os
+import time
+import asyncio
+import logging
+
+import f1_metrics
+from f1_budget import request_priority, PREFETCH
+from f1_live_model import make_row, make_snapshot, UNKNOWN
+
+logger = logging.getLogger(__name__)
+
+# Comma separated, in order of preference when health is equal
+LIVE_SOURCES = os.getenv("LIVE_SOURCES", "formula-timer,openf1,formula1.com")
+# Start a hedge request once the primary has been silent this long
+LIVE_HEDGE_MS = float(os.getenv("LIVE_HEDGE_MS", "1500"))
+# Give up on a tick after this long and serve the freshest board we have
+FETCH_TIMEOUT = 12.0
+# Other sources' snapshots younger than this may fill gaps in the winner's
+MERGE_MAX_AGE = 15.0
+# A board unchanged for longer than this is treated as frozen
+STALE_AFTER = 20.0
+# Sources not tried for this long get a background probe so they can recover
+PROBE_INTERVAL = 60.0
+
+EWMA_ALPHA = 0.2
+# Score penalties, in the same unit as latency (ms)
+ERROR_PENALTY_MS = 5000
+STALE_PENALTY_MS = 100
+PREFERENCE_STEP_MS = 50
+
+# Field groups copied together when merging (the text and parsed forms of a gap travel as a pair)
+MERGE_FIELDS = (
+    ("gap", "gap_ms"),
+    ("interval", "interval_ms"),
+    ("best_lap_ms",),
+    ("last_lap_ms",),
+    ("tyre_age",),
+    ("tyre_compound",),
+)
+
+SOURCE_SERVED = f1_metrics.REGISTRY.counter(
+    "f1bot_live_source_served_total", "Live snapshots served, by winning source", ("source",))
+SOURCE_HEDGES = f1_metrics.REGISTRY.counter(
+    "f1bot_live_source_hedges_total", "Hedge requests started because the primary was slow")
+SOURCE_SCORE = f1_metrics.REGISTRY.gauge(
+    "f1bot_live_source_score", "Live source health score in ms (lower is better)", ("source",))
+
+
+def _missing(value):
+    return value is None or value == "" or value == UNKNOWN
+
+
+# ==================== SOURCES ====================
+
+class LiveSource:
+    """A live timing source; fetch() returns a LiveSnapshot or None"""
+
+    name = ""
+
+    async def fetch(self):
+        raise NotImplementedError
+
+
+class FormulaTimerSource(LiveSource):
+    name = "formula-timer"
+
+    async def fetch(self):
+        from f1_playwright_scraper import read_formula_timer
+        return await read_formula_timer()
+
+
+class OpenF1Source(LiveSource):
+    name = "openf1"
+
+    async def fetch(self):
+        from f1_openf1_live import get_openf1_board
+        # Blocking HTTP; keep it off the event loop
+        return await asyncio.to_thread(get_openf1_board().poll)
+
+
+class F1TimingSource(LiveSource):
+    """formula1.com via F1TimingScraper; has names and gaps but no tyres or intervals"""
+
+    name = "formula1.com"
+
+    def __init__(self):
+        self.scraper = None
+
+    @staticmethod
+    def _code(name):
+        parts = (name or "").split()
+        return parts[-1][:3].upper() if parts else UNKNOWN
+
+    async def fetch(self):
+        from f1_bot_live import F1TimingScraper
+        if self.scraper is None:
+            scraper = F1TimingScraper()
+            await scraper.start_browser()
+            self.scraper = scraper
+
+        data = await self.scraper.scrape_live_timing_data()
+        if data.get("error") or not data.get("drivers"):
+            return None
+        rows = [
+            make_row(d.get("position"), self._code(d.get("driver")), d.get("gap"), "",
+                     None, d.get("lastLap"), None, None)
+            for d in data["drivers"]
+        ]
+        session = data.get("session_info", {}).get("sessionName", "F1 Live Timing")
+        return make_snapshot(session, sorted(rows, key=lambda row: row.position), source=self.name)
+
+
+SOURCE_TYPES = {cls.name: cls for cls in (FormulaTimerSource, OpenF1Source, F1TimingSource)}
+
+
+# ==================== HEALTH ====================
+
+class SourceHealth:
+    """Rolling latency, error rate and freshness for one source"""
+
+    def __init__(self, name, preference=0):
+        self.name = name
+        self.preference = preference
+        self.latency_ms = None
+        self.error_rate = 0.0
+        self.last_attempt = 0.0
+        self.last_snapshot = None
+        self.last_change = 0.0
+
+    def record(self, latency_ms, snapshot, now=None):
+        now = now or time.time()
+        self.last_attempt = now
+        failed = snapshot is None or not snapshot.rows
+        self.error_rate += EWMA_ALPHA * ((1.0 if failed else 0.0) - self.error_rate)
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += EWMA_ALPHA * (latency_ms - self.latency_ms)
+        if failed:
+            return
+        if self.last_snapshot is None or snapshot.rows != self.last_snapshot.rows:
+            self.last_change = now
+        self.last_snapshot = snapshot
+
+    def score(self, now=None):
+        """Expected cost of asking this source, in ms; lower is better"""
+        now = now or time.time()
+        latency = LIVE_HEDGE_MS if self.latency_ms is None else self.latency_ms
+        frozen = max(0.0, now - self.last_change - STALE_AFTER) if self.last_change else 0.0
+        return (
+            latency
+            + self.error_rate * ERROR_PENALTY_MS
+            + frozen * STALE_PENALTY_MS
+            + self.preference * PREFERENCE_STEP_MS
+        )
+
+    def recent(self, now=None, max_age=MERGE_MAX_AGE):
+        snapshot = self.last_snapshot
+        if snapshot is None or (now or time.time()) - snapshot.taken_at > max_age:
+            return None
+        return snapshot
+
+
+# ==================== ARBITER ====================
+
+class LiveArbiter:
+    def __init__(self, sources, hedge_after=LIVE_HEDGE_MS / 1000):
+        self.sources = list(sources)
+        self.hedge_after = hedge_after
+        self.health = {source.name: SourceHealth(source.name, i) for i, source in enumerate(self.sources)}
+        self._inflight = {}
+
+    def ranked(self, now=None):
+        now = now or time.time()
+        return sorted(self.sources, key=lambda source: self.health[source.name].score(now))
+
+    async def _run(self, source):
+        started = time.perf_counter()
+        try:
+            snapshot = await source.fetch()
+        except Exception as e:
+            logger.warning(f"Live source {source.name} failed: {e}")
+            snapshot = None
+        health = self.health[source.name]
+        health.record((time.perf_counter() - started) * 1000, snapshot)
+        SOURCE_SCORE.set(source.name, value=health.score())
+        return snapshot
+
+    def _start(self, source):
+        """The running fetch for `source`; a hedge loser from the last tick is reused"""
+        task = self._inflight.get(source.name)
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self._run(source))
+            self._inflight[source.name] = task
+        return task
+
+    def _probe_idle(self, now, started):
+        for source in self.sources:
+            if source.name not in started and now - self.health[source.name].last_attempt > PROBE_INTERVAL:
+                # Nobody waits on a probe; it only spends budget live polls don't need
+                with request_priority(PREFETCH):
+                    self._start(source)
+
+    async def fetch(self):
+        """The best live snapshot available this tick, or None"""
+        now = time.time()
+        waiting = self.ranked(now)
+        primary = waiting.pop(0)
+        tasks = {self._start(primary): primary}
+        hedged = False
+        winner = None
+        deadline = time.monotonic() + FETCH_TIMEOUT
+
+        while tasks and winner is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(self.hedge_after, remaining) if waiting and not hedged else remaining
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if waiting and not hedged:
+                    # Primary is over its latency budget: race the next source against it
+                    hedged = True
+                    SOURCE_HEDGES.inc()
+                    tasks[self._start(waiting.pop(0))] = None
+                continue
+            for task in done:
+                tasks.pop(task)
+                snapshot = task.result()
+                if winner is None and snapshot is not None and snapshot.rows:
+                    winner = snapshot
+            if winner is None and not tasks and waiting:
+                tasks[self._start(waiting.pop(0))] = None
+
+        # Slower fetches keep running; they only update their source's health
+        self._probe_idle(now, {source.name for source in self.sources if source not in waiting})
+
+        if winner is None:
+            winner = self._freshest(time.time())
+            if winner is None:
+                return None
+        merged = self.merge(winner)
+        SOURCE_SERVED.inc(winner.source)
+        return merged
+
+    def _freshest(self, now):
+        candidates = [h.recent(now) for h in self.health.values()]
+        candidates = [s for s in candidates if s is not None and s.rows]
+        return max(candidates, key=lambda s: s.taken_at) if candidates else None
+
+    def merge(self, winner, now=None):
+        """Fill fields the winner is missing from other sources' recent snapshots"""
+        now = now or time.time()
+        others = [
+            h.recent(now) for name, h in self.health.items()
+            if name != winner.source and h.recent(now) is not None
+        ]
+        if not others:
+            return winner
+
+        by_driver = {}
+        for other in others:
+            for row in other.rows:
+                by_driver.setdefault(row.driver, (other.source, row))
+
+        used = set()
+        rows = []
+        for row in winner.rows:
+            match = by_driver.get(row.driver)
+            if match is not None:
+                source, other = match
+                fill = {}
+                for group in MERGE_FIELDS:
+                    key = group[-1]
+                    # The leader has no gap or interval by definition
+                    if row.position == 1 and key in ("gap_ms", "interval_ms"):
+                        continue
+                    if _missing(getattr(row, key)) and not _missing(getattr(other, key)):
+                        fill.update((field, getattr(other, field)) for field in group)
+                if fill:
+                    row = row._replace(**fill)
+                    used.add(source)
+            rows.append(row)
+
+        if not used:
+            return winner
+        return winner._replace(rows=tuple(rows), source="+".join([winner.source, *sorted(used)]))
+
+    def status(self, now=None):
+        """Per-source health for logs and the bench"""
+        now = now or time.time()
+        return {
+            name: {
+                "score_ms": round(h.score(now), 1),
+                "latency_ms": None if h.latency_ms is None else round(h.latency_ms, 1),
+                "error_rate": round(h.error_rate, 3),
+            }
+            for name, h in self.health.items()
+        }
+
+
+_arbiter = None
+
+
+def get_arbiter():
+    global _arbiter
+    if _arbiter is None:
+        names = [name.strip() for name in LIVE_SOURCES.split(",") if name.strip()]
+        unknown = [name for name in names if name not in SOURCE_TYPES]
+        if unknown:
+            logger.warning(f"Ignoring unknown live sources: {', '.join(unknown)}")
+        _arbiter = LiveArbiter(SOURCE_TYPES[name]() for name in names if name in SOURCE_TYPES)
+    return _arbiter
@@ -0,0 +1,146 @@
+"""
+F1 Bot - Race event detection
+
+Diffs consecutive LiveSnapshots and emits typed events (overtakes, pit
+stops, fastest laps, race control messages). Unchanged rows are skipped with
+a single tuple comparison, so the work per tick follows the number of rows
+that actually changed. Events go into a sequence-numbered ring that
+subscribers read incrementally with `since(last_seq)`.
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+# Events kept for subscribers that fall behind
+EVENT_LOG_SIZE = 200
+
+
+class Overtake(NamedTuple):
+    seq: int
+    taken_at: float
+    driver: str
+    passed: str
+    position: int
+
+
+class PitStop(NamedTuple):
+    seq: int
+    taken_at: float
+    driver: str
+    compound: str
+    previous_compound: str
+
+
+class FastestLap(NamedTuple):
+    seq: int
+    taken_at: float
+    driver: str
+    lap_ms: int
+
+
+class RaceControl(NamedTuple):
+    seq: int
+    taken_at: float
+    time: str
+    message: str
+
+
+class RaceEventDetector:
+    """Turns a stream of snapshots into race events"""
+
+    def __init__(self):
+        self.reset(None)
+        self.seq = 0
+        self.events = deque(maxlen=EVENT_LOG_SIZE)
+
+    def reset(self, session_name):
+        self.session_name = session_name
+        self.previous = None
+        self.rows_by_driver = {}
+        self.driver_at = {}
+        self.fastest_ms = None
+        self.race_control_seen = set()
+
+    @property
+    def last_seq(self):
+        return self.seq
+
+    def _emit(self, cls, taken_at, *fields):
+        self.seq += 1
+        event = cls(self.seq, taken_at, *fields)
+        self.events.append(event)
+        return event
+
+    def process(self, snapshot):
+        """Diff `snapshot` against the previous one; returns the new events"""
+        if snapshot is None or snapshot is self.previous:
+            return []
+        if snapshot.session_name != self.session_name:
+            self.reset(snapshot.session_name)
+
+        baseline = self.previous is None
+        previous_rows = self.previous.rows if self.previous is not None else ()
+        taken_at = snapshot.taken_at
+        emitted = []
+
+        changed = [
+            row for index, row in enumerate(snapshot.rows)
+            if index >= len(previous_rows) or row != previous_rows[index]
+        ]
+
+        old_driver_at = self.driver_at
+        if changed:
+            self.driver_at = {row.position: row.driver for row in snapshot.rows if row.position}
+
+        for row in changed:
+            before = self.rows_by_driver.get(row.driver)
+            self.rows_by_driver[row.driver] = row
+
+            if row.best_lap_ms and (self.fastest_ms is None or row.best_lap_ms < self.fastest_ms):
+                if not baseline and self.fastest_ms is not None:
+                    emitted.append(self._emit(FastestLap, taken_at, row.driver, row.best_lap_ms))
+                self.fastest_ms = row.best_lap_ms
+
+            if before is None or baseline:
+                continue
+
+            if 0 < row.position < before.position:
+                passed = old_driver_at.get(row.position)
+                if passed and passed != row.driver:
+                    emitted.append(self._emit(Overtake, taken_at, row.driver, passed, row.position))
+
+            compound_changed = (
+                row.tyre_compound != before.tyre_compound
+                and "N/A" not in (row.tyre_compound, before.tyre_compound)
+            )
+            tyres_reset = (
+                row.tyre_age is not None and before.tyre_age is not None
+                and row.tyre_age < before.tyre_age
+            )
+            if compound_changed or tyres_reset:
+                emitted.append(self._emit(PitStop, taken_at, row.driver, row.tyre_compound, before.tyre_compound))
+
+        for message in snapshot.race_control:
+            if message in self.race_control_seen:
+                continue
+            self.race_control_seen.add(message)
+            if not baseline:
+                emitted.append(self._emit(RaceControl, taken_at, message.time, message.message))
+
+        self.previous = snapshot
+        return emitted
+
+    def since(self, seq):
+        """Events with a sequence number greater than `seq`, oldest first"""
+        if not self.events or seq >= self.seq:
+            return []
+        first = self.events[0].seq
+        start = max(0, seq - first + 1)
+        return [self.events[i] for i in range(start, len(self.events))]
+
+
+_detector = RaceEventDetector()
+
+
+def get_event_detector():
+    return _detector
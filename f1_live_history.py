@@ -0,0 +1,261 @@
+"""
+F1 Bot - Bounded live session history
+
+Keeps the recent past of a live session in fixed-size NumPy ring buffers so
+the live message can show trends ("gap closing", "last 5 laps") without
+re-fetching. Storage is column-wise, one column per driver:
+
+- per tick: snapshot time, gap to leader (ms) and position
+- per driver: a ring of completed lap times (ms), appended once per new lap
+
+Buffers are allocated once per session from LIVE_HISTORY_BUDGET_KB and never
+grow; the oldest ticks/laps are overwritten.
+"""
+
+import os
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LIVE_HISTORY_BUDGET_KB = int(os.getenv("LIVE_HISTORY_BUDGET_KB", "256"))
+MAX_DRIVERS = 24
+LAP_CAPACITY = 80
+# Sessions kept at once (e.g. a race plus the qualifying that just ended)
+MAX_SESSIONS = 2
+
+# Gap changes smaller than this over the trend window are shown as steady
+TREND_THRESHOLD_MS = 100
+
+
+# Ticks to wait for the lap time and the tyre age to agree on a new lap
+# before counting it on whichever of the two did change
+LAP_SETTLE_TICKS = 5
+
+
+def lap_state(row):
+    """(lap number, lap time, stint) of row, compared lap to lap by lap_moved()"""
+    return (row.last_lap_number, row.last_lap_ms, (row.tyre_compound, row.tyre_age))
+
+
+def lap_moved(row, last):
+    """How far row has moved on from the last recorded lap state.
+
+    Returns True for a new lap, False for the same lap and None while only one
+    of the lap time and the tyre age has changed. The lap number decides
+    where the source reports it (OpenF1). Otherwise the time and the laps on
+    the current tyres are updated by the timing page on separate ticks, so a
+    new lap needs both to have moved; an identical lap time or a stale tyre
+    age shows up as one of them alone and is settled by the caller. Without
+    a tyre age the time alone decides.
+    """
+    if last is None:
+        return True
+    if row.last_lap_number is not None:
+        return row.last_lap_number != last[0]
+    time_moved = row.last_lap_ms != last[1]
+    if row.tyre_age is None:
+        return time_moved
+    stint_moved = (row.tyre_compound, row.tyre_age) != last[2]
+    if time_moved and stint_moved:
+        return True
+    if time_moved or stint_moved:
+        return None
+    return False
+
+
+class SessionHistory:
+    """Ring-buffered timing history for one session"""
+
+    def __init__(self, session_name, budget_bytes=LIVE_HISTORY_BUDGET_KB * 1024,
+                 max_drivers=MAX_DRIVERS, lap_capacity=LAP_CAPACITY):
+        self.session_name = session_name
+        self.max_drivers = max_drivers
+        self.lap_capacity = lap_capacity
+
+        lap_bytes = max_drivers * lap_capacity * 4 + max_drivers * 8
+        tick_bytes = 8 + max_drivers * (4 + 1)
+        self.capacity = max(16, (budget_bytes - lap_bytes) // tick_bytes)
+
+        self.columns = {}
+        self.taken_at = np.zeros(self.capacity, dtype=np.float64)
+        self.gaps = np.full((self.capacity, max_drivers), np.nan, dtype=np.float32)
+        self.positions = np.zeros((self.capacity, max_drivers), dtype=np.int8)
+        self.ticks = 0
+
+        self.laps = np.full((max_drivers, lap_capacity), np.nan, dtype=np.float32)
+        self.lap_counts = np.zeros(max_drivers, dtype=np.int32)
+        # State of the last lap appended per driver and the tick since which
+        # it has half moved on; see lap_moved()
+        self.last_lap_seen = [None] * max_drivers
+        self.lap_pending = [None] * max_drivers
+
+    @property
+    def nbytes(self):
+        return (self.taken_at.nbytes + self.gaps.nbytes + self.positions.nbytes
+                + self.laps.nbytes + self.lap_counts.nbytes)
+
+    def _column(self, driver):
+        column = self.columns.get(driver)
+        if column is None:
+            if len(self.columns) >= self.max_drivers:
+                return None
+            column = len(self.columns)
+            self.columns[driver] = column
+        return column
+
+    def record(self, snapshot):
+        """Append one snapshot; returns False if it was already recorded"""
+        if self.ticks and self.taken_at[(self.ticks - 1) % self.capacity] == snapshot.taken_at:
+            return False
+
+        slot = self.ticks % self.capacity
+        self.taken_at[slot] = snapshot.taken_at
+        self.gaps[slot] = np.nan
+        self.positions[slot] = 0
+
+        for row in snapshot.rows:
+            column = self._column(row.driver)
+            if column is None:
+                continue
+            if row.position == 1:
+                self.gaps[slot, column] = 0
+            elif row.gap_ms is not None:
+                self.gaps[slot, column] = row.gap_ms
+            self.positions[slot, column] = row.position
+
+            lap_ms = row.last_lap_ms
+            if not lap_ms:
+                continue
+            moved = lap_moved(row, self.last_lap_seen[column])
+            if moved is None:
+                if self.lap_pending[column] is None:
+                    self.lap_pending[column] = self.ticks
+                moved = self.ticks - self.lap_pending[column] >= LAP_SETTLE_TICKS
+            elif not moved:
+                self.lap_pending[column] = None
+            if moved:
+                self.last_lap_seen[column] = lap_state(row)
+                self.lap_pending[column] = None
+                self.laps[column, self.lap_counts[column] % self.lap_capacity] = lap_ms
+                self.lap_counts[column] += 1
+
+        self.ticks += 1
+        return True
+
+    def _window(self, window):
+        """Ring indices of the last `window` ticks, oldest first"""
+        count = min(window, self.ticks, self.capacity)
+        return np.arange(self.ticks - count, self.ticks) % self.capacity
+
+    def gap_trends(self, window=10):
+        """{driver: change in gap to leader (ms) over the last `window` ticks}"""
+        indices = self._window(window)
+        if len(indices) < 2:
+            return {}
+        deltas = self.gaps[indices[-1]] - self.gaps[indices[0]]
+        return {
+            driver: float(deltas[column])
+            for driver, column in self.columns.items()
+            if not np.isnan(deltas[column])
+        }
+
+    def position_deltas(self, window=10):
+        """{driver: places gained (+) or lost (-) over the last `window` ticks}"""
+        indices = self._window(window)
+        if len(indices) < 2:
+            return {}
+        first = self.positions[indices[0]].astype(np.int16)
+        last = self.positions[indices[-1]].astype(np.int16)
+        known = (first > 0) & (last > 0)
+        return {
+            driver: int(first[column] - last[column])
+            for driver, column in self.columns.items()
+            if known[column]
+        }
+
+    def last_laps(self, driver, n=5):
+        """Up to `n` most recent lap times of a driver in ms, oldest first"""
+        column = self.columns.get(driver)
+        if column is None:
+            return []
+        count = int(min(n, self.lap_counts[column], self.lap_capacity))
+        end = int(self.lap_counts[column])
+        indices = np.arange(end - count, end) % self.lap_capacity
+        return [int(ms) for ms in self.laps[column, indices]]
+
+    def rolling_lap_average(self, n=5):
+        """{driver: mean of the last `n` laps in ms}, vectorized over drivers"""
+        result = {}
+        count = np.minimum(self.lap_counts, min(n, self.lap_capacity))
+        if not count.any():
+            return result
+        offsets = np.arange(1, min(n, self.lap_capacity) + 1)
+        indices = (self.lap_counts[:, None] - offsets[None, :]) % self.lap_capacity
+        recent = np.take_along_axis(self.laps, indices, axis=1)
+        recent[offsets[None, :] > count[:, None]] = 0
+        means = recent.sum(axis=1, dtype=np.float64) / np.maximum(count, 1)
+        for driver, column in self.columns.items():
+            if count[column]:
+                result[driver] = float(means[column])
+        return result
+
+    def fastest_lap(self):
+        """(driver, lap_ms) of the fastest lap still in the buffer, or None"""
+        if not self.columns or np.isnan(self.laps).all():
+            return None
+        column, _ = np.unravel_index(np.nanargmin(self.laps), self.laps.shape)
+        for driver, c in self.columns.items():
+            if c == column:
+                return driver, int(np.nanmin(self.laps[column]))
+        return None
+
+
+class LiveHistory:
+    """Per-session histories, keeping only the most recent MAX_SESSIONS"""
+
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+
+    def session(self, session_name):
+        history = self.sessions.get(session_name)
+        if history is None:
+            history = SessionHistory(session_name)
+            self.sessions[session_name] = history
+            while len(self.sessions) > self.max_sessions:
+                evicted, _ = self.sessions.popitem(last=False)
+                logger.info(f"Dropped live history for {evicted}")
+        else:
+            self.sessions.move_to_end(session_name)
+        return history
+
+    def record(self, snapshot):
+        if not snapshot or not snapshot.rows:
+            return None
+        history = self.session(snapshot.session_name)
+        history.record(snapshot)
+        return history
+
+    def get(self, session_name):
+        return self.sessions.get(session_name)
+
+
+_history = LiveHistory()
+
+
+def get_history():
+    return _history
+
+
+def trend_arrow(delta_ms):
+    """Gap change -> arrow: closing on the leader, dropping back or steady"""
+    if delta_ms is None:
+        return ""
+    if delta_ms <= -TREND_THRESHOLD_MS:
+        return "↓"
+    if delta_ms >= TREND_THRESHOLD_MS:
+        return "↑"
+    return "→"
@@ -0,0 +1,151 @@
+"""
+F1 Bot - Live timing snapshot model
+
+Immutable, tuple-backed records for live timing. A LiveSnapshot is built
+once per scrape and then shared by every renderer (and the history/event
+stages) without copying. Driver codes and tyre compounds are interned and
+lap times are parsed once into integer milliseconds.
+"""
+
+import sys
+import re
+import time
+from typing import NamedTuple, Optional, Tuple
+
+import orjson
+
+
+class TimingRow(NamedTuple):
+    position: int
+    driver: str
+    gap: str
+    interval: str
+    gap_ms: Optional[int]
+    interval_ms: Optional[int]
+    best_lap_ms: Optional[int]
+    last_lap_ms: Optional[int]
+    tyre_age: Optional[int]
+    tyre_compound: str
+    # Number of the lap last_lap_ms belongs to, where the source reports it
+    last_lap_number: Optional[int] = None
+
+
+class RaceControlMessage(NamedTuple):
+    time: str
+    message: str
+
+
+class LiveSnapshot(NamedTuple):
+    session_name: str
+    rows: Tuple[TimingRow, ...]
+    race_control: Tuple[RaceControlMessage, ...]
+    taken_at: float
+    source: str = "formula-timer"
+
+    def row_for(self, driver):
+        for row in self.rows:
+            if row.driver == driver:
+                return row
+        return None
+
+
+# Compound codes are string literals (already interned); map image/name hints onto them
+COMPOUNDS = ("S", "M", "H", "I", "W")
+UNKNOWN = "N/A"
+
+_LAP_RE = re.compile(r"^(?:(\d+):)?(\d+)(?:\.(\d{1,3}))?$")
+_GAP_RE = re.compile(r"^\+?(\d+(?:\.\d{1,3})?)s?$")
+
+
+def intern_code(code):
+    """Intern a driver code so every snapshot shares one string object"""
+    return sys.intern(code) if code else UNKNOWN
+
+
+def parse_lap_ms(text):
+    """'1:23.456' / '83.456' -> 83456; anything else -> None"""
+    if not text:
+        return None
+    match = _LAP_RE.match(text.strip())
+    if not match:
+        return None
+    minutes, seconds, fraction = match.groups()
+    ms = (int(minutes or 0) * 60 + int(seconds)) * 1000
+    if fraction:
+        ms += int(fraction.ljust(3, "0"))
+    return ms
+
+
+def parse_gap_ms(text):
+    """'+1.234' -> 1234; lapped cars, 'LEADER' and blanks -> None"""
+    if not text:
+        return None
+    match = _GAP_RE.match(text.strip())
+    if not match:
+        return None
+    seconds, _, fraction = match.group(1).partition(".")
+    return int(seconds) * 1000 + (int(fraction.ljust(3, "0")) if fraction else 0)
+
+
+def parse_int(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_lap_ms(ms):
+    """83456 -> '1:23.456'"""
+    if ms is None:
+        return UNKNOWN
+    minutes, rest = divmod(ms, 60000)
+    seconds, millis = divmod(rest, 1000)
+    if minutes:
+        return f"{minutes}:{seconds:02d}.{millis:03d}"
+    return f"{seconds}.{millis:03d}"
+
+
+def make_row(position, driver, gap, interval, best_lap, last_lap, tyre_age, tyre_compound, last_lap_number=None):
+    """Build a TimingRow from the raw strings the scrapers extract"""
+    return TimingRow(
+        position=parse_int(position) or 0,
+        driver=intern_code(driver),
+        gap=gap or "",
+        interval=interval or "",
+        gap_ms=parse_gap_ms(gap),
+        interval_ms=parse_gap_ms(interval),
+        best_lap_ms=parse_lap_ms(best_lap),
+        last_lap_ms=parse_lap_ms(last_lap),
+        tyre_age=parse_int(tyre_age),
+        tyre_compound=tyre_compound if tyre_compound in COMPOUNDS else UNKNOWN,
+        last_lap_number=parse_int(last_lap_number),
+    )
+
+
+def make_snapshot(session_name, rows, race_control=(), source="formula-timer", taken_at=None):
+    return LiveSnapshot(
+        session_name=session_name,
+        rows=tuple(rows),
+        race_control=tuple(race_control),
+        taken_at=time.time() if taken_at is None else taken_at,
+        source=source,
+    )
+
+
+def encode_snapshot(snapshot):
+    """Compact wire form: nested JSON arrays in field order"""
+    return orjson.dumps(snapshot, default=tuple)
+
+
+def decode_snapshot(data):
+    session_name, rows, race_control, taken_at, source = orjson.loads(data)
+    return LiveSnapshot(
+        session_name=session_name,
+        rows=tuple(
+            TimingRow(row[0], intern_code(row[1]), *row[2:9], sys.intern(row[9]), *row[10:])
+            for row in rows
+        ),
+        race_control=tuple(RaceControlMessage(*message) for message in race_control),
+        taken_at=taken_at,
+        source=source,
+    )
@@ -0,0 +1,666 @@
+"""
+F1 Bot - Locales and view templates
+
+User-facing text in Azerbaijani (the default), English and Turkish. Each chat
+picks its locale with /language (kept in f1_preferences).
+
+Views (standings, results, schedule, live board) are not built as strings by
+the fetchers any more. A fetcher produces a *document*: a list of
+(part, fields) pairs holding only data, e.g. ("row", {"position": 1, ...}),
+plus the version of the upstream data it came from. Documents are what the
+shared cache stores, so there is one per view whatever the number of
+locales. Each part has a template per locale, compiled once on first use:
+catalog references are substituted and the result is bound to a
+`format_map`. Rendering a document is then one format call per part.
+Rendered messages are cached per (view, locale, version), so a view costs
+one fetch per data version and one render per locale in use.
+
+Template syntax: `{field}` is a document field, `[key]` is a catalog entry
+(whose own `{field}` placeholders become document fields) and `[@field]` is
+the catalog entry named by a field's value, e.g. a session kind. A catalog
+entry that is missing in a locale falls back to DEFAULT_LOCALE.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import f1_metrics
+
+logger = logging.getLogger(__name__)
+
+LOCALES = ("az", "en", "tr")
+DEFAULT_LOCALE = os.getenv("DEFAULT_LOCALE", "az")
+if DEFAULT_LOCALE not in LOCALES:
+    logger.warning(f"Unknown DEFAULT_LOCALE {DEFAULT_LOCALE!r}; using az")
+    DEFAULT_LOCALE = "az"
+
+LOCALE_NAMES = {"az": "🇦🇿 Azərbaycanca", "en": "🇬🇧 English", "tr": "🇹🇷 Türkçe"}
+
+# Rendered messages kept across views, locales and data versions
+MAX_CACHED_RENDERS = 512
+
+CATALOGS = {
+    "az": {
+        "welcome_title": "🏎️ F1 Canlı Botuna Xoş Gəlmisiniz!",
+        "welcome_text": """🏁 Sizin Formula 1 üçün ən yaxşı yoldaşınız - real vaxt yarış məlumatları, sıralamalar və canlı vaxt məlumatları.
+
+*Edə biləcəyiniz:*
+🏆 Cari çempionat sıralamalarını yoxlayın
+🏎️ Son nəticələri alın
+📅 Gələn yarış cədvəllərini və hava proqnozunu (Bakı vaxtı ilə) görün
+🔴 Canlı vaxtı izləyin""",
+        "menu_title": "🏎️ F1 Bot Menyusu",
+        "menu_text": "Aşağıdakı variantlardan birini seçin:",
+        "driver_standings": "🏆 Sürücü Sıralamaları",
+        "constructor_standings": "🏁 Konstruktor Sıralamaları",
+        "last_session": "🏎️ Son Sessiya Nəticələri",
+        "schedule_weather": "📅 Cədvəl & Hava",
+        "live_timing": "🔴 Canlı Vaxt",
+        "help_commands_btn": "ℹ️ Kömək & Əmrlər",
+        "back_to_menu_btn": "🏠 Ana Menyuya Qayıt",
+        "full_calendar_btn": "📅 Tam Mövsüm Cədvəlini Gör",
+        "stop_btn": "🛑 Dayandır",
+        "season_driver_standings": " Pilotların Çempionat Sıralaması",
+        "constructor_standings_title": "Konstruktorların Çempionat Sıralaması",
+        "season_calendar": "F1 Mövsüm Cədvəli",
+        "points": "xal",
+        "sprint": "Sprint",
+        "winner": " - Qalib",
+        "fastest_lap": "Ən Sürətli Dövrə: {} ({})",
+        "next_race": "🏎️ *Gələn Yarış*",
+        "fp1": "FP1",
+        "fp2": "FP2",
+        "fp3": "FP3",
+        "sprint_qualifying": "Sprint Təsnifatı",
+        "qualifying": "Təsnifat",
+        "race": "Yarış",
+        "all_times_baku": "_Bütün vaxtlar Bakı vaxtı ilə_",
+        "all_times_in": "_Bütün vaxtlar {tz} saat qurşağı ilə_",
+        "timezone_current": "🕐 Saat qurşağınız: *{}*\n\nDəyişmək üçün: /timezone Europe/Istanbul\nBakı vaxtına qayıtmaq üçün: /timezone reset",
+        "timezone_set": "✅ Saat qurşağı dəyişdirildi: *{}*",
+        "timezone_invalid": "❌ Naməlum saat qurşağı: {}\n\nNümunə: /timezone Europe/London",
+        "language_current": "🌐 Dil: *{}*\n\nDəyişmək üçün: /language en",
+        "language_set": "✅ Dil dəyişdirildi: *{}*",
+        "language_invalid": "❌ Naməlum dil: {}\n\nMövcud dillər: {}",
+        "season_completed": "🏁 Mövsüm tamamlandı! Bu il üçün daha yarış yoxdur.",
+        "no_race_schedule": "❌ Bu mövsüm üçün yarış cədvəli tapılmadı.",
+        "weather_forecast": "🌤️ Hava proqnozu",
+        "friday": "Cümə",
+        "saturday": "Şənbə",
+        "sunday": "Bazar",
+        "race_day": "Bazar (Yarış)",
+        "no_live_data": "❌ Canlı vaxt məlumatları mövcud deyil\n\nSon nəticələr üçün /lastrace istifadə edin",
+        "live_not_available": "❌ Canlı vaxt mövcud deyil\n\nSon nəticələr üçün /lastrace istifadə edin",
+        "no_active_session": "❌ *Hal-hazırda aktiv F1 sessiyası yoxdur*\n\n🔴 Canlı vaxt yalnız F1 yarış həftəsonlarında mövcuddur.",
+        "live_features": "📊 Canlı vaxt göstərir:\n• Sürücülərin mövqeləri\n• Interval vaxtları\n• Ən yaxşı dövrə vaxtları\n• Təkər məlumatları\n• Hər çağırışda yenilənən məlumatlar\n\nAlternativlər:\n• /nextrace - Gələn yarış və hava proqnozu\n• /lastrace - Son sessiya nəticələri",
+        "live_starting": "🔴 Canlı vaxt başladılır...\nMəlumatlar avtomatik yenilənəcək 🔄",
+        "live_events_started": "🔔 Canlı hadisə bildirişləri aktivdir: ötmələr, pit-stoplar, ən sürətli dövrələr.",
+        "live_stopped": "🛑 Canlı yayım dayandırıldı.",
+        "live_session_label": "SESSİYA",
+        "live_timing_label": "CANLI VAXT",
+        "live_no_rows": "Vaxt məlumatı yoxdur - sessiya aktiv olmaya bilər",
+        "live_last_update": "Son yenilənmə",
+        "event_overtake": "⚔️ *{driver}* {passed} sürücüsünü ötdü — P{position}",
+        "event_pit_stop": "🛞 *{driver}* pit-stop etdi ({previous} → {compound})",
+        "event_fastest_lap": "⏱️ *{driver}* ən sürətli dövrə: {lap}",
+        "event_race_control": "🏁 Yarış nəzarəti ({time}): {message}",
+        "loading": "⏳ Yüklənir...",
+        "api_unavailable": "❌ Xidmət mənbəyi baxımdadır. Bir neçə dəqiqə sonra yenidən cəhd edin.",
+        "no_standings": "❌ Bu mövsüm üçün sıralama məlumatları tapılmadı.",
+        "no_driver_standings": "❌ Sürücü sıralamaları tapılmadı.",
+        "invalid_data": "❌ Mənbədən yanlış məlumat format.",
+        "no_constructor_standings": "❌ Konstruktor sıralamaları tapılmadı.",
+        "no_sessions": "❌ Sessiya tapılmadı. API offline ola bilər.",
+        "no_recent_sessions": "❌ Son tamamlanmış sessiyalar tapılmadı.",
+        "no_results": "❌ Bu sessiya üçün nəticələr mövcud deyil.",
+        "no_position_data": "❌ Bu sessiya üçün mövqe məlumatları mövcud deyil.",
+        "no_final_positions": "❌ Bu sessiya üçün final mövqelər mövcud deyil.",
+        "error_fetching_session": "❌ Sessiya nəticələrini almaqda xəta: {}",
+        "error_fetching_race": "❌ Gələn yarış alınarkən xəta: {}",
+        "weather_unavailable": "❌ Hava məlumatları mövcud deyil.",
+        "error_fetching_weather": "❌ Hava məlumatları alınarkən xəta: {}",
+        "service_unavailable": "❌ Xidmət müvəqqəti mövcud deyil. Daha sonra yenidən cəhd edin.",
+        "error_occurred": "❌ Xəta baş verdi: {}",
+        "unknown_command": "❌ Naməlum əmr",
+        "profile_started": "⏱️ Profil {} saniyə ərzində yazılır...",
+        "profile_saved": "✅ Profil yazıldı: `{}`",
+        "live_session_check": "🔴 Canlı sessiya yoxlanılır...",
+        "live_session_active": "🔴 Canlı sessiya aktivdir! Mövqelər yenilənir...",
+        "live_session_inactive": "🔴 Hal-hazırda aktiv F1 sessiyası yoxdur",
+        "live_session_error": "❌ Canlı sessiya yoxlanarkən xəta: {}",
+        "live_timing_available": "🔴 Canlı vaxt mövcuddur!",
+        "live_timing_unavailable": "❌ Canlı vaxt mövcud deyil",
+        "live_positions_loading": "⏳ Mövqe məlumatları yüklənir...",
+        "live_data_source": "ℹ️ *Mənbə:* OpenF1 API",
+        "live_refresh_button": "🔄 Yenilə",
+        "live_positions_header": "📊 *Cari Mövqelər:*",
+        "live_session_location": "📍 *Məkan:*",
+        "live_session_time": "🕐 *Başlama vaxtı:*",
+        "live_update_frequency": "🔄 *Məlumatlar hər 15 saniyədə yenilənir*",
+        "live_position_winner": "🏆",
+        "live_session_info_error": "Sessiya məlumatları natamam",
+        "live_positions_error": "Mövqe məlumatları mövcud deyil",
+        "live_no_session_found": "Aktiv F1 sessiyası tapılmadı",
+        "live_check_error": "Live timing yoxlanılarkən xəta",
+        "live_time_unknown": "Naməlum",
+        "baku": "Bakı",
+        "round": "Raund",
+        "pole_position": "Pole mövqeyi",
+        "sprint_winner": "Sprint qalibi",
+        "results_usage": "ℹ️ İstifadə: /results <il> <raund>\n\nNümunə: /results 2021 22",
+        "results_not_archived": "❌ Arxivdə {} mövsümünün {} raundu tapılmadı.",
+        "archive_empty": "❌ Nəticələr arxivi hələ boşdur.",
+        "statistics": "📊 Statistika",
+        "points_progression": "📈 Xal dinamikası",
+        "average_finish": "📊 Orta finiş",
+        "dnf_rate": "⚠️ DNF faizi",
+        "races_count": "yarış",
+        "points_label": "Xal",
+        "average_finish_label": "Orta finiş",
+        "stats_unavailable": "❌ Arxivdə {} mövsümü üçün nəticə yoxdur.",
+        "h2h_usage": "ℹ️ İstifadə: /h2h <sürücü> <sürücü> [il]\n\nNümunə: /h2h VER NOR 2024",
+        "h2h_unknown": "❌ {} mövsümündə bu sürücülər tapılmadı: {} və {}",
+        "avgfinish_usage": "ℹ️ İstifadə: /avgfinish <pist>\n\nNümunə: /avgfinish baku",
+        "avgfinish_none": "❌ Arxivdə \"{}\" pistində yarış tapılmadı.",
+        "championship_line": "🏆 Çempionat: {}. yer, {} xal, {} qələbə",
+        "help_text": """ℹ️ *F1 Bot Köməyi*
+
+Bu bot Formula 1 yarışları haqqında məlumat verir.
+
+*Əmrlər:*
+/start - Botu başlat
+/menu - Əsas menyunu göstər
+/standings - Sürücü sıralamaları
+/constructors - Konstruktor sıralamaları
+/lastrace - Son sessiya nəticələri
+/nextrace - Gələn yarış cədvəli
+/live - Canlı vaxt (aktiv sessiya zamanı)
+/live events - Yalnız ötmələr, pit-stoplar və ən sürətli dövrələr
+/timezone - Saat qurşağını göstər və ya dəyiş
+/language - Dili göstər və ya dəyiş (az, en, tr)
+/results <il> <raund> - Keçmiş yarışın nəticələri (məs. /results 2021 22)
+/stats [il] - Mövsüm statistikası
+/h2h <sürücü> <sürücü> [il] - Sürücülərin qarşılaşması (məs. /h2h VER NOR)
+/avgfinish <pist> - Pistdə orta finiş mövqeyi (məs. /avgfinish baku)
+@bot <ad> - İstənilən çatda sürücü, komanda və ya yarış axtarışı (məs. @bot ver)
+
+*Qeyd:* Vaxtlar standart olaraq Bakı vaxtı ilə göstərilir (/timezone ilə dəyişə bilərsiniz).""",
+    },
+    "en": {
+        "welcome_title": "🏎️ Welcome to the F1 Live Bot!",
+        "welcome_text": """🏁 Your Formula 1 companion - real-time race data, standings and live timing.
+
+*What you can do:*
+🏆 Check the current championship standings
+🏎️ Get the latest results
+📅 See upcoming race schedules and the weather forecast
+🔴 Follow live timing""",
+        "menu_title": "🏎️ F1 Bot Menu",
+        "menu_text": "Choose one of the options below:",
+        "driver_standings": "🏆 Driver Standings",
+        "constructor_standings": "🏁 Constructor Standings",
+        "last_session": "🏎️ Last Session Results",
+        "schedule_weather": "📅 Schedule & Weather",
+        "live_timing": "🔴 Live Timing",
+        "help_commands_btn": "ℹ️ Help & Commands",
+        "back_to_menu_btn": "🏠 Back to Main Menu",
+        "full_calendar_btn": "📅 Full Season Calendar",
+        "stop_btn": "🛑 Stop",
+        "season_driver_standings": " Drivers' Championship Standings",
+        "constructor_standings_title": "Constructors' Championship Standings",
+        "season_calendar": "F1 Season Calendar",
+        "points": "pts",
+        "sprint": "Sprint",
+        "winner": " - Winner",
+        "fastest_lap": "Fastest Lap: {} ({})",
+        "next_race": "🏎️ *Next Race*",
+        "fp1": "FP1",
+        "fp2": "FP2",
+        "fp3": "FP3",
+        "sprint_qualifying": "Sprint Qualifying",
+        "qualifying": "Qualifying",
+        "race": "Race",
+        "all_times_baku": "_All times are Baku time_",
+        "all_times_in": "_All times are in the {tz} timezone_",
+        "timezone_current": "🕐 Your timezone: *{}*\n\nTo change it: /timezone Europe/London\nBack to Baku time: /timezone reset",
+        "timezone_set": "✅ Timezone changed: *{}*",
+        "timezone_invalid": "❌ Unknown timezone: {}\n\nExample: /timezone Europe/London",
+        "language_current": "🌐 Language: *{}*\n\nTo change it: /language az",
+        "language_set": "✅ Language changed: *{}*",
+        "language_invalid": "❌ Unknown language: {}\n\nAvailable: {}",
+        "season_completed": "🏁 The season is over! No more races this year.",
+        "no_race_schedule": "❌ No race schedule found for this season.",
+        "weather_forecast": "🌤️ Weather forecast",
+        "friday": "Friday",
+        "saturday": "Saturday",
+        "sunday": "Sunday",
+        "race_day": "Sunday (Race)",
+        "no_live_data": "❌ No live timing data available\n\nUse /lastrace for the latest results",
+        "live_not_available": "❌ Live timing is not available\n\nUse /lastrace for the latest results",
+        "no_active_session": "❌ *There is no active F1 session right now*\n\n🔴 Live timing is only available on F1 race weekends.",
+        "live_features": "📊 Live timing shows:\n• Driver positions\n• Intervals\n• Best lap times\n• Tyre information\n• Data refreshed on every update\n\nAlternatives:\n• /nextrace - Next race and weather forecast\n• /lastrace - Last session results",
+        "live_starting": "🔴 Starting live timing...\nData will refresh automatically 🔄",
+        "live_events_started": "🔔 Live event notifications are on: overtakes, pit stops, fastest laps.",
+        "live_stopped": "🛑 Live feed stopped.",
+        "live_session_label": "SESSION",
+        "live_timing_label": "LIVE TIMING",
+        "live_no_rows": "No timing data available - session may not be active",
+        "live_last_update": "Last update",
+        "event_overtake": "⚔️ *{driver}* passed {passed} — P{position}",
+        "event_pit_stop": "🛞 *{driver}* pitted ({previous} → {compound})",
+        "event_fastest_lap": "⏱️ *{driver}* fastest lap: {lap}",
+        "event_race_control": "🏁 Race control ({time}): {message}",
+        "loading": "⏳ Loading...",
+        "api_unavailable": "❌ The data source is under maintenance. Please try again in a few minutes.",
+        "no_standings": "❌ No standings found for this season.",
+        "no_driver_standings": "❌ No driver standings found.",
+        "invalid_data": "❌ Invalid data format from the source.",
+        "no_constructor_standings": "❌ No constructor standings found.",
+        "no_sessions": "❌ No sessions found. The API may be offline.",
+        "no_recent_sessions": "❌ No recently completed sessions found.",
+        "no_results": "❌ No results available for this session.",
+        "no_position_data": "❌ No position data available for this session.",
+        "no_final_positions": "❌ No final positions available for this session.",
+        "error_fetching_session": "❌ Error fetching session results: {}",
+        "error_fetching_race": "❌ Error fetching the next race: {}",
+        "weather_unavailable": "❌ Weather data is not available.",
+        "error_fetching_weather": "❌ Error fetching weather data: {}",
+        "service_unavailable": "❌ The service is temporarily unavailable. Please try again later.",
+        "error_occurred": "❌ An error occurred: {}",
+        "unknown_command": "❌ Unknown command",
+        "profile_started": "⏱️ Recording a profile for {} seconds...",
+        "profile_saved": "✅ Profile saved: `{}`",
+        "live_session_check": "🔴 Checking for a live session...",
+        "live_session_active": "🔴 A live session is active! Updating positions...",
+        "live_session_inactive": "🔴 There is no active F1 session right now",
+        "live_session_error": "❌ Error checking the live session: {}",
+        "live_timing_available": "🔴 Live timing is available!",
+        "live_timing_unavailable": "❌ Live timing is not available",
+        "live_positions_loading": "⏳ Loading positions...",
+        "live_data_source": "ℹ️ *Source:* OpenF1 API",
+        "live_refresh_button": "🔄 Refresh",
+        "live_positions_header": "📊 *Current Positions:*",
+        "live_session_location": "📍 *Location:*",
+        "live_session_time": "🕐 *Start time:*",
+        "live_update_frequency": "🔄 *Data refreshes every 15 seconds*",
+        "live_position_winner": "🏆",
+        "live_session_info_error": "Session information incomplete",
+        "live_positions_error": "Position data not available",
+        "live_no_session_found": "No active F1 session found",
+        "live_check_error": "Error while checking live timing",
+        "live_time_unknown": "Unknown",
+        "baku": "Baku",
+        "round": "Round",
+        "pole_position": "Pole position",
+        "sprint_winner": "Sprint winner",
+        "results_usage": "ℹ️ Usage: /results <year> <round>\n\nExample: /results 2021 22",
+        "results_not_archived": "❌ Round {1} of the {0} season is not in the archive.",
+        "archive_empty": "❌ The results archive is still empty.",
+        "statistics": "📊 Statistics",
+        "points_progression": "📈 Points progression",
+        "average_finish": "📊 Average finish",
+        "dnf_rate": "⚠️ DNF rate",
+        "races_count": "races",
+        "points_label": "Points",
+        "average_finish_label": "Average finish",
+        "stats_unavailable": "❌ No archived results for the {} season.",
+        "h2h_usage": "ℹ️ Usage: /h2h <driver> <driver> [year]\n\nExample: /h2h VER NOR 2024",
+        "h2h_unknown": "❌ Drivers not found in the {} season: {} and {}",
+        "avgfinish_usage": "ℹ️ Usage: /avgfinish <circuit>\n\nExample: /avgfinish baku",
+        "avgfinish_none": "❌ No archived races at \"{}\".",
+        "championship_line": "🏆 Championship: P{}, {} pts, {} wins",
+        "help_text": """ℹ️ *F1 Bot Help*
+
+This bot provides Formula 1 race information.
+
+*Commands:*
+/start - Start the bot
+/menu - Show the main menu
+/standings - Driver standings
+/constructors - Constructor standings
+/lastrace - Last session results
+/nextrace - Next race schedule
+/live - Live timing (during an active session)
+/live events - Only overtakes, pit stops and fastest laps
+/timezone - Show or change your timezone
+/language - Show or change the language (az, en, tr)
+/results <year> <round> - Results of a past race (e.g. /results 2021 22)
+/stats [year] - Season statistics
+/h2h <driver> <driver> [year] - Driver head-to-head (e.g. /h2h VER NOR)
+/avgfinish <circuit> - Average finish at a circuit (e.g. /avgfinish baku)
+@bot <name> - Search drivers, teams or races from any chat (e.g. @bot ver)
+
+*Note:* Times are shown in Baku time by default (change it with /timezone).""",
+    },
+    "tr": {
+        "welcome_title": "🏎️ F1 Canlı Bot'a Hoş Geldiniz!",
+        "welcome_text": """🏁 Formula 1 için en iyi yol arkadaşınız - gerçek zamanlı yarış verileri, sıralamalar ve canlı zamanlama.
+
+*Neler yapabilirsiniz:*
+🏆 Güncel şampiyona sıralamalarını görün
+🏎️ Son sonuçları alın
+📅 Yaklaşan yarış programlarını ve hava tahminini görün
+🔴 Canlı zamanlamayı takip edin""",
+        "menu_title": "🏎️ F1 Bot Menüsü",
+        "menu_text": "Aşağıdaki seçeneklerden birini seçin:",
+        "driver_standings": "🏆 Pilot Sıralaması",
+        "constructor_standings": "🏁 Takım Sıralaması",
+        "last_session": "🏎️ Son Seans Sonuçları",
+        "schedule_weather": "📅 Program & Hava",
+        "live_timing": "🔴 Canlı Zamanlama",
+        "help_commands_btn": "ℹ️ Yardım & Komutlar",
+        "back_to_menu_btn": "🏠 Ana Menüye Dön",
+        "full_calendar_btn": "📅 Tüm Sezon Takvimi",
+        "stop_btn": "🛑 Durdur",
+        "season_driver_standings": " Pilotlar Şampiyonası Sıralaması",
+        "constructor_standings_title": "Takımlar Şampiyonası Sıralaması",
+        "season_calendar": "F1 Sezon Takvimi",
+        "points": "puan",
+        "sprint": "Sprint",
+        "winner": " - Kazanan",
+        "fastest_lap": "En Hızlı Tur: {} ({})",
+        "next_race": "🏎️ *Sıradaki Yarış*",
+        "fp1": "1. Antrenman",
+        "fp2": "2. Antrenman",
+        "fp3": "3. Antrenman",
+        "sprint_qualifying": "Sprint Sıralama",
+        "qualifying": "Sıralama",
+        "race": "Yarış",
+        "all_times_baku": "_Tüm saatler Bakü saatine göredir_",
+        "all_times_in": "_Tüm saatler {tz} saat dilimine göredir_",
+        "timezone_current": "🕐 Saat diliminiz: *{}*\n\nDeğiştirmek için: /timezone Europe/Istanbul\nBakü saatine dönmek için: /timezone reset",
+        "timezone_set": "✅ Saat dilimi değiştirildi: *{}*",
+        "timezone_invalid": "❌ Bilinmeyen saat dilimi: {}\n\nÖrnek: /timezone Europe/Istanbul",
+        "language_current": "🌐 Dil: *{}*\n\nDeğiştirmek için: /language en",
+        "language_set": "✅ Dil değiştirildi: *{}*",
+        "language_invalid": "❌ Bilinmeyen dil: {}\n\nMevcut diller: {}",
+        "season_completed": "🏁 Sezon tamamlandı! Bu yıl başka yarış yok.",
+        "no_race_schedule": "❌ Bu sezon için yarış programı bulunamadı.",
+        "weather_forecast": "🌤️ Hava tahmini",
+        "friday": "Cuma",
+        "saturday": "Cumartesi",
+        "sunday": "Pazar",
+        "race_day": "Pazar (Yarış)",
+        "no_live_data": "❌ Canlı zamanlama verisi yok\n\nSon sonuçlar için /lastrace kullanın",
+        "live_not_available": "❌ Canlı zamanlama kullanılamıyor\n\nSon sonuçlar için /lastrace kullanın",
+        "no_active_session": "❌ *Şu anda aktif bir F1 seansı yok*\n\n🔴 Canlı zamanlama yalnızca F1 yarış hafta sonlarında kullanılabilir.",
+        "live_features": "📊 Canlı zamanlama şunları gösterir:\n• Pilot pozisyonları\n• Aralıklar\n• En iyi tur zamanları\n• Lastik bilgileri\n• Her güncellemede yenilenen veriler\n\nAlternatifler:\n• /nextrace - Sıradaki yarış ve hava tahmini\n• /lastrace - Son seans sonuçları",
+        "live_starting": "🔴 Canlı zamanlama başlatılıyor...\nVeriler otomatik olarak güncellenecek 🔄",
+        "live_events_started": "🔔 Canlı olay bildirimleri açık: geçişler, pit stoplar, en hızlı turlar.",
+        "live_stopped": "🛑 Canlı yayın durduruldu.",
+        "live_session_label": "SEANS",
+        "live_timing_label": "CANLI ZAMANLAMA",
+        "live_no_rows": "Zamanlama verisi yok - seans aktif olmayabilir",
+        "live_last_update": "Son güncelleme",
+        "event_overtake": "⚔️ *{driver}*, {passed} pilotunu geçti — P{position}",
+        "event_pit_stop": "🛞 *{driver}* pite girdi ({previous} → {compound})",
+        "event_fastest_lap": "⏱️ *{driver}* en hızlı tur: {lap}",
+        "event_race_control": "🏁 Yarış kontrol ({time}): {message}",
+        "loading": "⏳ Yükleniyor...",
+        "api_unavailable": "❌ Veri kaynağı bakımda. Birkaç dakika sonra tekrar deneyin.",
+        "no_standings": "❌ Bu sezon için sıralama bulunamadı.",
+        "no_driver_standings": "❌ Pilot sıralaması bulunamadı.",
+        "invalid_data": "❌ Kaynaktan geçersiz veri formatı.",
+        "no_constructor_standings": "❌ Takım sıralaması bulunamadı.",
+        "no_sessions": "❌ Seans bulunamadı. API çevrimdışı olabilir.",
+        "no_recent_sessions": "❌ Yakın zamanda tamamlanmış seans bulunamadı.",
+        "no_results": "❌ Bu seans için sonuç yok.",
+        "no_position_data": "❌ Bu seans için pozisyon verisi yok.",
+        "no_final_positions": "❌ Bu seans için son pozisyonlar yok.",
+        "error_fetching_session": "❌ Seans sonuçları alınırken hata: {}",
+        "error_fetching_race": "❌ Sıradaki yarış alınırken hata: {}",
+        "weather_unavailable": "❌ Hava durumu verisi yok.",
+        "error_fetching_weather": "❌ Hava durumu verisi alınırken hata: {}",
+        "service_unavailable": "❌ Hizmet geçici olarak kullanılamıyor. Daha sonra tekrar deneyin.",
+        "error_occurred": "❌ Bir hata oluştu: {}",
+        "unknown_command": "❌ Bilinmeyen komut",
+        "profile_started": "⏱️ {} saniyelik profil kaydediliyor...",
+        "profile_saved": "✅ Profil kaydedildi: `{}`",
+        "live_session_check": "🔴 Canlı seans kontrol ediliyor...",
+        "live_session_active": "🔴 Canlı seans aktif! Pozisyonlar güncelleniyor...",
+        "live_session_inactive": "🔴 Şu anda aktif bir F1 seansı yok",
+        "live_session_error": "❌ Canlı seans kontrol edilirken hata: {}",
+        "live_timing_available": "🔴 Canlı zamanlama mevcut!",
+        "live_timing_unavailable": "❌ Canlı zamanlama kullanılamıyor",
+        "live_positions_loading": "⏳ Pozisyonlar yükleniyor...",
+        "live_data_source": "ℹ️ *Kaynak:* OpenF1 API",
+        "live_refresh_button": "🔄 Yenile",
+        "live_positions_header": "📊 *Güncel Pozisyonlar:*",
+        "live_session_location": "📍 *Yer:*",
+        "live_session_time": "🕐 *Başlangıç saati:*",
+        "live_update_frequency": "🔄 *Veriler her 15 saniyede güncellenir*",
+        "live_position_winner": "🏆",
+        "live_session_info_error": "Seans bilgileri eksik",
+        "live_positions_error": "Pozisyon verisi yok",
+        "live_no_session_found": "Aktif F1 seansı bulunamadı",
+        "live_check_error": "Canlı zamanlama kontrol edilirken hata",
+        "live_time_unknown": "Bilinmiyor",
+        "baku": "Bakü",
+        "round": "Yarış",
+        "pole_position": "Pole pozisyonu",
+        "sprint_winner": "Sprint kazananı",
+        "results_usage": "ℹ️ Kullanım: /results <yıl> <yarış>\n\nÖrnek: /results 2021 22",
+        "results_not_archived": "❌ Arşivde {} sezonunun {}. yarışı bulunamadı.",
+        "archive_empty": "❌ Sonuç arşivi henüz boş.",
+        "statistics": "📊 İstatistikler",
+        "points_progression": "📈 Puan gelişimi",
+        "average_finish": "📊 Ortalama bitiriş",
+        "dnf_rate": "⚠️ DNF oranı",
+        "races_count": "yarış",
+        "points_label": "Puan",
+        "average_finish_label": "Ortalama bitiriş",
+        "stats_unavailable": "❌ Arşivde {} sezonu için sonuç yok.",
+        "h2h_usage": "ℹ️ Kullanım: /h2h <pilot> <pilot> [yıl]\n\nÖrnek: /h2h VER NOR 2024",
+        "h2h_unknown": "❌ {} sezonunda bu pilotlar bulunamadı: {} ve {}",
+        "avgfinish_usage": "ℹ️ Kullanım: /avgfinish <pist>\n\nÖrnek: /avgfinish baku",
+        "avgfinish_none": "❌ Arşivde \"{}\" pistinde yarış bulunamadı.",
+        "championship_line": "🏆 Şampiyona: {}. sıra, {} puan, {} galibiyet",
+        "help_text": """ℹ️ *F1 Bot Yardımı*
+
+Bu bot Formula 1 yarışları hakkında bilgi verir.
+
+*Komutlar:*
+/start - Botu başlat
+/menu - Ana menüyü göster
+/standings - Pilot sıralaması
+/constructors - Takım sıralaması
+/lastrace - Son seans sonuçları
+/nextrace - Sıradaki yarış programı
+/live - Canlı zamanlama (aktif seans sırasında)
+/live events - Yalnızca geçişler, pit stoplar ve en hızlı turlar
+/timezone - Saat dilimini göster veya değiştir
+/language - Dili göster veya değiştir (az, en, tr)
+/results <yıl> <yarış> - Geçmiş bir yarışın sonuçları (örn. /results 2021 22)
+/stats [yıl] - Sezon istatistikleri
+/h2h <pilot> <pilot> [yıl] - Pilot karşılaştırması (örn. /h2h VER NOR)
+/avgfinish <pist> - Bir pistteki ortalama bitiriş (örn. /avgfinish baku)
+@bot <ad> - Herhangi bir sohbetten pilot, takım veya yarış arama (örn. @bot ver)
+
+*Not:* Saatler varsayılan olarak Bakü saatine göre gösterilir (/timezone ile değiştirebilirsiniz).""",
+    },
+}
+
+# Parts of each view. Layout lives here; wording lives in the catalogs.
+VIEWS = {
+    "standings": {
+        "header": "🏆 {season} [season_driver_standings]\n\n",
+        "row": "{position}. {flag} {name} ({points} [points])\n",
+    },
+    "constructor_standings": {
+        "header": "🏆 *[constructor_standings_title] - {season}*\n\n",
+        "row": "{position}. {flag}*{name}* - {points} [points]\n",
+    },
+    "last_session": {
+        "header": "{emoji} {flag} *{meeting} [@session]*\n\n",
+        "row": "{position}. {flag} {name}\n",
+        "row_team": "{position}. {flag} {name} ({team})\n",
+        "winner": "{position}. {flag} {name} - [winner]\n",
+        "winner_team": "{position}. {flag} {name} ({team}) - [winner]\n",
+    },
+    "calendar": {
+        "header": "{season} [season_calendar]\n\n",
+        "row": "{flag} {locality}, {weekend_range}\n",
+        "row_sprint": "{flag} {locality}, {weekend_range} ⚡️Sprint\n",
+    },
+    "next_race": {
+        "header": "[next_race]\n{flag} *{name}*\n\n",
+        "session": "*[@kind]:* {time}\n",
+        "note_baku": "\n[all_times_baku]\n",
+        "note_tz": "\n[all_times_in]\n",
+        "weather_header": "\n*[weather_forecast]:*\n",
+        "weather_day": "[@day]: {temp:.1f}°C {icon} {rain:.0f}% 💨{wind:.1f}km/h\n",
+    },
+    "results": {
+        "header": "🏆 *{season} {name}* - [round] {round}\n📍 {place} · {date}\n\n",
+        "row": "{position}. {flag} {name} - {result}",
+        "row_team": "{position}. {flag} {name} ({team}) - {result}",
+        "row_points": " · {points:g} [points]",
+        "row_end": "\n",
+        "extras": "\n",
+        "pole": "⏱️ [pole_position]: {name}\n",
+        "sprint_winner": "🏁 [sprint_winner]: {name}\n",
+    },
+    "stats": {
+        "header": "*[@title] - {season}*\n\n",
+        "circuit_header": "*[average_finish] - {circuit}*\n\n",
+        "average_row": "{rank}. {code} - {value:.2f} ({starts} [races_count])\n",
+        "dnf_row": "{rank}. {code} - {value:.0%} ({dnfs}/{starts})\n",
+        # Monospace so the sparklines line up
+        "progression_start": "```\n",
+        "progression_row": "{code:<4}{spark} {points:g}\n",
+        "progression_end": "```",
+        "h2h": "⚔️ *{first} vs {second}* - {season}\n\n"
+               "🏁 [race]: {race_a} - {race_b}\n"
+               "⏱️ [qualifying]: {qualifying_a} - {qualifying_b}\n"
+               "🏆 [points_label]: {points_a:g} - {points_b:g}\n"
+               "📊 [average_finish_label]: {finish_a} - {finish_b}\n"
+               "⚠️ DNF: {dnfs_a} - {dnfs_b}",
+    },
+    "live": {
+        "header": "[live_session_label]: {session}\n\n",
+        "timing_header": "[live_timing_label]:",
+        "row": "\nP{position}: {driver} | {interval} | {best_lap} | {tyre}",
+        "empty": "[live_no_rows]",
+        "footer": "\n\n[live_last_update]: {time} ({source})",
+    },
+}
+
+RENDERS = f1_metrics.REGISTRY.counter(
+    "f1bot_locale_renders_total", "View renders by view and locale", ("view", "locale"))
+
+_CATALOG_REF = re.compile(r"\[(@?)(\w+)\]")
+
+
+def normalize_locale(code):
+    """A supported locale for a code like "en" or "tr-TR", or None"""
+    if not code:
+        return None
+    code = code.lower().replace("_", "-").split("-", 1)[0]
+    return code if code in LOCALES else None
+
+
+_strings = {}
+
+
+def strings(locale=DEFAULT_LOCALE):
+    """The complete catalog for `locale`, with DEFAULT_LOCALE filling the gaps"""
+    catalog = _strings.get(locale)
+    if catalog is None:
+        catalog = dict(CATALOGS[DEFAULT_LOCALE])
+        catalog.update(CATALOGS.get(locale, {}))
+        _strings[locale] = catalog
+    return catalog
+
+
+def compile_template(template, catalog):
+    """A callable rendering a fields dict with `template` in one format call"""
+    translated = []
+
+    def substitute(match):
+        if match.group(1):
+            translated.append(match.group(2))
+            return "{" + match.group(2) + "}"
+        return catalog[match.group(2)]
+
+    render = _CATALOG_REF.sub(substitute, template).format_map
+    if not translated:
+        return render
+
+    def render_translated(fields):
+        fields = dict(fields)
+        for name in translated:
+            fields[name] = catalog.get(fields[name], fields[name])
+        return render(fields)
+
+    return render_translated
+
+
+class Renderer:
+    """All view templates for one locale, compiled once"""
+
+    def __init__(self, locale):
+        self.locale = locale
+        self.strings = strings(locale)
+        self.views = {
+            view: {part: compile_template(template, self.strings) for part, template in parts.items()}
+            for view, parts in VIEWS.items()
+        }
+
+    def render(self, view, parts):
+        templates = self.views[view]
+        return "".join(templates[part](fields) for part, fields in parts)
+
+
+_renderers = {}
+
+
+def get_renderer(locale=DEFAULT_LOCALE):
+    renderer = _renderers.get(locale)
+    if renderer is None:
+        renderer = _renderers[locale] = Renderer(locale if locale in LOCALES else DEFAULT_LOCALE)
+    return renderer
+
+
+def make_document(parts, version=None):
+    """A view's data; without an upstream version, the parts' digest is used"""
+    if version is None:
+        payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        version = hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+    return {"version": version, "parts": parts}
+
+
+def is_document(value):
+    return isinstance(value, dict) and "parts" in value
+
+
+_rendered = OrderedDict()
+_rendered_lock = threading.Lock()
+
+
+def render_document(view, locale, document):
+    """The message for a document, rendered once per (view, locale, version).
+
+    `view` may carry a variant after a colon ("next_race:Europe/Rome"); the
+    templates are those of the base view.
+    """
+    key = (view, locale, document["version"])
+    with _rendered_lock:
+        message = _rendered.get(key)
+        if message is not None:
+            _rendered.move_to_end(key)
+            f1_metrics.RENDERS_AVOIDED.inc(view.split(":", 1)[0])
+            return message
+
+    base = view.split(":", 1)[0]
+    message = get_renderer(locale).render(base, document["parts"])
+    RENDERS.inc(base, locale)
+    with _rendered_lock:
+        _rendered[key] = message
+        while len(_rendered) > MAX_CACHED_RENDERS:
+            _rendered.popitem(last=False)
+    return message
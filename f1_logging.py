@@ -0,0 +1,175 @@
+"""
+F1 Bot - Structured, non-blocking logging
+
+Routes both structlog events and plain stdlib `logging` calls through a
+bounded queue to a background writer thread, so handlers running on the
+event loop never block on stdout. Output is one JSON object per line with
+aggregatable fields (chat_id, handler, duration_ms, ...).
+
+Hot-path events pass `sample="<key>"` and are thinned according to
+SAMPLING: keep 1 in N, and never more than a fixed number per second.
+Warnings and errors are never sampled.
+"""
+
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import structlog
+
+import f1_metrics
+
+# sample key -> (keep 1 in N, max events per second)
+SAMPLING = {
+    "button_handler": (1, 20),
+    "live_update_task": (20, 5),
+    "leaderboard": (1, 5),
+}
+
+# Events held in memory while the writer thread catches up
+LOG_QUEUE_SIZE = 10000
+
+LOGS_DROPPED = f1_metrics.REGISTRY.counter(
+    "f1bot_log_events_dropped_total", "Log events dropped by sampling or a full queue", ("reason",))
+
+_SAMPLED_LEVELS = {"debug", "info"}
+
+
+class _Sampler:
+    """Per-key 1-in-N sampling combined with a per-second rate limit"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._seen = {}
+        self._window = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        rule = self.rules.get(key)
+        if rule is None:
+            return True
+        every, per_second = rule
+        now = int(time.monotonic())
+        with self._lock:
+            seen = self._seen.get(key, 0) + 1
+            self._seen[key] = seen
+            if seen % every:
+                return False
+            window_start, count = self._window.get(key, (now, 0))
+            if window_start != now:
+                window_start, count = now, 0
+            if count >= per_second:
+                return False
+            self._window[key] = (window_start, count + 1)
+            return True
+
+
+_sampler = _Sampler(SAMPLING)
+
+
+def sample_events(logger, method_name, event_dict):
+    """structlog processor dropping sampled-out hot-path events"""
+    key = event_dict.pop("sample", None)
+    if key is not None and method_name in _SAMPLED_LEVELS and not _sampler.allow(key):
+        LOGS_DROPPED.inc("sampled")
+        raise structlog.DropEvent
+    return event_dict
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that hands the raw record to the writer thread"""
+
+    def prepare(self, record):
+        # Formatting happens on the writer thread, not the event loop
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOGS_DROPPED.inc("queue_full")
+
+
+def _add_timestamp(logger, method_name, event_dict):
+    """ISO timestamp of when the event was logged, not when it was written"""
+    record = event_dict.get("_record")
+    created = record.created if record is not None else time.time()
+    event_dict["timestamp"] = datetime.fromtimestamp(created, timezone.utc).isoformat()
+    return event_dict
+
+
+def _capture_exc_info(logger, method_name, event_dict):
+    """Resolve exc_info on the logging thread; the writer thread has none"""
+    if event_dict.get("exc_info") is True:
+        event_dict["exc_info"] = sys.exc_info()
+    return event_dict
+
+
+_SHARED_PROCESSORS = [
+    structlog.contextvars.merge_contextvars,
+    structlog.stdlib.add_logger_name,
+    structlog.stdlib.add_log_level,
+    _add_timestamp,
+]
+
+structlog.configure(
+    processors=[
+        structlog.stdlib.filter_by_level,
+        sample_events,
+        *_SHARED_PROCESSORS,
+        _capture_exc_info,
+        structlog.processors.StackInfoRenderer(),
+        structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+    ],
+    logger_factory=structlog.stdlib.LoggerFactory(),
+    wrapper_class=structlog.stdlib.BoundLogger,
+    cache_logger_on_first_use=True,
+)
+
+
+def get_logger(name=None):
+    return structlog.get_logger(name)
+
+
+_listener = None
+
+
+def configure_logging(level=logging.INFO, fmt=None):
+    """Install the queue-based JSON (or console) log pipeline on the root logger"""
+    global _listener
+    if _listener is not None:
+        return
+
+    fmt = fmt or os.getenv("LOG_FORMAT", "json")
+    renderer = (
+        structlog.dev.ConsoleRenderer(colors=False)
+        if fmt == "console"
+        else structlog.processors.JSONRenderer(ensure_ascii=False)
+    )
+    formatter = structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=_SHARED_PROCESSORS,
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            renderer,
+        ],
+    )
+    writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_NonBlockingQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, writer)
+    _listener.start()
+    atexit.register(_listener.stop)
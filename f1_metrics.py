@@ -0,0 +1,241 @@
+"""
+F1 Bot - In-process metrics
+
+A small Prometheus-compatible metrics registry (counters, gauges and
+histograms) plus a /metrics HTTP endpoint. Recording a sample is a dict
+lookup and a bisect; all formatting work happens only when /metrics is
+scraped.
+
+    METRICS_PORT=9108 python3 main.py
+    curl localhost:9108/metrics
+
+The endpoint binds to loopback; set METRICS_HOST=0.0.0.0 where a scraper on
+another host needs to reach it.
+"""
+
+import os
+import re
+import bisect
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Seconds. Covers fast cache-served paths up to full upstream timeouts.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels, value):
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[labels] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._values.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args, **kwargs)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Render every metric in Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "f1bot_upstream_request_seconds", "Upstream HTTP request latency", ("host", "endpoint", "status"))
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "f1bot_upstream_errors_total", "Upstream HTTP requests that raised", ("host", "endpoint", "error"))
+CACHE_REQUESTS = REGISTRY.counter(
+    "f1bot_cache_requests_total", "Cache lookups by key and result", ("key", "result"))
+SCRAPE_DURATION = REGISTRY.histogram(
+    "f1bot_scrape_seconds", "Live timing scrape duration (fetch + parse)", ("source",))
+PARSE_DURATION = REGISTRY.histogram(
+    "f1bot_parse_seconds", "Live timing DOM parse duration", ("source",))
+TELEGRAM_LATENCY = REGISTRY.histogram(
+    "f1bot_telegram_request_seconds", "Telegram Bot API request latency", ("method",))
+TELEGRAM_RESPONSES = REGISTRY.counter(
+    "f1bot_telegram_responses_total", "Telegram Bot API responses by status code", ("method", "code"))
+JOBQUEUE_LAG = REGISTRY.histogram(
+    "f1bot_jobqueue_lag_seconds", "Delay between a repeating job's due time and its run", ("job",))
+RENDERS_AVOIDED = REGISTRY.counter(
+    "f1bot_renders_avoided_total", "View renders reused because the upstream data was unchanged", ("view",))
+LIVE_SUBSCRIPTIONS = REGISTRY.gauge(
+    "f1bot_live_subscriptions", "Chats currently subscribed to live timing")
+
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|\.|$)")
+
+
+def endpoint_label(path):
+    """Collapse numeric path segments so label cardinality stays bounded"""
+    return _NUMERIC_SEGMENT.sub("/:n", path)
+
+
+_CACHE_KEY_SUFFIX = re.compile(r"_\d+$")
+
+
+def cache_label(cache_key):
+    """Strip per-session/per-season and ":variant" suffixes from a cache key"""
+    return _CACHE_KEY_SUFFIX.sub("", str(cache_key).split(":", 1)[0])
+
+
+def record_cache(cache_key, hit):
+    CACHE_REQUESTS.inc(cache_label(cache_key), "hit" if hit else "miss")
+
+
+# ==================== HTTP ENDPOINT ====================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+
+
+def start_metrics_server(port, host=METRICS_HOST):
+    """Serve /metrics from a daemon thread; safe to call more than once"""
+    global _server
+    if _server is not None:
+        return _server
+    _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="f1-metrics", daemon=True).start()
+    logger.info(f"Metrics endpoint listening on {host}:{port}/metrics")
+    return _server
@@ -0,0 +1,243 @@
+"""
+F1 Bot - Live board from the OpenF1 API
+
+A Chromium-free live timing source (LIVE_SOURCE=openf1). Polls OpenF1's
+position, intervals, laps, stints and race_control endpoints incrementally:
+each endpoint only asks for entries newer than what it has already seen
+(`date>` cursors, or `lap_number>=` / `stint_number>=` for laps and stints).
+The results are merged per driver into the same LiveSnapshot the scraper
+produces.
+"""
+
+import os
+import time
+import logging
+from collections import deque
+from datetime import datetime
+from urllib.parse import quote
+
+import f1_json
+from f1_http import http_get, OPENF1_BASE_URL
+from f1_live_model import TimingRow, RaceControlMessage, make_snapshot, intern_code, UNKNOWN
+
+logger = logging.getLogger(__name__)
+
+# OpenF1 updates every few seconds; polling faster only burns rate limit
+OPENF1_POLL_INTERVAL = float(os.getenv("OPENF1_POLL_INTERVAL", "3"))
+# Look for the next session this long after the current one ends
+SESSION_GRACE = 1800
+
+COMPOUND_CODES = {"SOFT": "S", "MEDIUM": "M", "HARD": "H", "INTERMEDIATE": "I", "WET": "W"}
+
+
+def _gap_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)):
+        return f"+{value:.3f}"
+    return str(value)
+
+
+def _gap_ms(value):
+    if isinstance(value, (int, float)):
+        return int(round(value * 1000))
+    return None
+
+
+def _parse_date(text):
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+
+
+class OpenF1LiveBoard:
+    """Incrementally merged OpenF1 live state for the latest session"""
+
+    def __init__(self, base_url=OPENF1_BASE_URL):
+        self.base_url = base_url
+        self.requests = 0
+        self.session = None
+        self.session_end = None
+        self._reset(None)
+
+    def _reset(self, session_key):
+        self.session_key = session_key
+        self.codes = {}
+        self.drivers = {}
+        self.cursors = {"position": None, "intervals": None, "race_control": None}
+        self.lap_cursor = 1
+        self.stint_cursor = 1
+        self.race_control = deque(maxlen=5)
+
+    def _get(self, endpoint, filters=""):
+        url = f"{self.base_url}/v1/{endpoint}?session_key={self.session_key}{filters}"
+        self.requests += 1
+        try:
+            response = http_get(url, timeout=10)
+            if response.status_code != 200:
+                return []
+            data = f1_json.loads(response.content)
+            return data if isinstance(data, list) else []
+        except Exception as e:
+            logger.warning(f"OpenF1 {endpoint} poll failed: {e}")
+            return []
+
+    def _since(self, name):
+        cursor = self.cursors[name]
+        return f"&date>{quote(cursor)}" if cursor else ""
+
+    def _driver(self, number):
+        state = self.drivers.get(number)
+        if state is None:
+            state = {
+                "position": 0, "position_date": "", "gap": None, "interval": None, "interval_date": "",
+                "lap_number": 0, "last_lap_number": 0, "last_lap_ms": None, "best_lap_ms": None,
+                "compound": UNKNOWN, "stint": 0, "lap_start": None, "tyre_age_at_start": 0,
+            }
+            self.drivers[number] = state
+        return state
+
+    def _resolve_session(self):
+        previous = self.session_key
+        self.session_key = "latest"
+        sessions = self._get("sessions")
+        self.session_key = previous
+        if not sessions:
+            return False
+
+        session = sessions[-1]
+        if session.get("session_key") != self.session_key:
+            self._reset(session.get("session_key"))
+            for driver in self._get("drivers"):
+                number = driver.get("driver_number")
+                if number is not None:
+                    self.codes[number] = intern_code(driver.get("name_acronym") or str(number))
+        self.session = session
+        end = _parse_date(session.get("date_end"))
+        self.session_end = end.timestamp() if end else None
+        return True
+
+    def _poll_position(self):
+        for entry in self._get("position", self._since("position")):
+            number, date = entry.get("driver_number"), entry.get("date")
+            if number is None or not entry.get("position"):
+                continue
+            state = self._driver(number)
+            # Entries may arrive out of order; only the newest per driver counts
+            if (date or "") >= state["position_date"]:
+                state["position"] = int(entry["position"])
+                state["position_date"] = date or ""
+            if date and (self.cursors["position"] is None or date > self.cursors["position"]):
+                self.cursors["position"] = date
+
+    def _poll_intervals(self):
+        for entry in self._get("intervals", self._since("intervals")):
+            number, date = entry.get("driver_number"), entry.get("date")
+            if number is None:
+                continue
+            state = self._driver(number)
+            if (date or "") >= state["interval_date"]:
+                state["gap"] = entry.get("gap_to_leader")
+                state["interval"] = entry.get("interval")
+                state["interval_date"] = date or ""
+            if date and (self.cursors["intervals"] is None or date > self.cursors["intervals"]):
+                self.cursors["intervals"] = date
+
+    def _poll_laps(self):
+        for entry in self._get("laps", f"&lap_number>={self.lap_cursor}"):
+            number, lap_number = entry.get("driver_number"), entry.get("lap_number")
+            if number is None or lap_number is None:
+                continue
+            state = self._driver(number)
+            state["lap_number"] = max(state["lap_number"], lap_number)
+            duration = entry.get("lap_duration")
+            if duration:
+                lap_ms = int(round(duration * 1000))
+                if lap_number >= state["last_lap_number"]:
+                    state["last_lap_number"] = lap_number
+                    state["last_lap_ms"] = lap_ms
+                if state["best_lap_ms"] is None or lap_ms < state["best_lap_ms"]:
+                    state["best_lap_ms"] = lap_ms
+        # Re-read the slowest driver's current lap: its duration arrives once it's complete
+        laps = [state["lap_number"] for state in self.drivers.values() if state["lap_number"]]
+        if laps:
+            self.lap_cursor = min(laps)
+
+    def _poll_stints(self):
+        for entry in self._get("stints", f"&stint_number>={self.stint_cursor}"):
+            number, stint = entry.get("driver_number"), entry.get("stint_number")
+            if number is None or stint is None:
+                continue
+            state = self._driver(number)
+            if stint < state["stint"]:
+                continue
+            state["stint"] = stint
+            state["compound"] = COMPOUND_CODES.get((entry.get("compound") or "").upper(), UNKNOWN)
+            state["lap_start"] = entry.get("lap_start")
+            state["tyre_age_at_start"] = entry.get("tyre_age_at_start") or 0
+        stints = [state["stint"] for state in self.drivers.values() if state["stint"]]
+        if stints:
+            self.stint_cursor = min(stints)
+
+    def _poll_race_control(self):
+        cursor = self.cursors["race_control"]
+        for entry in self._get("race_control", self._since("race_control")):
+            date, message = entry.get("date"), entry.get("message")
+            if cursor and date and date <= cursor:
+                continue
+            if message:
+                parsed = _parse_date(date)
+                self.race_control.appendleft(
+                    RaceControlMessage(parsed.strftime("%H:%M:%S") if parsed else "", message)
+                )
+            if date and (self.cursors["race_control"] is None or date > self.cursors["race_control"]):
+                self.cursors["race_control"] = date
+
+    def _row(self, number, state):
+        position = state["position"]
+        tyre_age = None
+        if state["lap_start"] is not None and state["lap_number"]:
+            tyre_age = state["lap_number"] - state["lap_start"] + state["tyre_age_at_start"]
+        return TimingRow(
+            position=position,
+            driver=self.codes.get(number) or intern_code(str(number)),
+            gap="LEADER" if position == 1 else _gap_text(state["gap"]),
+            interval="" if position == 1 else _gap_text(state["interval"]),
+            gap_ms=None if position == 1 else _gap_ms(state["gap"]),
+            interval_ms=None if position == 1 else _gap_ms(state["interval"]),
+            best_lap_ms=state["best_lap_ms"],
+            last_lap_ms=state["last_lap_ms"],
+            tyre_age=tyre_age,
+            tyre_compound=state["compound"],
+            last_lap_number=state["last_lap_number"] or None,
+        )
+
+    def poll(self):
+        """Fetch what changed since the last poll and return a fresh snapshot"""
+        if self.session is None or (self.session_end and time.time() > self.session_end + SESSION_GRACE):
+            if not self._resolve_session() and self.session is None:
+                return None
+
+        self._poll_position()
+        self._poll_intervals()
+        self._poll_laps()
+        self._poll_stints()
+        self._poll_race_control()
+
+        rows = sorted(
+            (self._row(number, state) for number, state in self.drivers.items() if state["position"]),
+            key=lambda row: row.position,
+        )
+        name = f"{self.session.get('location', '')} - {self.session.get('session_name', 'F1 Session')}"
+        return make_snapshot(name, rows, tuple(self.race_control), source="openf1")
+
+
+_board = None
+
+
+def get_openf1_board():
+    global _board
+    if _board is None:
+        _board = OpenF1LiveBoard()
+    return _board
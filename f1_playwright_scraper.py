@@ -1,10 +1,29 @@
+import os
+import time
 import asyncio
 import logging
-from bs4 import BeautifulSoup
 from datetime import datetime
 
+from f1_replay import get_recorder
+import f1_metrics
+from f1_profiling import span
+from f1_live_model import make_row, make_snapshot, RaceControlMessage, format_lap_ms, encode_snapshot, decode_snapshot
+from f1_state import get_state, get_election, StateError
+from f1_live_history import get_history, trend_arrow
+from f1_live_events import get_event_detector
+from f1_schedule import get_zone
+from f1_budget import request_priority, LIVE
+from f1_locale import strings, get_renderer, DEFAULT_LOCALE
+
 logging.basicConfig(level=logging.INFO)
 
+# Overridable so the scraper can run against the local replay server
+FORMULA_TIMER_URL = os.getenv("FORMULA_TIMER_URL", "https://formula-timer.com/livetiming")
+# "local": scrape in this process; "worker": read snapshots from f1_scraper_worker;
+# "openf1": build the board from the OpenF1 API without a browser;
+# "auto": let f1_live_arbiter pick and hedge between all of them
+LIVE_SOURCE = os.getenv("LIVE_SOURCE", "local")
+
 class OptimizedLiveTimingScraper:
     def __init__(self):
         self.browser = None
@@ -24,8 +43,12 @@ class OptimizedLiveTimingScraper:
             )
             self.page = await self.context.new_page()
 
+            recorder = get_recorder()
+            if recorder is not None:
+                self.page.on("websocket", recorder.attach_websocket)
+
             logging.info("Loading formula-timer.com live timing (one time)...")
-            await self.page.goto('https://formula-timer.com/livetiming', wait_until='domcontentloaded')
+            await self.page.goto(FORMULA_TIMER_URL, wait_until='domcontentloaded')
             await self.page.wait_for_timeout(3000)
 
             return True
@@ -41,32 +64,39 @@ class OptimizedLiveTimingScraper:
 
             # Just read current DOM - no reload!
             content = await self.page.content()
+            recorder = get_recorder()
+            if recorder is not None:
+                recorder.record_dom(content)
+            return self.parse_live_html(content)
+
+        except Exception as e:
+            logging.error(f"Error getting live data: {e}")
+            return None
+
+    def parse_live_html(self, content):
+        """Parse a formula-timer.com DOM snapshot into live data"""
+        from bs4 import BeautifulSoup  # deferred so importing this module stays cheap
+
+        started = time.perf_counter()
+        with span("parse"):
             soup = BeautifulSoup(content, "html.parser")
 
             session_info = self._extract_session_info(soup)
             timing_data = self._extract_timing_data(soup)
             race_control = self._extract_race_control_messages(soup)
+        f1_metrics.PARSE_DURATION.observe("formula-timer", value=time.perf_counter() - started)
 
-            return {
-                "session": session_info,
-                "timing": timing_data,
-                "race_control": race_control[:5] if race_control else []
-            }
-
-        except Exception as e:
-            logging.error(f"Error getting live data: {e}")
-            return None
+        return make_snapshot(session_info, timing_data, race_control[:5])
 
     def _extract_session_info(self, soup):
         """Extract current session information"""
         try:
             session_title = soup.find('h1')
             if session_title:
-                session_text = session_title.get_text(strip=True)
-                return {"name": session_text}
+                return session_title.get_text(strip=True)
         except:
             pass
-        return {"name": "Unknown Session"}
+        return "Unknown Session"
 
     def _extract_timing_data(self, soup):
         """Extract live timing data from the main timing table"""
@@ -129,16 +159,16 @@ class OptimizedLiveTimingScraper:
                     gap = cells[1].get_text(strip=True) if len(cells) > 1 else "N/A"
                     last_lap = cells[5].get_text(strip=True) if len(cells) > 5 else "N/A"
 
-                    timing_data.append({
-                        "position": position,
-                        "driver": driver_code,
-                        "interval": interval,
-                        "best_lap": best_lap,
-                        "last_lap": last_lap,
-                        "gap": gap,
-                        "tyre_age": tyre_age_text,
-                        "tyre_compound": tyre_compound
-                    })
+                    timing_data.append(make_row(
+                        position=position,
+                        driver=driver_code,
+                        gap=gap,
+                        interval=interval,
+                        best_lap=best_lap,
+                        last_lap=last_lap,
+                        tyre_age=tyre_age_text,
+                        tyre_compound=tyre_compound,
+                    ))
 
                 except Exception as e:
                     logging.debug(f"Error parsing row: {e}")
@@ -169,10 +199,7 @@ class OptimizedLiveTimingScraper:
                             message_text = message_elem.get_text(strip=True)
 
                             if message_text and len(message_text) > 10:
-                                messages.append({
-                                    "time": time_text,
-                                    "message": message_text
-                                })
+                                messages.append(RaceControlMessage(time_text, message_text))
         except:
             pass
 
@@ -192,51 +219,190 @@ class OptimizedLiveTimingScraper:
         except Exception as e:
             logging.error(f"Error during cleanup: {e}")
 
-def format_timing_data_for_telegram(data):
-    """Format the scraped data for Telegram bot display"""
-    if not data:
-        return "No live timing data available"
-
-    session = data.get('session', {})
-    timing = data.get('timing', [])
-
-    message = f"SESSION: {session.get('name', 'F1 Session')}\n\n"
+# Last rendered (snapshot, parts, {locale: body}, {(locale, timezone): message}).
+# Snapshots are immutable, so every chat showing the same snapshot shares one
+# set of parts; the body is rendered once per locale in use and the timestamp
+# footer once per locale and timezone.
+_last_render = (None, None, {}, {})
+
+
+def format_timing_data_for_telegram(snapshot, tz=None, locale=DEFAULT_LOCALE):
+    """Format a LiveSnapshot for Telegram bot display in `locale`, timestamped in `tz`"""
+    global _last_render
+    if not snapshot:
+        return strings(locale)["no_live_data"]
+
+    cached_snapshot, parts, bodies, messages = _last_render
+    if cached_snapshot is not snapshot:
+        parts, bodies, messages = _board_parts(snapshot), {}, {}
+        _last_render = (snapshot, parts, bodies, messages)
+
+    message = messages.get((locale, tz))
+    if message is None:
+        renderer = get_renderer(locale)
+        body = bodies.get(locale)
+        if body is None:
+            body = bodies[locale] = renderer.render("live", parts)
+        taken_at = datetime.fromtimestamp(snapshot.taken_at, get_zone(tz) if tz else None)
+        message = body + renderer.render("live", [
+            ("footer", {"time": taken_at.strftime('%H:%M:%S'), "source": snapshot.source}),
+        ])
+        messages[(locale, tz)] = message
+    return message
 
-    if timing:
-        message += "LIVE TIMING:\n"
-        for driver in timing:
-            pos = driver.get('position', 'N/A')
-            name = driver.get('driver', 'N/A')
-            interval = driver.get('interval', 'N/A')
-            best_lap = driver.get('best_lap', 'N/A')
-            tyre = driver.get('tyre_compound', 'N/A')
 
-            message += f"P{pos}: {name} | {interval} | {best_lap} | {tyre}\n"
+def _board_parts(snapshot):
+    """The live view's parts for a snapshot, shared by every locale"""
+    parts = [("header", {"session": snapshot.session_name or "F1 Session"})]
+
+    history = get_history().get(snapshot.session_name)
+    trends = history.gap_trends() if history else {}
+
+    if snapshot.rows:
+        parts.append(("timing_header", {}))
+        for row in snapshot.rows:
+            arrow = trend_arrow(trends.get(row.driver)) if row.position != 1 else ""
+            parts.append(("row", {
+                "position": row.position or "N/A",
+                "driver": row.driver,
+                "interval": f"{row.interval or 'N/A'}{' ' + arrow if arrow else ''}",
+                "best_lap": format_lap_ms(row.best_lap_ms),
+                "tyre": row.tyre_compound,
+            }))
     else:
-        message += "No timing data available - session may not be active\n"
+        parts.append(("empty", {}))
 
-    now = datetime.now()
-    message += f"\nLast update: {now.strftime('%H:%M:%S')}"
-
-    return message
+    return parts
 
 # Global scraper instance
 _scraper_instance = None
 
-async def get_optimized_live_timing():
-    """Get live timing data using optimized scraper"""
-    global _scraper_instance
+# Snapshots younger than this are shared instead of re-reading the DOM, so
+# N subscribed chats cost one parse per tick rather than N.
+SNAPSHOT_MAX_AGE = 1.0
+
+_latest_snapshot = None
+_snapshot_lock = None
+
+# With a shared state backend one replica (the lease holder) scrapes and
+# publishes snapshots here; the other replicas read them and only scrape
+# themselves while none is fresh.
+SHARED_SNAPSHOT_KEY = "live:snapshot"
+SHARED_SNAPSHOT_TTL = 30
+_shared_snapshot_bytes = None
+
+
+def _publish(snapshot, share=True):
+    """Make a new snapshot current and feed the history and event stages once"""
+    global _latest_snapshot
+    if snapshot is None or snapshot is _latest_snapshot:
+        return
+    _latest_snapshot = snapshot
+    get_history().record(snapshot)
+    get_event_detector().process(snapshot)
+
+    state = get_state()
+    if share and state.shared:
+        try:
+            state.set_bytes(SHARED_SNAPSHOT_KEY, encode_snapshot(snapshot), SHARED_SNAPSHOT_TTL)
+        except StateError as e:
+            logging.warning(f"Could not share live snapshot: {e}")
+
+
+def _read_shared_snapshot():
+    """Follower side: the leader's latest snapshot, decoded only when it changes.
+
+    None when the leader hasn't published one within SHARED_SNAPSHOT_TTL,
+    e.g. because none of its own chats are watching.
+    """
+    global _shared_snapshot_bytes
+    data = get_state().get_bytes(SHARED_SNAPSHOT_KEY)
+    if data is None:
+        return None
+    if data != _shared_snapshot_bytes:
+        _shared_snapshot_bytes = data
+        _publish(decode_snapshot(data), share=False)
+    if time.time() - _latest_snapshot.taken_at >= SHARED_SNAPSHOT_TTL:
+        return None
+    return _latest_snapshot
+
+
+async def get_optimized_live_timing(max_age=SNAPSHOT_MAX_AGE):
+    """Get the latest live timing snapshot, shared between all callers"""
+    global _snapshot_lock
+
+    if get_state().shared and not get_election("live-scraper").is_leader():
+        try:
+            snapshot = _read_shared_snapshot()
+            if snapshot is not None:
+                return snapshot
+            # The leader only scrapes while its own chats are watching
+            logging.debug("No fresh shared live snapshot; scraping locally")
+        except StateError as e:
+            # Backend unreachable: scrape locally rather than show nothing
+            logging.warning(f"Reading shared live snapshot failed: {e}")
+
+    if LIVE_SOURCE == "worker":
+        from f1_scraper_worker import get_worker_client
+        snapshot = get_worker_client().latest()
+        _publish(snapshot)
+        return snapshot
+
+    if _snapshot_lock is None:
+        _snapshot_lock = asyncio.Lock()
+
+    if LIVE_SOURCE == "openf1":
+        from f1_openf1_live import get_openf1_board, OPENF1_POLL_INTERVAL
+        max_age = max(max_age, OPENF1_POLL_INTERVAL)
 
+    try:
+        async with _snapshot_lock:
+            if _latest_snapshot is not None and time.time() - _latest_snapshot.taken_at < max_age:
+                return _latest_snapshot
+
+            if LIVE_SOURCE == "openf1":
+                started = time.perf_counter()
+                # Blocking HTTP; keep it off the event loop
+                with request_priority(LIVE):
+                    snapshot = await asyncio.to_thread(get_openf1_board().poll)
+                f1_metrics.SCRAPE_DURATION.observe("openf1", value=time.perf_counter() - started)
+                _publish(snapshot)
+                return snapshot
+
+            if LIVE_SOURCE == "auto":
+                from f1_live_arbiter import get_arbiter
+                started = time.perf_counter()
+                with request_priority(LIVE):
+                    snapshot = await get_arbiter().fetch()
+                f1_metrics.SCRAPE_DURATION.observe("auto", value=time.perf_counter() - started)
+                _publish(snapshot)
+                return snapshot
+
+            snapshot = await read_formula_timer()
+            _publish(snapshot)
+            return snapshot
+
+    except Exception as e:
+        logging.error(f"Error in optimized live timing: {e}")
+        return None
+
+
+async def read_formula_timer():
+    """One read of the formula-timer page, starting the browser on first use"""
+    global _scraper_instance
     try:
         if _scraper_instance is None:
             _scraper_instance = OptimizedLiveTimingScraper()
             if not await _scraper_instance.initialize():
+                _scraper_instance = None
                 return None
 
-        return await _scraper_instance.get_live_data()
-
+        started = time.perf_counter()
+        snapshot = await _scraper_instance.get_live_data()
+        f1_metrics.SCRAPE_DURATION.observe("formula-timer", value=time.perf_counter() - started)
+        return snapshot
     except Exception as e:
-        logging.error(f"Error in optimized live timing: {e}")
+        logging.error(f"Error reading formula-timer: {e}")
         # Reset instance on error
         if _scraper_instance:
             await _scraper_instance.cleanup()
@@ -266,9 +432,9 @@ async def main():
             data = await scraper.get_live_data()
 
             if data:
-                print(f"  Session: {data['session']['name']}")
-                print(f"  Timing entries: {len(data['timing'])}")
-                print(f"  Race control messages: {len(data['race_control'])}")
+                print(f"  Session: {data.session_name}")
+                print(f"  Timing entries: {len(data.rows)}")
+                print(f"  Race control messages: {len(data.race_control)}")
             else:
                 print("  No data received")
 
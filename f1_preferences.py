@@ -0,0 +1,142 @@
+"""
+F1 Bot - Per-chat preferences
+
+Small per-chat settings (the display timezone and the locale) kept in the
+shared state backend (f1_state), one hash per setting mapping chat_id to its
+value. Replicas behind one webhook URL therefore agree on every chat's
+settings. Reads are cached locally for PREFERENCE_CACHE_TTL seconds; a
+change made on another replica shows up here within that time.
+
+With the in-process backend nothing outlives the process, so the hashes are
+also persisted to a local JSON file the same way f1_subscriptions does it:
+changes mark the store dirty and `flush()` writes the file atomically from
+the repeating flush job and on shutdown. With a shared backend an existing
+file is imported once at startup and then left alone.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+
+from f1_state import get_state, StateError
+
+logger = logging.getLogger(__name__)
+
+CHAT_PREFERENCES_FILE = os.getenv(
+    "CHAT_PREFERENCES_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chat_preferences.json"),
+)
+
+# Seconds a preference read from the backend is reused locally
+PREFERENCE_CACHE_TTL = 30.0
+
+PREFERENCES_KEY = "chat_preferences"
+# Settings written to the local file
+FIELDS = ("timezone", "locale")
+
+
+class PreferenceStore:
+    def __init__(self, path=CHAT_PREFERENCES_FILE, backend=None):
+        self.path = path
+        self.backend = backend or get_state()
+        self.dirty = False
+        # (field, chat_id) -> (value, fetched_at)
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _hash(self, field):
+        return f"{PREFERENCES_KEY}:{field}"
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                preferences = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load chat preferences: {e}")
+            return
+        try:
+            for chat_id, entry in preferences.items():
+                for field, value in entry.items():
+                    if not self.backend.shared or self.backend.hget(self._hash(field), chat_id) is None:
+                        self.backend.hset(self._hash(field), chat_id, value)
+        except StateError as e:
+            logger.warning(f"Could not import chat preferences: {e}")
+
+    def get(self, chat_id, field, default=None):
+        key = (field, str(chat_id))
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[1] < PREFERENCE_CACHE_TTL:
+            value = cached[0]
+        else:
+            try:
+                value = self.backend.hget(self._hash(field), chat_id)
+            except StateError as e:
+                logger.warning(f"Could not read {field} of chat {chat_id}: {e}")
+                # Keep serving the last known value while the backend is unreachable
+                return cached[0] if cached is not None and cached[0] is not None else default
+            self._cache[key] = (value, time.monotonic())
+        return default if value is None else value
+
+    def set(self, chat_id, field, value):
+        self._write(chat_id, field, value)
+
+    def unset(self, chat_id, field):
+        self._write(chat_id, field, None)
+
+    def _write(self, chat_id, field, value):
+        try:
+            if value is None:
+                self.backend.hdel(self._hash(field), chat_id)
+            else:
+                self.backend.hset(self._hash(field), chat_id, value)
+        except StateError as e:
+            logger.warning(f"Could not save {field} of chat {chat_id}: {e}")
+        with self._lock:
+            self._cache[(field, str(chat_id))] = (value, time.monotonic())
+            self.dirty = True
+
+    def values(self, field):
+        """Distinct values of `field` across chats"""
+        try:
+            return set(self.backend.hgetall(self._hash(field)).values())
+        except StateError as e:
+            logger.warning(f"Could not list chat {field} values: {e}")
+            return set()
+
+    def flush(self):
+        """Write pending changes of an in-process backend; returns True if the file was written"""
+        with self._lock:
+            if not self.dirty or self.backend.shared:
+                self.dirty = False
+                return False
+            self.dirty = False
+        preferences = {}
+        for field in FIELDS:
+            for chat_id, value in self.backend.hgetall(self._hash(field)).items():
+                preferences.setdefault(chat_id, {})[field] = value
+        try:
+            payload = json.dumps(preferences, ensure_ascii=False)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not save chat preferences: {e}")
+            self.dirty = True
+            return False
+
+
+_store = None
+
+
+def get_preferences():
+    global _store
+    if _store is None:
+        _store = PreferenceStore()
+    return _store
@@ -0,0 +1,226 @@
+"""
+F1 Bot - Profiling hooks
+
+- `profiled`: wraps a handler or job with a timing span, records its
+  duration in metrics and logs a per-span breakdown when it runs slow.
+- `span`: times a section (upstream request, DOM parse, Telegram call...)
+  and attributes it to the handler currently running.
+- `LoopWatchdog`: flags anything that blocks the event loop beyond a
+  threshold and logs the blocking stack. F1BOT_ASYNCIO_DEBUG=1 also turns on
+  asyncio's own slow-callback detection.
+- `capture_profile`: a stdlib sampling profiler that writes collapsed stacks
+  (flamegraph.pl / speedscope compatible) to PROFILE_DIR.
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import logging
+import functools
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import f1_metrics
+from f1_logging import get_logger
+
+logger = logging.getLogger(__name__)
+log = get_logger(__name__)
+
+# Handlers slower than this get a span breakdown logged
+SLOW_HANDLER_MS = float(os.getenv("SLOW_HANDLER_MS", "500"))
+# Event loop stalls longer than this are reported with the blocking stack
+SLOW_CALLBACK_MS = float(os.getenv("SLOW_CALLBACK_MS", "100"))
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"),
+)
+
+HANDLER_DURATION = f1_metrics.REGISTRY.histogram(
+    "f1bot_handler_seconds", "Telegram handler and job duration", ("handler",))
+SPAN_DURATION = f1_metrics.REGISTRY.histogram(
+    "f1bot_span_seconds", "Time spent in a span, by handler", ("handler", "span"))
+LOOP_STALLS = f1_metrics.REGISTRY.counter(
+    "f1bot_event_loop_stalls_total", "Event loop stalls beyond SLOW_CALLBACK_MS")
+
+# Per-task span accumulator: {"handler": name, "spans": {span: seconds}}
+_current = contextvars.ContextVar("f1bot_profile_current", default=None)
+
+
+@contextmanager
+def span(name):
+    """Time a section and attribute it to the running handler, if any"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        current = _current.get()
+        if current is not None:
+            spans = current["spans"]
+            spans[name] = spans.get(name, 0.0) + elapsed
+            SPAN_DURATION.observe(current["handler"], name, value=elapsed)
+        else:
+            SPAN_DURATION.observe("-", name, value=elapsed)
+
+
+def profiled(func=None, *, name=None):
+    """Decorator timing an async handler/job and its spans"""
+    if func is None:
+        return functools.partial(profiled, name=name)
+
+    handler_name = name or func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        state = {"handler": handler_name, "spans": {}}
+        token = _current.set(state)
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            HANDLER_DURATION.observe(handler_name, value=elapsed)
+            if elapsed * 1000 >= SLOW_HANDLER_MS:
+                log.warning(
+                    "slow_handler",
+                    handler=handler_name,
+                    duration_ms=round(elapsed * 1000, 1),
+                    spans_ms={k: round(v * 1000, 1) for k, v in state["spans"].items()},
+                )
+
+    return wrapper
+
+
+# ==================== EVENT LOOP WATCHDOG ====================
+
+class LoopWatchdog:
+    """Detects callbacks that block the event loop and logs their stack"""
+
+    def __init__(self, threshold_ms=SLOW_CALLBACK_MS, interval=0.05):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id = None
+        self._stop = threading.Event()
+        # Held so the heartbeat task isn't garbage collected while pending
+        self._task = None
+
+    async def _beat(self):
+        while not self._stop.is_set():
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        reported = False
+        while not self._stop.wait(self.interval):
+            stalled = time.monotonic() - self._heartbeat
+            if stalled < self.threshold + self.interval:
+                reported = False
+                continue
+            if reported:
+                continue
+            reported = True
+            LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            log.warning(
+                "event_loop_blocked",
+                blocked_ms=round(stalled * 1000, 1),
+                stack=_format_stack(frame),
+            )
+
+    def start(self, loop=None):
+        loop = loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        if os.getenv("F1BOT_ASYNCIO_DEBUG") == "1":
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+        self._task = loop.create_task(self._beat())
+        threading.Thread(target=self._watch, name="f1-loop-watchdog", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+
+def _format_stack(frame, limit=15):
+    stack = []
+    while frame is not None and len(stack) < limit:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    return list(reversed(stack))
+
+
+# ==================== SAMPLING PROFILER ====================
+
+_profile_lock = threading.Lock()
+
+
+def _collapsed_stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def capture_profile(seconds, interval=0.005, thread_id=None):
+    """Sample every thread's stack for `seconds` and write collapsed stacks; returns the path"""
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile capture is already running")
+    try:
+        own_id = threading.get_ident()
+        samples = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for tid, frame in sys._current_frames().items():
+                if tid == own_id or (thread_id is not None and tid != thread_id):
+                    continue
+                samples[_collapsed_stack(frame)] += 1
+            time.sleep(interval)
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info(f"Wrote {sum(samples.values())} profile samples to {path}")
+        return path
+    finally:
+        _profile_lock.release()
+
+
+async def capture_profile_async(seconds, interval=0.005):
+    """Run capture_profile off the event loop so the loop itself gets sampled"""
+    return await asyncio.to_thread(capture_profile, seconds, interval)
+
+
+def install_profile_signal(seconds=30, signum=getattr(signal, "SIGUSR1", None)):
+    """`kill -USR1 <pid>` captures a profile of `seconds` in the background"""
+    if signum is None:
+        return
+
+    def _handler(sig, frame):
+        threading.Thread(
+            target=_safe_capture, args=(seconds,), name="f1-profiler", daemon=True
+        ).start()
+
+    signal.signal(signum, _handler)
+
+
+def _safe_capture(seconds):
+    try:
+        capture_profile(seconds)
+    except Exception as e:
+        logger.error(f"Profile capture failed: {e}")
@@ -0,0 +1,411 @@
+"""
+F1 Bot - Record & Replay harness
+
+Records real upstream traffic (Jolpica, OpenF1, Open-Meteo, geocoding) and
+formula-timer.com DOM / WebSocket snapshots to disk, and replays them from a
+local HTTP server at real time or at Nx speed.
+
+Recording:
+    F1BOT_RECORD_DIR=recordings/baku python3 main.py
+    python3 f1_replay.py record --out recordings/baku --duration 7200
+
+Replaying:
+    python3 f1_replay.py serve recordings/baku --speed 10
+    # then start the bot with the printed *_BASE_URL / FORMULA_TIMER_URL exports
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import bisect
+import logging
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+logger = logging.getLogger(__name__)
+
+# Upstream hosts the replay server can stand in for, with the env var the
+# bot reads its base URL from.
+UPSTREAM_ENV = {
+    "api.jolpi.ca": "JOLPICA_BASE_URL",
+    "api.openf1.org": "OPENF1_BASE_URL",
+    "api.open-meteo.com": "OPEN_METEO_BASE_URL",
+    "geocoding-api.open-meteo.com": "GEOCODING_BASE_URL",
+}
+FORMULA_TIMER_HOST = "formula-timer.com"
+
+HTTP_FILE = "http.jsonl"
+DOM_FILE = "dom.jsonl"
+WS_FILE = "ws.jsonl"
+META_FILE = "meta.json"
+
+
+# ==================== RECORDING ====================
+
+class Recorder:
+    """Append-only recorder writing one JSON line per captured event"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._files = {}
+
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            # Appending to an existing recording keeps its time origin
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self.started_at = json.load(f).get("started_at", self.started_at)
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"started_at": self.started_at}, f)
+
+    def _write(self, filename, entry):
+        entry["t"] = round(time.time() - self.started_at, 3)
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            f = self._files.get(filename)
+            if f is None:
+                f = open(os.path.join(self.directory, filename), "a", encoding="utf-8")
+                self._files[filename] = f
+            f.write(line)
+            f.flush()
+
+    def record_http(self, url, status, headers, body):
+        """Record one upstream HTTP response"""
+        self._write(HTTP_FILE, {
+            "url": url,
+            "status": status,
+            "content_type": headers.get("Content-Type", "application/json"),
+            "body": body.decode("utf-8", errors="replace") if isinstance(body, bytes) else body,
+        })
+
+    def record_dom(self, html):
+        """Record one formula-timer.com DOM snapshot"""
+        self._write(DOM_FILE, {"html": html})
+
+    def record_ws(self, url, direction, payload):
+        """Record one WebSocket frame"""
+        if isinstance(payload, bytes):
+            entry = {"url": url, "dir": direction, "b64": base64.b64encode(payload).decode("ascii")}
+        else:
+            entry = {"url": url, "dir": direction, "text": payload}
+        self._write(WS_FILE, entry)
+
+    def attach_websocket(self, ws):
+        """Playwright `page.on("websocket")` callback capturing frames"""
+        ws.on("framereceived", lambda payload: self.record_ws(ws.url, "in", payload))
+        ws.on("framesent", lambda payload: self.record_ws(ws.url, "out", payload))
+
+    def close(self):
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+
+_recorder = None
+_recorder_checked = False
+
+
+def get_recorder():
+    """Return the process-wide recorder if F1BOT_RECORD_DIR is set, else None"""
+    global _recorder, _recorder_checked
+    if not _recorder_checked:
+        _recorder_checked = True
+        directory = os.getenv("F1BOT_RECORD_DIR")
+        if directory:
+            _recorder = Recorder(directory)
+            logger.info(f"Recording upstream traffic to {directory}")
+    return _recorder
+
+
+# ==================== REPLAY ====================
+
+def _load_jsonl(path):
+    entries = []
+    if not os.path.exists(path):
+        return entries
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    entries.sort(key=lambda e: e["t"])
+    return entries
+
+
+class _Timeline:
+    """Entries sorted by recording offset with bisect lookup"""
+
+    def __init__(self):
+        self.times = []
+        self.entries = []
+
+    def add(self, entry):
+        self.times.append(entry["t"])
+        self.entries.append(entry)
+
+    def at(self, t):
+        """Latest entry recorded at or before t (earliest if none yet)"""
+        if not self.entries:
+            return None
+        i = bisect.bisect_right(self.times, t)
+        return self.entries[max(i - 1, 0)]
+
+
+class Recording:
+    """A recording directory loaded into per-URL timelines"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.by_url = {}
+        self.by_path = {}
+        self.dom = _Timeline()
+        self.ws = _load_jsonl(os.path.join(directory, WS_FILE))
+        self.ws_times = [e["t"] for e in self.ws]
+
+        for entry in _load_jsonl(os.path.join(directory, HTTP_FILE)):
+            self.by_url.setdefault(entry["url"], _Timeline()).add(entry)
+            parts = urlsplit(entry["url"])
+            self.by_path.setdefault((parts.netloc, parts.path), _Timeline()).add(entry)
+        for entry in _load_jsonl(os.path.join(directory, DOM_FILE)):
+            self.dom.add(entry)
+
+        all_times = [tl.times[-1] for tl in self.by_url.values()]
+        if self.dom.times:
+            all_times.append(self.dom.times[-1])
+        if self.ws_times:
+            all_times.append(self.ws_times[-1])
+        self.duration = max(all_times) if all_times else 0.0
+
+    def http_at(self, url, t):
+        """Recorded response for url at offset t, falling back to path-only match"""
+        timeline = self.by_url.get(url)
+        if timeline is None:
+            parts = urlsplit(url)
+            timeline = self.by_path.get((parts.netloc, parts.path))
+        return timeline.at(t) if timeline else None
+
+    def ws_between(self, t0, t1):
+        lo = bisect.bisect_right(self.ws_times, t0)
+        hi = bisect.bisect_right(self.ws_times, t1)
+        return self.ws[lo:hi]
+
+
+class ReplayClock:
+    """Maps wall-clock time onto recording offsets at a given speed"""
+
+    def __init__(self, speed=1.0, start=0.0):
+        self.speed = speed
+        self.start = start
+        self._t0 = time.monotonic()
+
+    def now(self):
+        return self.start + (time.monotonic() - self._t0) * self.speed
+
+    def seek(self, offset):
+        self.start = offset
+        self._t0 = time.monotonic()
+
+
+# Shell page served in place of formula-timer.com/livetiming. It swaps in the
+# recorded DOM snapshot for the current replay offset so the real scraper
+# (which only ever reads page.content()) sees the page evolve.
+_LIVETIMING_SHELL = """<!DOCTYPE html>
+<html><head><title>formula-timer replay</title></head><body>
+<script>
+async function __replayTick() {
+  try {
+    const r = await fetch('/formula-timer.com/__dom', {cache: 'no-store'});
+    if (r.ok) { document.documentElement.innerHTML = await r.text(); }
+  } catch (e) {}
+}
+__replayTick();
+setInterval(__replayTick, 500);
+</script>
+</body></html>"""
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server_version = "F1Replay/1.0"
+
+    def log_message(self, fmt, *args):
+        logger.debug("replay: " + fmt % args)
+
+    def _send(self, status, body, content_type="application/json", etag=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        segments = parts.path.lstrip("/").split("/", 1)
+        host = segments[0]
+        rest = "/" + segments[1] if len(segments) > 1 else "/"
+        t = server.clock.now()
+
+        if host == "__replay":
+            status = {
+                "offset": round(t, 3),
+                "duration": server.recording.duration,
+                "speed": server.clock.speed,
+                "upstream_calls": dict(server.upstream_calls),
+            }
+            if rest == "/seek":
+                server.clock.seek(float(parse_qs(parts.query).get("t", ["0"])[0]))
+            return self._send(200, json.dumps(status))
+
+        with server.calls_lock:
+            server.upstream_calls[f"{host}{rest}"] += 1
+
+        if host == FORMULA_TIMER_HOST:
+            if rest == "/__dom":
+                entry = server.recording.dom.at(t)
+                return self._send(200, entry["html"] if entry else "", "text/html; charset=utf-8")
+            if rest == "/__ws":
+                since = float(parse_qs(parts.query).get("since", ["-1"])[0])
+                frames = server.recording.ws_between(since, t)
+                return self._send(200, json.dumps({"offset": t, "frames": frames}))
+            return self._send(200, _LIVETIMING_SHELL, "text/html; charset=utf-8")
+
+        url = f"https://{host}{rest}"
+        if parts.query:
+            url += f"?{parts.query}"
+        entry = server.recording.http_at(url, t)
+        if entry is None:
+            return self._send(404, json.dumps({"error": "not recorded", "url": url}))
+        # Recorded bodies never change, so a hash of the body is a valid ETag
+        body = entry["body"]
+        etag = f'"{hashlib.blake2b(body.encode("utf-8") if isinstance(body, str) else body, digest_size=8).hexdigest()}"'
+        return self._send(entry["status"], body, entry.get("content_type", "application/json"), etag)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Local stand-in for every upstream, serving a Recording on a ReplayClock"""
+
+    daemon_threads = True
+
+    def __init__(self, recording, host="127.0.0.1", port=0, speed=1.0, start=0.0):
+        super().__init__((host, port), _ReplayHandler)
+        self.recording = recording
+        self.clock = ReplayClock(speed, start)
+        self.upstream_calls = Counter()
+        self.calls_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def upstream_env(self):
+        """Environment overrides pointing the bot at this server"""
+        env = {var: f"{self.base_url}/{host}" for host, var in UPSTREAM_ENV.items()}
+        env["FORMULA_TIMER_URL"] = f"{self.base_url}/{FORMULA_TIMER_HOST}/livetiming"
+        return env
+
+    def start_background(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="f1-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# ==================== CLI ====================
+
+async def _record_session(out_dir, duration, interval, urls):
+    """Poll formula-timer.com and a fixed URL list, recording everything"""
+    import asyncio
+    import requests
+
+    os.environ["F1BOT_RECORD_DIR"] = out_dir
+    recorder = get_recorder()
+    from f1_playwright_scraper import OptimizedLiveTimingScraper
+
+    scraper = OptimizedLiveTimingScraper()
+    if not await scraper.initialize():
+        logger.error("Could not start browser; recording HTTP only")
+        scraper = None
+
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            if scraper:
+                await scraper.get_live_data()
+            for url in urls:
+                try:
+                    response = await asyncio.to_thread(requests.get, url, timeout=10)
+                    recorder.record_http(response.url, response.status_code, response.headers, response.content)
+                except Exception as e:
+                    logger.warning(f"Failed to record {url}: {e}")
+            await asyncio.sleep(interval)
+    finally:
+        if scraper:
+            await scraper.cleanup()
+        recorder.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay F1 bot upstream traffic")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="record formula-timer.com and upstream URLs")
+    rec.add_argument("--out", required=True)
+    rec.add_argument("--duration", type=float, default=3600)
+    rec.add_argument("--interval", type=float, default=3)
+    rec.add_argument("--url", action="append", default=[], help="upstream URL to poll (repeatable)")
+
+    srv = sub.add_parser("serve", help="replay a recording over HTTP")
+    srv.add_argument("directory")
+    srv.add_argument("--host", default="127.0.0.1")
+    srv.add_argument("--port", type=int, default=8765)
+    srv.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    srv.add_argument("--start", type=float, default=0.0, help="start offset in seconds")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.command == "record":
+        import asyncio
+        asyncio.run(_record_session(args.out, args.duration, args.interval, args.url))
+        return 0
+
+    recording = Recording(args.directory)
+    server = ReplayServer(recording, args.host, args.port, args.speed, args.start)
+    for var, value in server.upstream_env().items():
+        print(f"export {var}={value}")
+    print(f"# replaying {recording.duration:.0f}s of traffic at {args.speed}x", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
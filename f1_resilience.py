@@ -0,0 +1,161 @@
+"""
+F1 Bot - Upstream circuit breakers
+
+One breaker per upstream host (Jolpica, OpenF1, Open-Meteo, geocoding).
+`http_get` asks the host's breaker before every request:
+
+- closed: requests go through. The timeout is adapted to the host's observed
+  latency: a high percentile of recent successful requests times a headroom
+  factor. It never exceeds the caller's timeout, so a healthy host that
+  answers in 300ms is not waited on for 30s when it hangs.
+- open: after BREAKER_FAILURES consecutive failures (timeouts, connection
+  errors, 5xx, 429) requests fail immediately with CircuitOpenError, and
+  fetch_json serves the last data it decoded for that URL.
+- half-open: once the cooldown has passed, a background thread re-sends the
+  last failed request. Success closes the breaker. Failure opens it again
+  with a doubled cooldown. User requests keep failing fast while the probe
+  runs, so no user waits on a host that is still down.
+"""
+
+import logging
+import threading
+from collections import deque
+
+import f1_metrics
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failures that open a breaker
+BREAKER_FAILURES = 5
+# Seconds before the first half-open probe; doubled after each failed probe
+BREAKER_COOLDOWN = 30.0
+MAX_BREAKER_COOLDOWN = 300.0
+
+# Adaptive timeouts: PERCENTILE of the last LATENCY_WINDOW successes times HEADROOM
+LATENCY_WINDOW = 100
+MIN_LATENCY_SAMPLES = 20
+TIMEOUT_PERCENTILE = 0.99
+TIMEOUT_HEADROOM = 3.0
+# Never cut a request shorter than this, whatever the host usually does
+MIN_TIMEOUT = 2.0
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = f1_metrics.REGISTRY.gauge(
+    "f1bot_upstream_breaker_state", "Circuit breaker state per host (0 closed, 1 half-open, 2 open)", ("host",))
+BREAKER_REJECTIONS = f1_metrics.REGISTRY.counter(
+    "f1bot_upstream_breaker_rejections_total", "Requests failed fast because the host's breaker was open", ("host",))
+BREAKER_TRANSITIONS = f1_metrics.REGISTRY.counter(
+    "f1bot_upstream_breaker_transitions_total", "Breaker state changes", ("host", "state"))
+UPSTREAM_TIMEOUT = f1_metrics.REGISTRY.gauge(
+    "f1bot_upstream_timeout_seconds", "Adaptive request timeout currently applied per host", ("host",))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose breaker is open"""
+
+    def __init__(self, host):
+        super().__init__(f"circuit open for {host}")
+        self.host = host
+
+
+def is_failure(status_code):
+    """Responses that count against a host: it is down or shedding load"""
+    return status_code >= 500 or status_code == 429
+
+
+class CircuitBreaker:
+    def __init__(self, host):
+        self.host = host
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = BREAKER_COOLDOWN
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.probe = None
+        self._timer = None
+        self._lock = threading.Lock()
+        BREAKER_STATE.set(host, value=STATE_VALUES[CLOSED])
+
+    def allow(self):
+        """True if a request may be sent now"""
+        if self.state == CLOSED:
+            return True
+        BREAKER_REJECTIONS.inc(self.host)
+        return False
+
+    def timeout(self, requested):
+        """The caller's timeout, shortened to what this host has needed lately"""
+        with self._lock:
+            if len(self.latencies) < MIN_LATENCY_SAMPLES:
+                return requested
+            samples = sorted(self.latencies)
+        slow = samples[min(len(samples) - 1, int(len(samples) * TIMEOUT_PERCENTILE))]
+        adapted = min(requested, max(MIN_TIMEOUT, slow * TIMEOUT_HEADROOM))
+        UPSTREAM_TIMEOUT.set(self.host, value=round(adapted, 3))
+        return adapted
+
+    def success(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+            self.failures = 0
+
+    def failure(self, probe):
+        """Count a failed request; `probe` is a callable that retries it"""
+        with self._lock:
+            self.failures += 1
+            self.probe = probe
+            if self.state != CLOSED or self.failures < BREAKER_FAILURES:
+                return
+            self._open()
+
+    def _transition(self, state):
+        self.state = state
+        BREAKER_STATE.set(self.host, value=STATE_VALUES[state])
+        BREAKER_TRANSITIONS.inc(self.host, state)
+
+    def _open(self):
+        self._transition(OPEN)
+        logger.warning(f"Circuit open for {self.host}; next probe in {self.cooldown:.0f}s")
+        self._timer = threading.Timer(self.cooldown, self._run_probe)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _run_probe(self):
+        with self._lock:
+            self._transition(HALF_OPEN)
+            probe = self.probe
+        try:
+            healthy = probe()
+        except Exception as e:
+            logger.debug(f"Probe for {self.host} failed: {e}")
+            healthy = False
+
+        with self._lock:
+            if healthy:
+                self.failures = 0
+                self.cooldown = BREAKER_COOLDOWN
+                # Latencies from before the outage say little about the host now
+                self.latencies.clear()
+                self._transition(CLOSED)
+                logger.info(f"Circuit closed for {self.host}")
+            else:
+                self.cooldown = min(self.cooldown * 2, MAX_BREAKER_COOLDOWN)
+                self._open()
+
+    def status(self):
+        return {"state": self.state, "failures": self.failures, "cooldown": self.cooldown}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host):
+    breaker = _breakers.get(host)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(host)
+            if breaker is None:
+                breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
@@ -0,0 +1,254 @@
+"""
+F1 Bot - Parsed season schedule
+
+One Season object per year, built from Jolpica's `{season}.json`. Every
+session time is parsed to an aware UTC datetime when the schedule is loaded.
+Race starts are kept in a sorted list, so "next race" and "current weekend"
+are bisect lookups. Weekend date ranges are precomputed as well. The
+next-race view, the calendar and the live-session gate all read from here,
+so the schedule is downloaded once per SCHEDULE_TTL rather than once per
+view. Each weekend's local session times are memoized per timezone, so
+rendering cost follows the number of timezones in use, not chats.
+"""
+
+import os
+import time
+import bisect
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+from f1_http import fetch_json, JOLPICA_BASE_URL
+from f1_state import get_state, StateError
+
+logger = logging.getLogger(__name__)
+
+# Schedules change a handful of times a season
+SCHEDULE_TTL = 86400
+
+# Jolpica session keys in weekend order, with their TRANSLATIONS keys
+SESSION_KEYS = (
+    ("FirstPractice", "fp1"),
+    ("SecondPractice", "fp2"),
+    ("ThirdPractice", "fp3"),
+    ("SprintQualifying", "sprint_qualifying"),
+    ("Sprint", "sprint"),
+    ("Qualifying", "qualifying"),
+)
+
+# How long each kind of session runs, for the live-session gate
+SESSION_LENGTH = {"race": timedelta(hours=2)}
+DEFAULT_SESSION_LENGTH = timedelta(hours=1)
+# Live timing opens this long before a session and stays open this long after
+LIVE_LEAD = timedelta(hours=1)
+LIVE_GRACE = timedelta(hours=1)
+
+
+# Timezone for chats that have not picked one with /timezone
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "Asia/Baku")
+
+
+class Session(NamedTuple):
+    kind: str
+    starts_at: datetime
+
+
+class LocalWeekend(NamedTuple):
+    """A weekend's session times and date range rendered in one timezone"""
+    sessions: tuple
+    weekend_range: str
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    """ZoneInfo for `name`, built once; raises ZoneInfoNotFoundError/ValueError if unknown"""
+    return ZoneInfo(name)
+
+
+def format_local(dt, tz=DEFAULT_TIMEZONE, fmt="%d %b %H:%M"):
+    return dt.astimezone(get_zone(tz)).strftime(fmt)
+
+
+def _parse(date, clock):
+    """Jolpica date + time as an aware UTC datetime, or None"""
+    if not date:
+        return None
+    try:
+        dt = datetime.fromisoformat(f"{date}T{(clock or '00:00:00').rstrip('Z')}")
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _weekend_range(start, end):
+    """Format as "Mar 03-05", or "Mar 30-Apr 01" across months"""
+    if start.month == end.month:
+        return f"{start.strftime('%b')} {start.day:02d}-{end.day:02d}"
+    return f"{start.strftime('%b %d')}-{end.strftime('%b %d')}"
+
+
+class RaceWeekend:
+    """One round, with its sessions parsed and sorted (needs a race date)"""
+
+    __slots__ = (
+        "round", "name", "circuit", "locality", "country", "is_sprint",
+        "race_date", "race_start", "sessions", "weekend_start", "weekend_end", "weekend_range", "_local",
+    )
+
+    def __init__(self, race):
+        self.round = int(race.get("round") or 0)
+        self.name = race.get("raceName", "Grand Prix")
+        self.circuit = race.get("Circuit", {})
+        location = self.circuit.get("Location", {})
+        self.locality = location.get("locality", "")
+        self.country = location.get("country", "")
+        self.is_sprint = bool(race.get("Sprint"))
+        self.race_date = race.get("date")
+
+        # Sessions without a published time (TBA) are left out
+        sessions = []
+        for key, kind in SESSION_KEYS:
+            entry = race.get(key) or {}
+            if entry.get("time"):
+                starts_at = _parse(entry.get("date"), entry["time"])
+                if starts_at is not None:
+                    sessions.append(Session(kind, starts_at))
+        if race.get("time"):
+            starts_at = _parse(self.race_date, race["time"])
+            if starts_at is not None:
+                sessions.append(Session("race", starts_at))
+        self.sessions = tuple(sorted(sessions, key=lambda s: s.starts_at))
+
+        # Ordering key: the race start, or midnight of race day when TBA
+        self.race_start = _parse(self.race_date, race.get("time")) or _parse(self.race_date, None)
+
+        # FP1 opens the weekend; without it assume the usual Friday start
+        fp1 = _parse((race.get("FirstPractice") or {}).get("date"), None)
+        self.weekend_end = self.race_start.date()
+        self.weekend_start = fp1.date() if fp1 else self.weekend_end - timedelta(days=2)
+        self.weekend_range = _weekend_range(self.weekend_start, self.weekend_end)
+        self._local = {}
+
+    def local(self, tz=DEFAULT_TIMEZONE):
+        """Session times and weekend range in `tz`, computed once per timezone"""
+        local = self._local.get(tz)
+        if local is None:
+            zone = get_zone(tz)
+            sessions = tuple((s.kind, s.starts_at.astimezone(zone).strftime("%d %b %H:%M")) for s in self.sessions)
+            if self.sessions:
+                weekend_range = _weekend_range(
+                    self.sessions[0].starts_at.astimezone(zone).date(),
+                    self.race_start.astimezone(zone).date(),
+                )
+            else:
+                weekend_range = self.weekend_range
+            local = self._local[tz] = LocalWeekend(sessions, weekend_range)
+        return local
+
+    def live_window(self):
+        """(opens, closes) of live timing over the whole weekend, or None"""
+        if not self.sessions:
+            return None
+        last = self.sessions[-1]
+        return (
+            self.sessions[0].starts_at - LIVE_LEAD,
+            last.starts_at + SESSION_LENGTH.get(last.kind, DEFAULT_SESSION_LENGTH) + LIVE_GRACE,
+        )
+
+    def active_session(self, now):
+        """The session whose live window contains `now`, or None"""
+        for session in self.sessions:
+            length = SESSION_LENGTH.get(session.kind, DEFAULT_SESSION_LENGTH)
+            if session.starts_at - LIVE_LEAD <= now <= session.starts_at + length + LIVE_GRACE:
+                return session
+        return None
+
+
+class Season:
+    """All weekends of one season, ordered by race start"""
+
+    def __init__(self, year, races):
+        self.year = year
+        self.races = races
+        self.weekends = sorted(
+            (RaceWeekend(race) for race in races if _parse(race.get("date"), None)),
+            key=lambda w: w.race_start,
+        )
+        self._race_starts = [w.race_start.timestamp() for w in self.weekends]
+        self._windows = [w.live_window() for w in self.weekends]
+        self._window_starts = [
+            (window[0] if window else weekend.race_start).timestamp()
+            for weekend, window in zip(self.weekends, self._windows)
+        ]
+
+    def next_race(self, now=None):
+        """First weekend whose race has not started yet"""
+        now = now or datetime.now(timezone.utc)
+        index = bisect.bisect_left(self._race_starts, now.timestamp())
+        return self.weekends[index] if index < len(self.weekends) else None
+
+    def current_weekend(self, now=None):
+        """The weekend whose live window contains `now`, or None"""
+        now = now or datetime.now(timezone.utc)
+        index = bisect.bisect_right(self._window_starts, now.timestamp()) - 1
+        if index < 0 or self._windows[index] is None:
+            return None
+        return self.weekends[index] if now <= self._windows[index][1] else None
+
+    def active_session(self, now=None):
+        now = now or datetime.now(timezone.utc)
+        weekend = self.current_weekend(now)
+        return weekend.active_session(now) if weekend is not None else None
+
+
+_seasons = {}
+
+
+def _download(year):
+    """(version, races) from Jolpica, or None; races are shared, don't mutate"""
+    response = fetch_json(f"{JOLPICA_BASE_URL}/ergast/f1/{year}.json", timeout=30)
+    if response.status != 200:
+        return None
+    return response.version, response.data.get("MRData", {}).get("RaceTable", {}).get("Races", [])
+
+
+def get_season(year=None):
+    """The parsed schedule for `year` (default: this year), or None if unavailable"""
+    year = year or datetime.now(timezone.utc).year
+    cached = _seasons.get(year)
+    if cached is not None and cached[0] > time.time():
+        return cached[2]
+
+    key = f"cache:schedule_{year}"
+    version = races = None
+    try:
+        shared = get_state().get(key)
+        if isinstance(shared, dict):
+            version, races = shared["version"], shared["races"]
+    except StateError as e:
+        logger.warning(f"Schedule cache unavailable: {e}")
+
+    if races is None:
+        try:
+            downloaded = _download(year)
+        except Exception as e:
+            logger.error(f"Error fetching {year} schedule: {e}")
+            downloaded = None
+        if downloaded is None:
+            # Keep serving the last schedule we had rather than nothing
+            return cached[2] if cached is not None else None
+        version, races = downloaded
+        try:
+            get_state().set(key, {"version": version, "races": races}, SCHEDULE_TTL)
+        except StateError as e:
+            logger.warning(f"Could not cache {year} schedule: {e}")
+
+    # Unchanged upstream data: keep the parsed season and its per-timezone renders
+    if cached is not None and cached[1] == version:
+        season = cached[2]
+    else:
+        season = Season(year, races)
+    _seasons[year] = (time.time() + SCHEDULE_TTL, version, season)
+    return season
@@ -0,0 +1,254 @@
+"""
+F1 Bot - Out-of-process live timing scraper
+
+With LIVE_SOURCE=worker, Chromium, Playwright and the DOM parsing run in a
+separate worker process instead of the bot's event loop. The worker owns an
+OptimizedLiveTimingScraper and publishes every snapshot to a Unix socket as
+length-prefixed orjson frames; the bot keeps the latest one in memory.
+
+    python3 f1_scraper_worker.py --socket /tmp/f1bot-scraper.sock
+
+The bot side (`get_worker_client`) spawns the worker under a supervisor that
+restarts it with exponential backoff if it exits.
+"""
+
+import os
+import sys
+import time
+import struct
+import signal
+import asyncio
+import logging
+import argparse
+import tempfile
+
+import f1_metrics
+from f1_live_model import encode_snapshot, decode_snapshot
+
+logger = logging.getLogger(__name__)
+
+SCRAPER_SOCKET = os.getenv(
+    "SCRAPER_SOCKET", os.path.join(tempfile.gettempdir(), "f1bot-scraper.sock")
+)
+# Seconds between DOM reads in the worker
+WORKER_INTERVAL = float(os.getenv("WORKER_INTERVAL", "1"))
+# Snapshots older than this are treated as missing by the bot
+WORKER_STALE_AFTER = 30.0
+
+# Restart backoff: doubles per crash, reset once the worker stays up for BACKOFF_RESET
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 60.0
+BACKOFF_RESET = 120.0
+
+# Clients whose unsent frames exceed this are disconnected rather than buffered
+MAX_CLIENT_BUFFER = 256 * 1024
+
+_HEADER = struct.Struct(">I")
+
+WORKER_RESTARTS = f1_metrics.REGISTRY.counter(
+    "f1bot_scraper_worker_restarts_total", "Scraper worker process restarts")
+WORKER_FRAMES = f1_metrics.REGISTRY.counter(
+    "f1bot_scraper_worker_frames_total", "Snapshots received from the scraper worker")
+
+
+def frame(payload):
+    return _HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader):
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    return await reader.readexactly(length)
+
+
+# ==================== WORKER PROCESS ====================
+
+class ScraperWorker:
+    """Owns the browser and broadcasts snapshots to connected bot processes"""
+
+    def __init__(self, socket_path, interval=WORKER_INTERVAL):
+        self.socket_path = socket_path
+        self.interval = interval
+        self.clients = set()
+        self.last_frame = None
+        self._stop = asyncio.Event()
+
+    async def _handle_client(self, reader, writer):
+        self.clients.add(writer)
+        if self.last_frame is not None:
+            writer.write(self.last_frame)
+        try:
+            # Clients never send anything; this returns when they disconnect
+            await reader.read()
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def _broadcast(self, data):
+        self.last_frame = data
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                logger.warning("Dropping slow scraper client")
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+    async def run(self):
+        from f1_playwright_scraper import OptimizedLiveTimingScraper
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, self._stop.set)
+
+        parent = os.getppid()
+        scraper = OptimizedLiveTimingScraper()
+        try:
+            if not await scraper.initialize():
+                raise RuntimeError("Browser failed to start")
+            logger.info(f"Scraper worker publishing on {self.socket_path}")
+
+            while not self._stop.is_set():
+                # Exit with the bot rather than outliving it
+                if os.getppid() != parent:
+                    break
+                snapshot = await scraper.get_live_data()
+                if snapshot is not None:
+                    self._broadcast(frame(encode_snapshot(snapshot)))
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            server.close()
+            for writer in list(self.clients):
+                writer.close()
+            await asyncio.sleep(0)
+            await scraper.cleanup()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+# ==================== BOT SIDE ====================
+
+class WorkerSupervisor:
+    """Runs the worker as a child process and restarts it when it exits"""
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.process = None
+        self._stopping = False
+
+    async def run(self):
+        backoff = BACKOFF_INITIAL
+        while not self._stopping:
+            started = time.monotonic()
+            self.process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(__file__), "--socket", self.socket_path,
+            )
+            code = await self.process.wait()
+            if self._stopping:
+                break
+
+            if time.monotonic() - started > BACKOFF_RESET:
+                backoff = BACKOFF_INITIAL
+            logger.warning(f"Scraper worker exited with {code}; restarting in {backoff:.0f}s")
+            WORKER_RESTARTS.inc()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, BACKOFF_MAX)
+
+    async def stop(self):
+        self._stopping = True
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), 10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+
+
+class WorkerClient:
+    """Keeps the most recent snapshot published by the worker"""
+
+    def __init__(self, socket_path=SCRAPER_SOCKET, spawn=True):
+        self.socket_path = socket_path
+        self.supervisor = WorkerSupervisor(socket_path) if spawn else None
+        self.snapshot = None
+        self._tasks = []
+
+    def start(self):
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        if self.supervisor is not None:
+            self._tasks.append(loop.create_task(self.supervisor.run()))
+        self._tasks.append(loop.create_task(self._receive()))
+
+    async def _receive(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(1)
+                continue
+
+            try:
+                while True:
+                    self.snapshot = decode_snapshot(await read_frame(reader))
+                    WORKER_FRAMES.inc()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                logger.warning("Lost connection to scraper worker")
+            except Exception as e:
+                logger.error(f"Error reading from scraper worker: {e}")
+            finally:
+                writer.close()
+            await asyncio.sleep(1)
+
+    def latest(self):
+        """Latest snapshot, or None if the worker has gone quiet"""
+        snapshot = self.snapshot
+        if snapshot is None or time.time() - snapshot.taken_at > WORKER_STALE_AFTER:
+            return None
+        return snapshot
+
+    async def stop(self):
+        if self.supervisor is not None:
+            await self.supervisor.stop()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+
+_client = None
+
+
+def get_worker_client():
+    """The process-wide worker client, started on first use"""
+    global _client
+    if _client is None:
+        _client = WorkerClient()
+    _client.start()
+    return _client
+
+
+async def stop_worker_client():
+    if _client is not None:
+        await _client.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="F1 bot live timing scraper worker")
+    parser.add_argument("--socket", default=SCRAPER_SOCKET)
+    parser.add_argument("--interval", type=float, default=WORKER_INTERVAL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s scraper-worker %(levelname)s %(message)s")
+    asyncio.run(ScraperWorker(args.socket, args.interval).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+F1 Bot - Prefix search for inline mode
+
+Backs `@bot ver` / `@bot baku`. Every searchable entry (driver, team, race
+weekend) is indexed under the normalized words of its names: lowercase,
+accents stripped, so "perez" finds Pérez. The words are kept in one sorted
+list. A prefix lookup is two bisects, and the hits are a contiguous slice of
+that list. Multi-word queries intersect the entries of each word.
+
+Entries carry a payload that builds the inline result to send once per
+locale and timezone. The index build prebuilds the variants chats use, so
+a query only renders for a timezone set since the last build. Result sets
+are also cached per normalized query until the index is replaced. A user
+typing "v", "ve", "ver" costs three lookups and no upstream calls. The
+index itself is built in the background from data the bot already fetches
+(see f1_bot_live).
+"""
+
+import bisect
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+import f1_metrics
+
+logger = logging.getLogger(__name__)
+
+# Telegram accepts at most 50 results per inline answer
+MAX_RESULTS = 50
+MAX_CACHED_QUERIES = 2048
+
+SEARCH_QUERIES = f1_metrics.REGISTRY.counter(
+    "f1bot_search_queries_total", "Inline search queries by result-set cache result", ("result",))
+SEARCH_ENTRIES = f1_metrics.REGISTRY.gauge(
+    "f1bot_search_index_entries", "Entries in the inline search index", ("kind",))
+
+
+class SearchEntry(NamedTuple):
+    key: str
+    kind: str
+    # Lower ranks are listed first
+    rank: float
+    # Searchable names: codes, ids, names, places
+    names: tuple
+    payload: Any
+
+
+def normalize(text):
+    """Lowercase words with accents and punctuation removed"""
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(
+        ch if ch.isalnum() else " " for ch in decomposed if not unicodedata.combining(ch)
+    ).split()
+
+
+class PrefixIndex:
+    """Sorted word list over a fixed set of entries"""
+
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda entry: (entry.rank, entry.key))
+        postings = sorted({
+            (word, i) for i, entry in enumerate(self.entries) for name in entry.names for word in normalize(name)
+        })
+        self.words = [word for word, _ in postings]
+        self.postings = [i for _, i in postings]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, prefix):
+        """Positions of the entries with a word starting with `prefix`"""
+        lo = bisect.bisect_left(self.words, prefix)
+        hi = bisect.bisect_left(self.words, prefix + "\uffff", lo)
+        return set(self.postings[lo:hi])
+
+    def search(self, query, limit=MAX_RESULTS):
+        words = normalize(query)
+        if not words:
+            return [entry.payload for entry in self.entries[:limit]]
+        hits = self.lookup(words[0])
+        for word in words[1:]:
+            if not hits:
+                break
+            hits &= self.lookup(word)
+        # Positions follow rank order
+        return [self.entries[i].payload for i in sorted(hits)[:limit]]
+
+
+class Search:
+    """The current index plus cached result sets for it"""
+
+    def __init__(self):
+        self.index = None
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def replace(self, entries):
+        index = PrefixIndex(entries)
+        kinds = {}
+        for entry in index.entries:
+            kinds[entry.kind] = kinds.get(entry.kind, 0) + 1
+        with self._lock:
+            self.index = index
+            self._results.clear()
+        for kind, count in kinds.items():
+            SEARCH_ENTRIES.set(kind, value=count)
+        logger.info(f"Search index rebuilt: {len(index)} entries, {len(index.words)} words")
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Payloads of the entries matching every word of `query`, best ranked first"""
+        signature = (" ".join(normalize(query)), limit)
+        with self._lock:
+            index = self.index
+            cached = self._results.get(signature)
+            if cached is not None:
+                self._results.move_to_end(signature)
+                SEARCH_QUERIES.inc("hit")
+                return cached
+        if index is None:
+            return []
+        SEARCH_QUERIES.inc("miss")
+        results = index.search(signature[0], limit)
+        with self._lock:
+            # Don't cache into an index that was replaced meanwhile
+            if self.index is index:
+                self._results[signature] = results
+                while len(self._results) > MAX_CACHED_QUERIES:
+                    self._results.popitem(last=False)
+        return results
+
+
+_search = None
+
+
+def get_search():
+    global _search
+    if _search is None:
+        _search = Search()
+    return _search
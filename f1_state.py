@@ -0,0 +1,493 @@
+"""
+F1 Bot - Shared state backend
+
+Lets several bot replicas serve the same webhook URL by moving the state that
+used to live in module globals behind one interface:
+
+- response cache entries with a TTL (get / set)
+- the live subscription registry (hash of chat_id -> subscription)
+- leader election, so only one replica runs the live timing scraper
+
+STATE_BACKEND_URL selects the implementation:
+
+    (unset) / memory://          in-process dicts, single replica
+    redis://host:6379/0          any Redis-protocol server
+
+Calls are blocking and most come from the event loop. When the backend
+can't be reached, calls fail fast with StateError for STATE_BACKEND_COOLDOWN
+seconds instead of each waiting on connect timeouts, and callers fall back
+to their local state.
+
+`python3 f1_state.py serve --port 6390` starts MiniRedis, a small
+Redis-protocol stand-in for local multi-replica testing.
+"""
+
+import os
+import time
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from urllib.parse import urlsplit
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+STATE_BACKEND_URL = os.getenv("STATE_BACKEND_URL", "")
+# Seconds an unreachable backend is not retried; calls fail fast meanwhile
+STATE_BACKEND_COOLDOWN = float(os.getenv("STATE_BACKEND_COOLDOWN", "10"))
+# Identifies this process in leases and subscription entries
+REPLICA_ID = os.getenv("REPLICA_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class StateError(Exception):
+    pass
+
+
+class StateBackend:
+    """Interface shared by the in-memory and Redis backends"""
+
+    # True when other processes can see what this backend stores
+    shared = False
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def get_bytes(self, key):
+        raise NotImplementedError
+
+    def set_bytes(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def hget(self, name, field):
+        raise NotImplementedError
+
+    def hset(self, name, field, value):
+        raise NotImplementedError
+
+    def hdel(self, name, field):
+        raise NotImplementedError
+
+    def hgetall(self, name):
+        raise NotImplementedError
+
+    def acquire_lease(self, name, owner, ttl_ms):
+        """Take or renew a lease; True if `owner` holds it afterwards"""
+        raise NotImplementedError
+
+    def release_lease(self, name, owner):
+        raise NotImplementedError
+
+
+# ==================== IN-MEMORY ====================
+
+class MemoryBackend(StateBackend):
+    """Process-local state; values are stored as-is, without serialization"""
+
+    def __init__(self):
+        self._values = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and time.monotonic() >= expires:
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._values[key] = (value, expires)
+
+    get_bytes = get
+    set_bytes = set
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def hget(self, name, field):
+        with self._lock:
+            return self._hashes.get(name, {}).get(str(field))
+
+    def hset(self, name, field, value):
+        with self._lock:
+            self._hashes.setdefault(name, {})[str(field)] = value
+
+    def hdel(self, name, field):
+        with self._lock:
+            self._hashes.get(name, {}).pop(str(field), None)
+
+    def hgetall(self, name):
+        with self._lock:
+            return dict(self._hashes.get(name, {}))
+
+    def acquire_lease(self, name, owner, ttl_ms):
+        with self._lock:
+            entry = self._live(name)
+            if entry is not None and entry[0] != owner:
+                return False
+            self._values[name] = (owner, time.monotonic() + ttl_ms / 1000)
+            return True
+
+    def release_lease(self, name, owner):
+        with self._lock:
+            entry = self._live(name)
+            if entry is not None and entry[0] == owner:
+                del self._values[name]
+
+
+# ==================== REDIS PROTOCOL ====================
+
+def _encode_command(args):
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+class RedisBackend(StateBackend):
+    """Minimal blocking RESP2 client; one connection guarded by a lock"""
+
+    shared = True
+
+    def __init__(self, url, timeout=2.0, cooldown=STATE_BACKEND_COOLDOWN):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = parts.password
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self._down_until = 0.0
+        self._sock = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip(("AUTH", self.password))
+        if self.db:
+            self._roundtrip(("SELECT", self.db))
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def _roundtrip(self, args):
+        self._sock.sendall(_encode_command(args))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by state backend")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            raise StateError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            return self._file.read(length + 2)[:-2]
+        if prefix == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise StateError(f"Unexpected reply: {line!r}")
+
+    def execute(self, *args):
+        # Callers run on the event loop; after a failure, don't block it on
+        # connect timeouts again until the cooldown has passed
+        if time.monotonic() < self._down_until:
+            raise StateError("State backend unavailable (cooling down)")
+        with self._lock:
+            if time.monotonic() < self._down_until:
+                raise StateError("State backend unavailable (cooling down)")
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._roundtrip(args)
+                except (OSError, ConnectionError) as e:
+                    self._close()
+                    if attempt == 2:
+                        self._down_until = time.monotonic() + self.cooldown
+                        logger.warning(f"State backend unreachable, failing fast for {self.cooldown:g}s: {e}")
+                        raise StateError(f"State backend unavailable: {e}") from e
+
+    def get(self, key):
+        value = self.execute("GET", key)
+        return orjson.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.set_bytes(key, orjson.dumps(value), ttl)
+
+    def get_bytes(self, key):
+        return self.execute("GET", key)
+
+    def set_bytes(self, key, value, ttl=None):
+        if ttl:
+            self.execute("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self.execute("SET", key, value)
+
+    def delete(self, key):
+        self.execute("DEL", key)
+
+    def hget(self, name, field):
+        value = self.execute("HGET", name, field)
+        return orjson.loads(value) if value is not None else None
+
+    def hset(self, name, field, value):
+        self.execute("HSET", name, field, orjson.dumps(value))
+
+    def hdel(self, name, field):
+        self.execute("HDEL", name, field)
+
+    def hgetall(self, name):
+        flat = self.execute("HGETALL", name) or []
+        return {
+            flat[i].decode(): orjson.loads(flat[i + 1])
+            for i in range(0, len(flat), 2)
+        }
+
+    def acquire_lease(self, name, owner, ttl_ms):
+        if self.execute("SET", name, owner, "NX", "PX", ttl_ms) == "OK":
+            return True
+        # Renew if we already hold it. GET and PEXPIRE aren't atomic, but the
+        # lease can only change hands after it expires, and we renew well before that.
+        if self.execute("GET", name) == owner.encode():
+            self.execute("PEXPIRE", name, ttl_ms)
+            return True
+        return False
+
+    def release_lease(self, name, owner):
+        if self.execute("GET", name) == owner.encode():
+            self.execute("DEL", name)
+
+
+# ==================== LEADER ELECTION ====================
+
+class LeaderElection:
+    """Lease-based leadership; `is_leader()` renews at most every ttl/3"""
+
+    def __init__(self, backend, name, ttl_ms=10000, owner=REPLICA_ID):
+        self.backend = backend
+        self.name = f"leader:{name}"
+        self.ttl_ms = ttl_ms
+        self.owner = owner
+        self._leader = False
+        self._checked = 0.0
+
+    def is_leader(self):
+        now = time.monotonic()
+        if now - self._checked < self.ttl_ms / 3000:
+            return self._leader
+        self._checked = now
+        try:
+            leader = self.backend.acquire_lease(self.name, self.owner, self.ttl_ms)
+        except StateError as e:
+            logger.warning(f"Leader election for {self.name} failed: {e}")
+            leader = False
+        if leader != self._leader:
+            logger.info(f"{self.owner} {'acquired' if leader else 'lost'} {self.name}")
+        self._leader = leader
+        return leader
+
+    def release(self):
+        if self._leader:
+            self.backend.release_lease(self.name, self.owner)
+            self._leader = False
+
+
+_state = None
+_elections = {}
+
+
+def create_backend(url):
+    if not url or url.startswith("memory://"):
+        return MemoryBackend()
+    if url.startswith("redis://"):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported STATE_BACKEND_URL: {url}")
+
+
+def get_state():
+    """The process-wide state backend selected by STATE_BACKEND_URL"""
+    global _state
+    if _state is None:
+        _state = create_backend(STATE_BACKEND_URL)
+    return _state
+
+
+def get_election(name):
+    election = _elections.get(name)
+    if election is None:
+        election = LeaderElection(get_state(), name)
+        _elections[name] = election
+    return election
+
+
+# ==================== MINIREDIS ====================
+
+class MiniRedis(socketserver.ThreadingTCPServer):
+    """Redis-protocol stand-in implementing the commands RedisBackend uses"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), _MiniRedisHandler)
+        self.data = MemoryBackend()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start_background(self):
+        threading.Thread(target=self.serve_forever, name="mini-redis", daemon=True).start()
+        return self
+
+
+class _MiniRedisHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _reply(self, value):
+        if value is None:
+            out = b"$-1\r\n"
+        elif isinstance(value, StateError):
+            out = b"-ERR %s\r\n" % str(value).encode()
+        elif isinstance(value, bool):
+            out = b"+OK\r\n" if value else b"$-1\r\n"
+        elif isinstance(value, int):
+            out = b":%d\r\n" % value
+        elif isinstance(value, list):
+            self.wfile.write(b"*%d\r\n" % len(value))
+            for item in value:
+                self._reply(item)
+            return
+        else:
+            out = b"$%d\r\n%s\r\n" % (len(value), value)
+        self.wfile.write(out)
+
+    def handle(self):
+        while True:
+            args = self._read_command()
+            if not args:
+                return
+            try:
+                self._reply(self._dispatch(args[0].decode().upper(), args[1:]))
+            except StateError as e:
+                self._reply(e)
+            except (IndexError, ValueError):
+                self._reply(StateError("wrong number of arguments"))
+
+    def _dispatch(self, command, args):
+        data = self.server.data
+        if command == "PING":
+            return True
+        if command in ("AUTH", "SELECT"):
+            return True
+        if command == "GET":
+            return data.get(args[0])
+        if command == "SET":
+            key, value, options = args[0], args[1], [a.decode().upper() for a in args[2:]]
+            ttl = None
+            if "PX" in options:
+                ttl = int(options[options.index("PX") + 1]) / 1000
+            elif "EX" in options:
+                ttl = int(options[options.index("EX") + 1])
+            # Check and write under one lock so two NX clients can't both win
+            with data._lock:
+                if "NX" in options and data._live(key) is not None:
+                    return None
+                data._values[key] = (value, time.monotonic() + ttl if ttl else None)
+            return True
+        if command == "DEL":
+            existed = data.get(args[0]) is not None
+            data.delete(args[0])
+            return int(existed)
+        if command == "PEXPIRE":
+            with data._lock:
+                entry = data._live(args[0])
+                if entry is None:
+                    return 0
+                data._values[args[0]] = (entry[0], time.monotonic() + int(args[1]) / 1000)
+            return 1
+        if command == "HGET":
+            return data.hget(args[0], args[1].decode())
+        if command == "HSET":
+            data.hset(args[0], args[1].decode(), args[2])
+            return 1
+        if command == "HDEL":
+            data.hdel(args[0], args[1].decode())
+            return 1
+        if command == "HGETALL":
+            flat = []
+            for field, value in data.hgetall(args[0]).items():
+                flat.extend((field.encode(), value))
+            return flat
+        raise StateError(f"unknown command '{command}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="F1 bot shared state tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run MiniRedis for local multi-replica testing")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MiniRedis(args.host, args.port)
+    logger.info(f"MiniRedis listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+F1 Bot - Driver and team statistics
+
+Answers questions like "VER vs NOR this season" or "average finish at Baku"
+from the local results archive (f1_archive), without any upstream calls.
+Each archived season is loaded once into columnar NumPy arrays indexed
+[driver, round, session], with sessions race, sprint and qualifying.
+Head-to-head, points progression, average finish and DNF rate are then
+array reductions over those axes.
+
+A season's arrays are rebuilt only when its archive revision changes.
+Query results are cached per signature (query name plus arguments) together
+with the revisions they were computed from. A repeated question is a dict
+lookup until new results are archived.
+"""
+
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import numpy as np
+
+import f1_metrics
+from f1_archive import get_archive
+
+logger = logging.getLogger(__name__)
+
+SESSIONS = ("race", "sprint", "qualifying")
+RACE, SPRINT, QUALIFYING = range(len(SESSIONS))
+SESSION_INDEX = {name: i for i, name in enumerate(SESSIONS)}
+
+# Finishers, and cars classified one or more laps down
+CLASSIFIED = re.compile(r"^(Finished|Lapped|\+\d+ Laps?)$")
+
+# Seconds between checks of the archive for new results
+REVISION_TTL = 30.0
+MAX_CACHED_QUERIES = 512
+
+STATS_QUERIES = f1_metrics.REGISTRY.counter(
+    "f1bot_stats_queries_total", "Statistics queries by query and cache result", ("query", "result"))
+
+
+class HeadToHead(NamedTuple):
+    season: int
+    drivers: tuple
+    # (first ahead, second ahead) over the sessions both took part in
+    race: tuple
+    qualifying: tuple
+    points: tuple
+    avg_finish: tuple
+    dnfs: tuple
+
+
+class DriverStat(NamedTuple):
+    code: str
+    value: float
+    starts: int
+
+
+class Progression(NamedTuple):
+    season: int
+    rounds: tuple
+    # (code, cumulative points after each round)
+    drivers: tuple
+
+
+class SeasonMatrix:
+    """One season's results as [driver, round, session] arrays"""
+
+    def __init__(self, season, races, results, qualifying):
+        self.season = season
+        self.rounds = sorted({race["round"] for race in races} | {row["round"] for row in results})
+        self.circuits = {
+            race["round"]: " ".join(filter(None, (race["circuit_id"], race["circuit_name"],
+                                                  race["locality"], race["country"]))).lower()
+            for race in races
+        }
+
+        entrants = {}
+        for row in (*results, *qualifying):
+            entrants.setdefault(row["driver_id"], row)
+        self.driver_ids = list(entrants)
+        self.codes = [
+            row["code"] or (row["family_name"] or row["driver_id"])[:3].upper() for row in entrants.values()
+        ]
+        self.families = [(row["family_name"] or "").lower() for row in entrants.values()]
+        driver_index = {driver_id: i for i, driver_id in enumerate(self.driver_ids)}
+        round_index = {rnd: i for i, rnd in enumerate(self.rounds)}
+
+        shape = (len(self.driver_ids), len(self.rounds), len(SESSIONS))
+        self.position = np.full(shape, np.nan, dtype=np.float32)
+        self.points = np.zeros(shape, dtype=np.float32)
+        self.started = np.zeros(shape, dtype=bool)
+        self.dnf = np.zeros(shape, dtype=bool)
+
+        for rows, sessions in ((results, [SESSION_INDEX[row["session"]] for row in results]),
+                               (qualifying, [QUALIFYING] * len(qualifying))):
+            if not rows:
+                continue
+            d = np.fromiter((driver_index[row["driver_id"]] for row in rows), np.intp, len(rows))
+            r = np.fromiter((round_index[row["round"]] for row in rows), np.intp, len(rows))
+            s = np.asarray(sessions, dtype=np.intp)
+            self.position[d, r, s] = [np.nan if row["position"] is None else row["position"] for row in rows]
+            self.started[d, r, s] = True
+            if rows is results:
+                self.points[d, r, s] = [row["points"] or 0.0 for row in rows]
+                self.dnf[d, r, s] = [not CLASSIFIED.match(row["status"] or "") for row in rows]
+
+    def resolve(self, token):
+        """Driver index for a code (VER), driver id (max_verstappen) or surname, or None"""
+        token = token.strip()
+        if token.upper() in self.codes:
+            return self.codes.index(token.upper())
+        if token.lower() in self.driver_ids:
+            return self.driver_ids.index(token.lower())
+        matches = [i for i, family in enumerate(self.families) if family.startswith(token.lower())]
+        return matches[0] if len(matches) == 1 else None
+
+    def round_mask(self, circuit):
+        """Rounds held at a circuit matching `circuit` (id, name, town or country)"""
+        needle = circuit.lower()
+        return np.array([needle in self.circuits.get(rnd, "") for rnd in self.rounds], dtype=bool)
+
+    def season_points(self):
+        """Race + sprint points per driver and round"""
+        return self.points[:, :, RACE] + self.points[:, :, SPRINT]
+
+
+class StatsEngine:
+    def __init__(self, archive=None):
+        self.archive = archive or get_archive()
+        self._revisions = {}
+        self._revisions_checked = 0.0
+        self._matrices = {}
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ==================== DATA ====================
+
+    def revisions(self):
+        now = time.monotonic()
+        if now - self._revisions_checked > REVISION_TTL:
+            self._revisions = self.archive.revisions()
+            self._revisions_checked = now
+        return self._revisions
+
+    def latest_season(self):
+        revisions = self.revisions()
+        return max(revisions) if revisions else None
+
+    def matrix(self, season):
+        """The season's arrays, rebuilt only when its archive revision changed; None if not archived"""
+        revision = self.revisions().get(season)
+        if revision is None:
+            return None
+        cached = self._matrices.get(season)
+        if cached is not None and cached[0] == revision:
+            return cached[1]
+        matrix = SeasonMatrix(
+            season, self.archive.races_in(season),
+            self.archive.season_results(season), self.archive.season_qualifying(season),
+        )
+        self._matrices[season] = (revision, matrix)
+        return matrix
+
+    def _cached(self, signature, revision, compute):
+        with self._lock:
+            hit = self._results.get(signature)
+            if hit is not None and hit[0] == revision:
+                self._results.move_to_end(signature)
+                STATS_QUERIES.inc(signature[0], "hit")
+                return hit[1]
+        STATS_QUERIES.inc(signature[0], "miss")
+        value = compute()
+        with self._lock:
+            self._results[signature] = (revision, value)
+            self._results.move_to_end(signature)
+            while len(self._results) > MAX_CACHED_QUERIES:
+                self._results.popitem(last=False)
+        return value
+
+    # ==================== QUERIES ====================
+
+    def head_to_head(self, first, second, season=None):
+        """HeadToHead of two drivers over a season, or None if either is unknown"""
+        season = season or self.latest_season()
+        revision = self.revisions().get(season)
+        signature = ("head_to_head", first.upper(), second.upper(), season)
+        return self._cached(signature, revision, lambda: self._head_to_head(first, second, season))
+
+    def _head_to_head(self, first, second, season):
+        m = self.matrix(season)
+        if m is None:
+            return None
+        a, b = m.resolve(first), m.resolve(second)
+        if a is None or b is None or a == b:
+            return None
+
+        def ahead(session):
+            pa, pb = m.position[a, :, session], m.position[b, :, session]
+            both = m.started[a, :, session] & m.started[b, :, session]
+            return int(np.sum(pa[both] < pb[both])), int(np.sum(pb[both] < pa[both]))
+
+        points = m.season_points()[[a, b]].sum(axis=1)
+        positions = m.position[[a, b], :, RACE]
+        finishes = (~np.isnan(positions)).sum(axis=1)
+        finish = np.nansum(positions, axis=1) / np.maximum(finishes, 1)
+        dnfs = m.dnf[[a, b], :, RACE].sum(axis=1)
+        return HeadToHead(
+            season=season,
+            drivers=(m.codes[a], m.codes[b]),
+            race=ahead(RACE),
+            qualifying=ahead(QUALIFYING),
+            points=tuple(float(p) for p in points),
+            avg_finish=tuple(round(float(f), 2) if n else None for f, n in zip(finish, finishes)),
+            dnfs=tuple(int(n) for n in dnfs),
+        )
+
+    def points_progression(self, season=None, top=5):
+        """Cumulative race + sprint points per round for the season's top drivers"""
+        season = season or self.latest_season()
+        revision = self.revisions().get(season)
+        return self._cached(("points_progression", season, top), revision,
+                            lambda: self._points_progression(season, top))
+
+    def _points_progression(self, season, top):
+        m = self.matrix(season)
+        if m is None or not m.driver_ids:
+            return None
+        # Only rounds that have been raced
+        raced = m.started[:, :, RACE].any(axis=0) | m.started[:, :, SPRINT].any(axis=0)
+        cumulative = np.cumsum(m.season_points()[:, raced], axis=1)
+        if not cumulative.size:
+            return None
+        leaders = np.argsort(-cumulative[:, -1], kind="stable")[:top]
+        rounds = tuple(rnd for rnd, done in zip(m.rounds, raced) if done)
+        return Progression(
+            season, rounds, tuple((m.codes[i], tuple(float(p) for p in cumulative[i])) for i in leaders)
+        )
+
+    def average_finish(self, season=None, circuit=None, top=10):
+        """Best average race finish (DriverStat list), over a season or at a circuit across all seasons"""
+        if circuit:
+            revisions = self.revisions()
+            signature = ("average_finish", None, circuit.lower(), top)
+            return self._cached(signature, tuple(sorted(revisions.items())),
+                                lambda: self._average_finish(sorted(revisions), circuit, top))
+        season = season or self.latest_season()
+        return self._cached(("average_finish", season, None, top), self.revisions().get(season),
+                            lambda: self._average_finish([season], None, top))
+
+    def _average_finish(self, seasons, circuit, top):
+        totals, starts, codes = {}, {}, {}
+        for season in seasons:
+            m = self.matrix(season)
+            if m is None:
+                continue
+            mask = m.round_mask(circuit) if circuit else np.ones(len(m.rounds), dtype=bool)
+            if not mask.any():
+                continue
+            positions = m.position[:, mask, RACE]
+            sums = np.nansum(positions, axis=1)
+            counts = (~np.isnan(positions)).sum(axis=1)
+            for i in np.flatnonzero(counts):
+                driver_id = m.driver_ids[i]
+                totals[driver_id] = totals.get(driver_id, 0.0) + float(sums[i])
+                starts[driver_id] = starts.get(driver_id, 0) + int(counts[i])
+                codes[driver_id] = m.codes[i]
+        stats = [
+            DriverStat(codes[driver_id], round(totals[driver_id] / starts[driver_id], 2), starts[driver_id])
+            for driver_id in totals
+        ]
+        # Best average first; more starts breaks ties
+        return sorted(stats, key=lambda s: (s.value, -s.starts))[:top]
+
+    def dnf_rate(self, season=None, top=10):
+        """Drivers with the highest share of race starts not classified (DriverStat list)"""
+        season = season or self.latest_season()
+        return self._cached(("dnf_rate", season, top), self.revisions().get(season),
+                            lambda: self._dnf_rate(season, top))
+
+    def _dnf_rate(self, season, top):
+        m = self.matrix(season)
+        if m is None:
+            return []
+        starts = m.started[:, :, RACE].sum(axis=1)
+        dnfs = m.dnf[:, :, RACE].sum(axis=1)
+        rate = np.divide(dnfs, starts, out=np.zeros(len(starts)), where=starts > 0)
+        order = np.lexsort((-starts, -rate))
+        return [
+            DriverStat(m.codes[i], round(float(rate[i]), 3), int(starts[i]))
+            for i in order if starts[i] and dnfs[i]
+        ][:top]
+
+
+_engine = None
+
+
+def get_stats():
+    global _engine
+    if _engine is None:
+        _engine = StatsEngine()
+    return _engine
@@ -0,0 +1,110 @@
+"""
+F1 Bot - Durable live subscriptions
+
+Live feeds are JobQueue jobs, which die with the process. This store keeps
+each chat's subscription (message id, mode, created time) in a local JSON
+file so a restart can resume updates on the same message. Changes only mark
+the store dirty; `flush()` writes it atomically and is called from a short
+repeating job and on shutdown, so bursts of /live cost one write.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+LIVE_SUBSCRIPTIONS_FILE = os.getenv(
+    "LIVE_SUBSCRIPTIONS_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "live_subscriptions.json"),
+)
+# Seconds between flushes of pending changes
+FLUSH_INTERVAL = 2
+# Subscriptions older than this are not restored (no session lasts that long)
+MAX_SUBSCRIPTION_AGE = 6 * 3600
+
+
+class SubscriptionStore:
+    def __init__(self, path=LIVE_SUBSCRIPTIONS_FILE):
+        self.path = path
+        self.subscriptions = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.subscriptions = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load live subscriptions: {e}")
+            self.subscriptions = {}
+
+    def put(self, chat_id, message_id, mode="board"):
+        with self._lock:
+            self.subscriptions[str(chat_id)] = {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "mode": mode,
+                "created": time.time(),
+            }
+            self.dirty = True
+
+    def update(self, chat_id, **fields):
+        with self._lock:
+            entry = self.subscriptions.get(str(chat_id))
+            if entry is None:
+                return
+            entry.update(fields)
+            self.dirty = True
+
+    def remove(self, chat_id):
+        with self._lock:
+            if self.subscriptions.pop(str(chat_id), None) is not None:
+                self.dirty = True
+
+    def restorable(self, now=None):
+        """Subscriptions young enough to resume, dropping the rest"""
+        now = now or time.time()
+        with self._lock:
+            expired = [
+                key for key, entry in self.subscriptions.items()
+                if now - entry.get("created", 0) > MAX_SUBSCRIPTION_AGE
+            ]
+            for key in expired:
+                del self.subscriptions[key]
+            if expired:
+                self.dirty = True
+            return list(self.subscriptions.values())
+
+    def flush(self):
+        """Write pending changes; returns True if the file was written"""
+        with self._lock:
+            if not self.dirty:
+                return False
+            payload = json.dumps(self.subscriptions, ensure_ascii=False)
+            self.dirty = False
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not save live subscriptions: {e}")
+            self.dirty = True
+            return False
+
+
+_store = None
+
+
+def get_subscription_store():
+    global _store
+    if _store is None:
+        _store = SubscriptionStore()
+    return _store
@@ -3,11 +3,8 @@ import logging
 import sys
 
 # Ensure logging is configured BEFORE anything else imports f1_bot_live
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+from f1_logging import configure_logging
+configure_logging(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Now import handlers
@@ -20,13 +17,26 @@ try:
         standings_cmd, 
         constructors_cmd, 
         lastrace_cmd, 
-        nextrace_cmd
+        nextrace_cmd,
+        timezone_cmd,
+        language_cmd,
+        results_cmd,
+        stats_cmd,
+        h2h_cmd,
+        avgfinish_cmd,
+        inline_query,
+        profile_cmd,
+        post_init,
+        post_shutdown,
     )
 except ImportError as e:
     logger.error(f"Failed to import handlers: {e}")
     sys.exit(1)
 
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, InlineQueryHandler
+from f1_bot_live import MeteredRequest
+from f1_metrics import start_metrics_server
+from f1_profiling import install_profile_signal
 
 def main():
     token = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -37,7 +47,20 @@ def main():
     # Force the root logger to INFO in case f1_bot_live changed it
     logging.getLogger().setLevel(logging.INFO)
     
-    application = Application.builder().token(token).build()
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+
+    application = (
+        Application.builder()
+        .token(token)
+        .request(MeteredRequest(connection_pool_size=256))
+        .get_updates_request(MeteredRequest())
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+    install_profile_signal()
     
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("menu", show_menu))
@@ -46,7 +69,15 @@ def main():
     application.add_handler(CommandHandler("lastrace", lastrace_cmd))
     application.add_handler(CommandHandler("nextrace", nextrace_cmd))
     application.add_handler(CommandHandler("live", live_cmd))
+    application.add_handler(CommandHandler("timezone", timezone_cmd))
+    application.add_handler(CommandHandler("language", language_cmd))
+    application.add_handler(CommandHandler("results", results_cmd))
+    application.add_handler(CommandHandler("stats", stats_cmd))
+    application.add_handler(CommandHandler("h2h", h2h_cmd))
+    application.add_handler(CommandHandler("avgfinish", avgfinish_cmd))
+    application.add_handler(CommandHandler("profile", profile_cmd))
     application.add_handler(CallbackQueryHandler(button_handler))
+    application.add_handler(InlineQueryHandler(inline_query))
 
     logger.info("Bot is starting in POLLING mode (24/7 stable execution)...")
     application.run_polling()